@@ -26,7 +26,9 @@ from vertex_protocol.utils.bytes32 import (
     zero_subaccount,
     subaccount_to_hex,
 )
+from vertex_protocol.engine_client.types.models import MaxOrderSizeDirection
 from vertex_protocol.utils.expiration import OrderType, get_expiration_timestamp
+from vertex_protocol.utils.health import SubaccountLimitsEstimator
 from vertex_protocol.utils.math import to_pow_10, to_x18
 from vertex_protocol.utils.nonce import gen_order_nonce
 from vertex_protocol.utils.subaccount import SubaccountParams
@@ -186,6 +188,29 @@ def run():
     )
     print("max lp mintable:", max_lp_mintable.json(indent=2))
 
+    print("estimating limits locally...")
+    limits_estimator = SubaccountLimitsEstimator(client.get_subaccount_info(sender))
+    print(
+        "estimated max order size:",
+        limits_estimator.max_order_size(
+            product_id, to_x18(order_price), MaxOrderSizeDirection.SHORT
+        ),
+        "engine:",
+        max_order_size.max_order_size,
+    )
+    print(
+        "estimated max withdrawable:",
+        limits_estimator.max_withdrawable(product_id),
+        "engine:",
+        max_withdrawable.max_withdrawable,
+    )
+    print(
+        "estimated max lp mintable:",
+        limits_estimator.max_lp_mintable(1),
+        "engine:",
+        (max_lp_mintable.max_base_amount, max_lp_mintable.max_quote_amount),
+    )
+
     print("querying fee rates...")
     fee_rates = client.get_fee_rates(sender=sender)
     print("fee rates:", fee_rates.json(indent=2))
@@ -1,3 +1,4 @@
+from typing import Callable, Optional
 from unittest.mock import MagicMock, patch
 from eth_account import Account
 import pytest
@@ -12,6 +13,30 @@ from vertex_protocol.trigger_client.types import TriggerClientOpts
 from vertex_protocol.utils.bytes32 import hex_to_bytes32
 
 
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run tests marked as benchmarks",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    config.addinivalue_line(
+        "markers", "benchmark: timing / memory benchmarks, run with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def url() -> str:
     return "http://example.com"
@@ -340,3 +365,339 @@ def contracts_context(endpoint_addr: str, book_addrs: str) -> VertexContractsCon
     return VertexContractsContext(
         endpoint_addr=endpoint_addr, querier_addr=book_addrs[1]
     )
+
+
+def _product_risk(long_weight_initial: int, long_weight_maintenance: int) -> dict:
+    return {
+        "long_weight_initial_x18": str(long_weight_initial),
+        "short_weight_initial_x18": str(2 * 10**18 - long_weight_initial),
+        "long_weight_maintenance_x18": str(long_weight_maintenance),
+        "short_weight_maintenance_x18": str(2 * 10**18 - long_weight_maintenance),
+        "large_position_penalty_x18": "0",
+    }
+
+
+def _product_book_info(price_increment_x18: int, size_increment: int) -> dict:
+    return {
+        "size_increment": str(size_increment),
+        "price_increment_x18": str(price_increment_x18),
+        "min_size": str(10 * 10**18),
+        "collected_fees": "0",
+        "lp_spread_x18": "3000000000000000",
+    }
+
+
+def _spot_product(
+    product_id: int,
+    oracle_price_x18: int,
+    risk: Optional[dict] = None,
+    book_info: Optional[dict] = None,
+    deposits_multiplier_x18: int = 10**18,
+    borrows_multiplier_x18: int = 10**18,
+    total_deposits_normalized: int = 10**24,
+    total_borrows_normalized: int = 5 * 10**23,
+) -> dict:
+    return {
+        "product_id": product_id,
+        "oracle_price_x18": str(oracle_price_x18),
+        "risk": risk or _product_risk(9 * 10**17, 95 * 10**16),
+        "book_info": book_info or _product_book_info(10**18, 10**15),
+        "config": {
+            "token": "0x0000000000000000000000000000000000000000",
+            "interest_inflection_util_x18": "800000000000000000",
+            "interest_floor_x18": "10000000000000000",
+            "interest_small_cap_x18": "40000000000000000",
+            "interest_large_cap_x18": "1000000000000000000",
+        },
+        "state": {
+            "cumulative_deposits_multiplier_x18": str(deposits_multiplier_x18),
+            "cumulative_borrows_multiplier_x18": str(borrows_multiplier_x18),
+            "total_deposits_normalized": str(total_deposits_normalized),
+            "total_borrows_normalized": str(total_borrows_normalized),
+        },
+        "lp_state": {
+            "supply": "0",
+            "quote": {"amount": "0", "last_cumulative_multiplier_x18": "0"},
+            "base": {"amount": "0", "last_cumulative_multiplier_x18": "0"},
+        },
+    }
+
+
+def _perp_product(
+    product_id: int,
+    oracle_price_x18: int,
+    risk: Optional[dict] = None,
+    book_info: Optional[dict] = None,
+    cumulative_funding_x18: int = 0,
+) -> dict:
+    return {
+        "product_id": product_id,
+        "oracle_price_x18": str(oracle_price_x18),
+        "risk": risk or _product_risk(9 * 10**17, 95 * 10**16),
+        "book_info": book_info or _product_book_info(10**18, 10**15),
+        "state": {
+            "cumulative_funding_long_x18": str(cumulative_funding_x18),
+            "cumulative_funding_short_x18": str(cumulative_funding_x18),
+            "available_settle": "0",
+            "open_interest": "0",
+        },
+        "lp_state": {
+            "supply": "0",
+            "last_cumulative_funding_x18": "0",
+            "cumulative_funding_per_lp_x18": "0",
+            "base": "0",
+            "quote": "0",
+        },
+    }
+
+
+@pytest.fixture
+def spot_product() -> Callable[..., dict]:
+    return _spot_product
+
+
+@pytest.fixture
+def perp_product() -> Callable[..., dict]:
+    return _perp_product
+
+
+@pytest.fixture
+def all_products_data() -> dict:
+    quote_risk = _product_risk(10**18, 10**18)
+    btc_risk = _product_risk(9 * 10**17, 95 * 10**16)
+    eth_risk = _product_risk(9 * 10**17, 95 * 10**16)
+    btc_book_info = _product_book_info(10**18, 10**15)
+    eth_book_info = _product_book_info(10**17, 10**16)
+    return {
+        "spot_products": [
+            _spot_product(0, 10**18, quote_risk, _product_book_info(0, 0)),
+            _spot_product(1, 30000 * 10**18, btc_risk, btc_book_info),
+            _spot_product(3, 2000 * 10**18, eth_risk, eth_book_info),
+        ],
+        "perp_products": [
+            _perp_product(2, 30000 * 10**18, btc_risk, btc_book_info),
+            _perp_product(4, 2000 * 10**18, eth_risk, eth_book_info),
+        ],
+    }
+
+
+@pytest.fixture
+def subaccount_info_data(senders: list[str], all_products_data: dict) -> dict:
+    return {
+        "subaccount": senders[0],
+        "exists": True,
+        "healths": [
+            {"assets": "0", "liabilities": "0", "health": "0"} for _ in range(3)
+        ],
+        "health_contributions": [],
+        "spot_count": 3,
+        "perp_count": 2,
+        "spot_balances": [
+            {
+                "product_id": product_id,
+                "lp_balance": {"amount": "0"},
+                "balance": {
+                    "amount": str(amount),
+                    "last_cumulative_multiplier_x18": "1000000000000000000",
+                },
+            }
+            for product_id, amount in [(0, 1000 * 10**18), (1, 10**18), (3, 0)]
+        ],
+        "perp_balances": [
+            {
+                "product_id": product_id,
+                "lp_balance": {"amount": "0", "last_cumulative_funding_x18": "0"},
+                "balance": {
+                    "amount": str(amount),
+                    "v_quote_balance": str(v_quote_balance),
+                    "last_cumulative_funding_x18": "0",
+                },
+            }
+            for product_id, amount, v_quote_balance in [
+                (2, 0, 0),
+                (4, -2 * 10**18, 4100 * 10**18),
+            ]
+        ],
+        **all_products_data,
+    }
+
+
+@pytest.fixture
+def mock_subaccount_info_response(
+    mock_post: MagicMock, subaccount_info_data: dict
+) -> MagicMock:
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {
+        "status": "success",
+        "data": subaccount_info_data,
+    }
+    mock_post.return_value = mock_response
+    return mock_post
+
+
+def _product_balance(
+    product_type: str, product_id: int, amount: int, v_quote_balance: int
+) -> dict:
+    if product_type == "spot":
+        return {
+            "spot": {
+                "product_id": product_id,
+                "lp_balance": {"amount": "0"},
+                "balance": {
+                    "amount": str(amount),
+                    "last_cumulative_multiplier_x18": "1000000000000000000",
+                },
+            }
+        }
+    return {
+        "perp": {
+            "product_id": product_id,
+            "lp_balance": {"amount": "0", "last_cumulative_funding_x18": "0"},
+            "balance": {
+                "amount": str(amount),
+                "v_quote_balance": str(v_quote_balance),
+                "last_cumulative_funding_x18": "0",
+            },
+        }
+    }
+
+
+@pytest.fixture
+def indexer_event(senders: list[str], all_products_data: dict) -> Callable[..., dict]:
+    products = {
+        **{p["product_id"]: ("spot", p) for p in all_products_data["spot_products"]},
+        **{p["product_id"]: ("perp", p) for p in all_products_data["perp_products"]},
+    }
+
+    def build(
+        submission_idx: int,
+        product_id: int,
+        event_type: str = "match_orders",
+        amount: int = 0,
+        v_quote_balance: int = 0,
+        pre_amount: int = 0,
+        pre_v_quote_balance: int = 0,
+        oracle_price_x18: Optional[int] = None,
+        timestamp: Optional[int] = None,
+        isolated: bool = False,
+        **tracked: int,
+    ) -> dict:
+        product_type, product = products[product_id]
+        if oracle_price_x18 is not None:
+            product = dict(product, oracle_price_x18=str(oracle_price_x18))
+        tracked_fields = [
+            f"net_{kind}_{period}"
+            for kind in ["interest", "funding", "entry", "entry_lp"]
+            for period in ["unrealized", "cumulative"]
+        ]
+        return {
+            "submission_idx": str(submission_idx),
+            "timestamp": str(
+                timestamp if timestamp is not None else 1700000000 + submission_idx
+            ),
+            "subaccount": senders[0],
+            "product_id": product_id,
+            "event_type": event_type,
+            "product": {product_type: product},
+            "pre_balance": _product_balance(
+                product_type, product_id, pre_amount, pre_v_quote_balance
+            ),
+            "post_balance": _product_balance(
+                product_type, product_id, amount, v_quote_balance
+            ),
+            "isolated": isolated,
+            "isolated_product_id": None,
+            **{field: str(tracked.get(field, 0)) for field in tracked_fields},
+        }
+
+    return build
+
+
+@pytest.fixture
+def indexer_match() -> Callable[..., dict]:
+    def build(
+        submission_idx: int,
+        digest: Optional[str] = None,
+        sender: str = "xxx",
+        base_filled: int = 1,
+        quote_filled: Optional[int] = None,
+        fee: int = 0,
+        price_x18: int = 1,
+        amount: Optional[int] = None,
+        expiration: int = 0,
+        nonce: int = 0,
+        timestamp: Optional[int] = None,
+        isolated: bool = False,
+    ) -> dict:
+        # as returned by the indexer, matches are timed by their tx unless `timestamp` is set
+        quote_filled = quote_filled if quote_filled is not None else -base_filled
+        match = {
+            "submission_idx": str(submission_idx),
+            "digest": digest if digest is not None else f"0x{submission_idx:064x}",
+            "base_filled": str(base_filled),
+            "quote_filled": str(quote_filled),
+            "fee": str(fee),
+            "order": {
+                "sender": sender,
+                "priceX18": str(price_x18),
+                "amount": str(amount if amount is not None else base_filled),
+                "expiration": str(expiration),
+                "nonce": str(nonce),
+            },
+            "cumulative_fee": str(fee),
+            "cumulative_base_filled": str(base_filled),
+            "cumulative_quote_filled": str(quote_filled),
+            "isolated": isolated,
+        }
+        if timestamp is not None:
+            match["timestamp"] = str(timestamp)
+        return match
+
+    return build
+
+
+@pytest.fixture
+def indexer_tx() -> Callable[..., dict]:
+    def signed_order(sender: str, nonce: int) -> dict:
+        return {
+            "order": {
+                "sender": sender,
+                "priceX18": "1",
+                "amount": "1",
+                "expiration": "0",
+                "nonce": str(nonce),
+            },
+            "signature": "0x",
+        }
+
+    def build(
+        submission_idx: int,
+        timestamp: Optional[int] = None,
+        product_id: Optional[int] = None,
+        taker: str = "xxx",
+        maker: Optional[str] = None,
+        taker_nonce: int = 0,
+    ) -> dict:
+        # a `match_orders` tx when `product_id` is set
+        tx = (
+            {
+                "match_orders": {
+                    "product_id": product_id,
+                    "amm": False,
+                    "taker": signed_order(taker, taker_nonce),
+                    "maker": signed_order(maker or taker, 0),
+                }
+            }
+            if product_id is not None
+            else {}
+        )
+        return {
+            "submission_idx": str(submission_idx),
+            "timestamp": str(
+                timestamp if timestamp is not None else 1700000000 + submission_idx
+            ),
+            "tx": tx,
+        }
+
+    return build
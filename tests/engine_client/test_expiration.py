@@ -33,6 +33,7 @@ def test_reduce_only():
     non_reduced_only_expiration = get_expiration_timestamp(OrderType.FOK, unix_epoch)
 
     assert is_reduce_only(reduced_only_expiration)
+    assert decode_expiration(reduced_only_expiration) == (OrderType.FOK, unix_epoch)
     assert not is_reduce_only(non_reduced_only_expiration)
     assert not is_reduce_only(
         get_expiration_timestamp(OrderType.FOK, unix_epoch, bool(None))
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from vertex_protocol.engine_client import EngineQueryClient, FeeEstimator, FeeSchedule
+from vertex_protocol.engine_client.types.query import FeeRatesData
+from vertex_protocol.utils.ladder import build_ladder_levels
+from vertex_protocol.utils.math import to_x18
+
+
+@pytest.fixture
+def fee_rates() -> FeeRatesData:
+    return FeeRatesData(
+        taker_fee_rates_x18=["0", str(to_x18(0.0003)), str(to_x18(0.0002))],
+        maker_fee_rates_x18=["0", "0", str(to_x18(-0.0001))],
+        liquidation_sequencer_fee=str(to_x18(0.25)),
+        health_check_sequencer_fee=str(to_x18(0.1)),
+        taker_sequencer_fee=str(to_x18(0.05)),
+        withdraw_sequencer_fees=[str(to_x18(1)), str(to_x18(0.00004))],
+    )
+
+
+def test_fee_schedule(fee_rates: FeeRatesData):
+    schedule = FeeSchedule(fee_rates)
+
+    # 0.5 * 30000 * 0.0002 + sequencer fee
+    assert schedule.estimate_order_fee(2, to_x18(30000), to_x18(-0.5)) == to_x18(3.05)
+    # maker rebates
+    assert schedule.estimate_order_fee(
+        2, to_x18(30000), to_x18(0.5), is_taker=False
+    ) == to_x18(-1.5)
+    assert schedule.fee_adjusted_price_x18(1, to_x18(30000), is_bid=True) == to_x18(
+        30009
+    )
+    assert schedule.fee_adjusted_price_x18(1, to_x18(30000), is_bid=False) == to_x18(
+        29991
+    )
+    assert schedule.withdraw_fee(1) == to_x18(0.00004)
+
+    levels = build_ladder_levels(
+        [30000.0, 29999.5, 29998.0],
+        [0.5, 0.25, -1.0],
+        price_increment_x18=to_x18(1),
+        size_increment=to_x18(0.001),
+        min_size=to_x18(10),
+    )
+    for is_taker in [True, False]:
+        assert schedule.estimate_ladder_fees(2, levels, is_taker) == [
+            schedule.estimate_order_fee(2, price_x18, amount, is_taker)
+            for price_x18, amount in levels
+        ]
+
+    estimates = schedule.estimate_fees(2, [30000.0, 29000.0], [0.5, -1.0])
+    assert estimates.typecode == "d"
+    assert list(estimates) == pytest.approx([3.05, 5.85])
+
+    with pytest.raises(ValueError, match="Invalid product id"):
+        schedule.fee_rate_x18(3, is_taker=True)
+    with pytest.raises(ValueError, match="Invalid product id"):
+        schedule.withdraw_fee(2)
+
+    # products listed after the rates were fetched use the registry's default rates
+    registry = MagicMock()
+    registry.get.return_value = SimpleNamespace(
+        taker_fee_rate_x18=to_x18(0.0005), maker_fee_rate_x18=None
+    )
+    schedule = FeeSchedule(fee_rates, registry)
+    assert schedule.fee_rate_x18(3, is_taker=True) == to_x18(0.0005)
+    with pytest.raises(ValueError, match="Invalid product id"):
+        schedule.fee_rate_x18(3, is_taker=False)
+
+
+def test_fee_estimator(fee_rates: FeeRatesData, senders: list[str]):
+    client = MagicMock(spec=EngineQueryClient)
+    client.get_fee_rates.return_value = fee_rates
+    estimator = FeeEstimator(client, ttl=60)
+
+    with patch("vertex_protocol.engine_client.fees.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 1000.0
+        schedule = estimator.get(senders[0])
+        assert estimator.get(senders[0].upper().replace("0X", "0x")) is schedule
+        assert estimator.estimate_order_fee(
+            senders[0], 2, to_x18(30000), to_x18(0.5)
+        ) == to_x18(3.05)
+        assert estimator.estimate_ladder_fees(
+            senders[0], 2, [(to_x18(30000), to_x18(0.5))]
+        ) == [to_x18(-1.5)]
+        assert client.get_fee_rates.call_count == 1
+
+        estimator.get(senders[1])
+        assert client.get_fee_rates.call_count == 2
+
+        # expired rates are fetched again
+        mock_monotonic.return_value = 1060.0
+        assert estimator.get(senders[0]) is not schedule
+        assert client.get_fee_rates.call_count == 3
+
+        estimator.invalidate(senders[0])
+        estimator.get(senders[0])
+        estimator.get(senders[1])
+        assert client.get_fee_rates.call_count == 5
+
+        estimator.invalidate()
+        estimator.get(senders[1])
+        assert client.get_fee_rates.call_count == 6
+
+    with pytest.raises(ValueError, match="Invalid ttl"):
+        FeeEstimator(client, ttl=-1)
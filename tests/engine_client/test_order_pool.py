@@ -0,0 +1,110 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from vertex_protocol.engine_client import EngineClient, PresignedOrderPool
+from vertex_protocol.engine_client.types.execute import PlaceOrderRequest
+from vertex_protocol.utils.expiration import OrderType, decode_expiration
+from vertex_protocol.utils.math import to_x18
+from vertex_protocol.utils.time import now_in_millis
+
+
+def _mock_success(mock_post: MagicMock):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"status": "success", "signature": "0x"}
+    mock_post.return_value = response
+
+
+def _wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_presigned_order_pool(
+    engine_client: EngineClient, mock_post: MagicMock, senders: list[str]
+):
+    _mock_success(mock_post)
+    pool = PresignedOrderPool(engine_client)
+    prices = [to_x18(29990), to_x18(30000)]
+    amounts = [to_x18(0.1), -to_x18(0.1)]
+
+    assert pool.add_grid(2, senders[0], prices, amounts) == 4
+    assert len(pool) == 4
+    assert pool.stats.signed == 4
+
+    order = pool.take(2, prices[0], amounts[1])
+    assert order is not None
+    request = PlaceOrderRequest.parse_obj(order.payload).place_order
+    assert request.product_id == 2
+    assert int(request.order.priceX18) == prices[0]
+    assert int(request.order.amount) == amounts[1]
+    assert decode_expiration(int(request.order.expiration))[0] == OrderType.IOC
+    assert order.valid_until == int(request.order.nonce) >> 20
+    assert order.valid_until > now_in_millis(60)
+
+    # taken orders are signed again in the background, with a fresh nonce
+    _wait_for(lambda: len(pool) == 4)
+    assert pool.take(2, prices[0], amounts[1]).payload != order.payload
+
+    # sending a ready order is a single request
+    _wait_for(lambda: len(pool) == 4)
+    with patch.object(pool, "_schedule"), patch.object(
+        engine_client, "sign_order", side_effect=AssertionError
+    ):
+        pool.send(2, prices[1], amounts[0])
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs["json"]["place_order"]["order"][
+        "priceX18"
+    ] == str(prices[1])
+
+    # orders missing from the pool are signed on the spot
+    with patch.object(pool, "_schedule"):
+        pool.take(2, prices[1], amounts[1])
+        pool.send(2, prices[1], amounts[1])
+    assert pool.stats.hits == 1
+    assert pool.stats.misses == 1
+    with pytest.raises(ValueError, match="Invalid order"):
+        pool.send(2, to_x18(1), amounts[0])
+
+    # stale orders are never sent
+    with patch(
+        "vertex_protocol.engine_client.order_pool.now_in_millis",
+        return_value=order.valid_until,
+    ):
+        assert pool.take(2, prices[0], amounts[0]) is None
+
+    pool.remove_grid(2)
+    assert len(pool) == 0
+    assert pool.take(2, prices[0], amounts[0]) is None
+    pool.stop()
+
+
+def test_presigned_order_pool_refresh(engine_client: EngineClient, senders: list[str]):
+    with pytest.raises(ValueError, match="Invalid refresh margin"):
+        PresignedOrderPool(engine_client, expiration=10, refresh_margin=10)
+
+    # orders are signed with a 90s `recv_time`, so they are always within the margin
+    with PresignedOrderPool(
+        engine_client, refresh_margin=100, refresh_interval=0.01
+    ) as pool:
+        pool.add_grid(1, senders[0], [to_x18(30000)], [to_x18(0.1)])
+        _wait_for(lambda: pool.stats.signed >= 3)
+        assert len(pool) == 1
+
+    # a stopped pool can be started again
+    with pool:
+        pool.take(1, to_x18(30000), to_x18(0.1))
+        _wait_for(lambda: len(pool) == 1)
+    assert pool.add_grid(1, senders[0], [to_x18(29000)], [to_x18(0.1)]) == 1
+    pool.stop()
+
+    pool = PresignedOrderPool(engine_client)
+    pool.add_grid(1, senders[0], [to_x18(30000)], [to_x18(0.1)])
+    assert pool.refresh() == 0
+    pool.take(1, to_x18(30000), to_x18(0.1))
+    _wait_for(lambda: len(pool) == 1)
+    pool.stop()
@@ -0,0 +1,135 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from vertex_protocol.engine_client import EngineClient
+from vertex_protocol.engine_client.types.execute import (
+    PlaceOrderRequest,
+    PlaceSmartMarketOrderParams,
+)
+from vertex_protocol.engine_client.types.query import MarketLiquidityData
+from vertex_protocol.utils.exceptions import InsufficientLiquidityException
+from vertex_protocol.utils.expiration import OrderType, decode_expiration
+from vertex_protocol.utils.fixed import X18
+from vertex_protocol.utils.market_impact import (
+    estimate_market_impact,
+    slice_market_order,
+)
+from vertex_protocol.utils.math import to_x18
+
+
+def _levels(levels: list[tuple[float, float]]) -> list[list[str]]:
+    return [[str(to_x18(price)), str(to_x18(size))] for price, size in levels]
+
+
+@pytest.fixture
+def liquidity() -> MarketLiquidityData:
+    return MarketLiquidityData(
+        bids=_levels([(29990, 1), (29980, 2), (29950, 4), (29000, 10)]),
+        asks=_levels([(30010, 1), (30020, 2), (30050, 4), (31000, 10)]),
+        timestamp="0",
+    )
+
+
+def test_estimate_market_impact(liquidity: MarketLiquidityData):
+    impact = estimate_market_impact(liquidity.bids, liquidity.asks, to_x18(2))
+    assert impact.is_fully_fillable
+    assert impact.top_price_x18 == to_x18(30010)
+    assert impact.avg_price_x18 == to_x18(30015)
+    assert impact.worst_price_x18 == to_x18(30020)
+    assert impact.levels == 2
+    assert impact.impact_x18 == 5 * X18 // 30010
+
+    # levels beyond the slippage bound are never taken from
+    impact = estimate_market_impact(liquidity.bids, liquidity.asks, -to_x18(10))
+    assert not impact.is_fully_fillable
+    assert impact.fillable_amount == -to_x18(7)
+    assert impact.worst_price_x18 == to_x18(29950)
+    assert impact.limit_price_x18 == to_x18(29990 * 0.995)
+
+    assert slice_market_order(
+        liquidity.bids, liquidity.asks, to_x18(6), max_child_orders=3
+    ) == [(to_x18(30020), to_x18(3)), (to_x18(30050), to_x18(3))]
+    assert slice_market_order(
+        liquidity.bids, liquidity.asks, -to_x18(20), max_child_orders=10
+    ) == [
+        (to_x18(29990), -to_x18(1)),
+        (to_x18(29980), -to_x18(2)),
+        (to_x18(29950), -to_x18(4)),
+    ]
+
+    with pytest.raises(ValueError, match="Invalid max child orders"):
+        slice_market_order(liquidity.bids, liquidity.asks, to_x18(1), 0.005, 0)
+    with pytest.raises(ValueError, match="Invalid book"):
+        estimate_market_impact(liquidity.bids, [], to_x18(1))
+
+
+def test_place_smart_market_order(
+    engine_client: EngineClient,
+    mock_post: MagicMock,
+    liquidity: MarketLiquidityData,
+    senders: list[str],
+):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"status": "success", "signature": "0x"}
+    mock_post.return_value = response
+
+    def placed_orders() -> list:
+        return [
+            PlaceOrderRequest(**call.kwargs["json"]).place_order.order
+            for call in mock_post.call_args_list
+        ]
+
+    with patch.object(
+        engine_client._querier, "get_market_liquidity", return_value=liquidity
+    ) as mock_liquidity:
+        # a single FOK order limited at the last level it takes from
+        res = engine_client.place_smart_market_order(
+            PlaceSmartMarketOrderParams(
+                product_id=2,
+                market_order={"sender": senders[0], "amount": to_x18(2)},
+            )
+        )
+        assert res.impact.avg_price_x18 == to_x18(30015)
+        assert len(res.responses) == 1
+        [order] = placed_orders()
+        assert int(order.priceX18) == to_x18(30020)
+        assert int(order.amount) == to_x18(2)
+        assert decode_expiration(int(order.expiration))[0] == OrderType.FOK
+
+        # orders the book can't fill within slippage are rejected before signing
+        with pytest.raises(InsufficientLiquidityException):
+            engine_client.place_smart_market_order(
+                PlaceSmartMarketOrderParams(
+                    product_id=2,
+                    market_order={"sender": senders[0], "amount": -to_x18(10)},
+                )
+            )
+        assert mock_post.call_count == 1
+
+        # or split into IOC child orders sized to the book
+        mock_post.reset_mock()
+        res = engine_client.place_smart_market_order(
+            PlaceSmartMarketOrderParams(
+                product_id=2,
+                market_order={"sender": senders[0], "amount": -to_x18(10)},
+                depth=10,
+                max_child_orders=3,
+                allow_partial=True,
+            )
+        )
+        assert res.impact.fillable_amount == -to_x18(7)
+        orders = placed_orders()
+        assert [(int(o.priceX18), int(o.amount)) for o in orders] == [
+            (to_x18(29980), -to_x18(3)),
+            (to_x18(29950), -to_x18(4)),
+        ]
+        assert len({o.nonce for o in orders}) == len(orders)
+        assert all(
+            decode_expiration(int(o.expiration))[0] == OrderType.IOC for o in orders
+        )
+
+        # the book is fetched once per order
+        assert mock_liquidity.call_count == 3
+        assert mock_liquidity.call_args.args == (2, 10)
@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.engine_client import EngineClient
+from vertex_protocol.engine_client.types.models import (
+    PerpProduct,
+    PerpProductBalance,
+    SpotProduct,
+    SpotProductBalance,
+)
+from vertex_protocol.engine_client.types.query import (
+    AllProductsData,
+    SubaccountInfoData,
+)
+
+
+def test_subaccount_info_lookups(subaccount_info_data: dict):
+    info = SubaccountInfoData.parse_obj(subaccount_info_data)
+
+    balance = info.parse_subaccount_balance(1)
+    assert isinstance(balance, SpotProductBalance)
+    assert balance.balance.amount == str(10**18)
+    assert isinstance(info.parse_subaccount_balance(4), PerpProductBalance)
+
+    product = info.parse_subaccount_product(4)
+    assert isinstance(product, PerpProduct)
+    assert product.oracle_price_x18 == str(2000 * 10**18)
+
+    position = info.parse_subaccount_position(4)
+    assert position.balance == info.parse_subaccount_balance(4)
+    assert position.product == product
+
+    for lookup in [
+        info.parse_subaccount_balance,
+        info.parse_subaccount_product,
+        info.parse_subaccount_position,
+    ]:
+        with pytest.raises(ValueError, match="Invalid product id provided: 5"):
+            lookup(5)
+
+    # indexes are not part of the model's data
+    assert info == SubaccountInfoData.parse_obj(subaccount_info_data)
+    assert "_balances_by_product_id" not in info.dict()
+
+
+def test_all_products_lookups(all_products_data: dict):
+    all_products = AllProductsData.parse_obj(all_products_data)
+
+    for product in all_products.spot_products:
+        assert all_products.get_product(product.product_id) is product
+        assert isinstance(product, SpotProduct)
+    for product in all_products.perp_products:
+        assert all_products.get_product(product.product_id) is product
+
+    with pytest.raises(ValueError, match="Invalid product id provided: 5"):
+        all_products.get_product(5)
+
+
+def test_get_subaccount_product_position(
+    engine_client: EngineClient,
+    senders: list[str],
+    mock_subaccount_info_response: MagicMock,
+):
+    position = engine_client._querier._get_subaccount_product_position(senders[0], 2)
+    assert position.balance.product_id == position.product.product_id == 2
+    assert isinstance(position.product, PerpProduct)
+
+    with pytest.raises(Exception, match="Invalid product id provided 5"):
+        engine_client._querier._get_subaccount_product_position(senders[0], 5)
+
+    # a summary the caller already has is reused instead of queried again
+    summary = engine_client.get_subaccount_info(senders[0])
+    calls = mock_subaccount_info_response.call_count
+    for product_id in [0, 1, 2, 3, 4]:
+        position = engine_client._querier._get_subaccount_product_position(
+            senders[0], product_id, summary
+        )
+        assert position.product == summary.parse_subaccount_product(product_id)
+    assert mock_subaccount_info_response.call_count == calls
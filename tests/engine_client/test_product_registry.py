@@ -0,0 +1,148 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.engine_client import EngineQueryClient, ProductRegistry
+from vertex_protocol.engine_client.types.models import MarketType
+from vertex_protocol.engine_client.types.query import (
+    AllProductsData,
+    ContractsData,
+    HealthGroupsData,
+    SymbolsData,
+)
+
+
+def _symbol(product_id: int, symbol: str, product_type: str) -> dict:
+    return {
+        "type": product_type,
+        "product_id": str(product_id),
+        "symbol": symbol,
+        "price_increment_x18": "1000000000000000000",
+        "size_increment": "1000000000000000",
+        "min_size": "10000000000000000000",
+        "min_depth_x18": "0",
+        "max_spread_rate_x18": "0",
+        "maker_fee_rate_x18": "0",
+        "taker_fee_rate_x18": str(product_id * 10**14),
+        "long_weight_initial_x18": "900000000000000000",
+        "long_weight_maintenance_x18": "950000000000000000",
+    }
+
+
+@pytest.fixture
+def registry_client(all_products_data: dict, book_addrs: list[str]) -> MagicMock:
+    client = MagicMock(spec=EngineQueryClient)
+    client.get_all_products.return_value = AllProductsData.parse_obj(all_products_data)
+    client.get_symbols.return_value = SymbolsData.parse_obj(
+        {
+            "symbols": {
+                symbol: _symbol(product_id, symbol, product_type)
+                for product_id, symbol, product_type in [
+                    (0, "USDC", "spot"),
+                    (1, "BTC", "spot"),
+                    (2, "BTC-PERP", "perp"),
+                    (3, "ETH", "spot"),
+                    (4, "ETH-PERP", "perp"),
+                ]
+            }
+        }
+    )
+    client.get_assets.return_value = [
+        {
+            "product_id": product_id,
+            "ticker_id": ticker_id,
+            "market_type": market_type,
+            "name": name,
+            "symbol": name,
+            "maker_fee": 0.0,
+            "taker_fee": 0.0002,
+            "can_withdraw": True,
+            "can_deposit": True,
+        }
+        for product_id, ticker_id, market_type, name in [
+            (0, None, None, "USDC"),
+            (1, "BTC_USDC", "spot", "BTC"),
+            (2, "BTC-PERP_USDC", "perp", "BTC-PERP"),
+            (3, "ETH_USDC", "spot", "ETH"),
+            (4, "ETH-PERP_USDC", "perp", "ETH-PERP"),
+        ]
+    ]
+    client.get_pairs.return_value = [
+        {"ticker_id": "BTC_USDC", "base": "BTC", "quote": "USDC"},
+        {"ticker_id": "BTC-PERP_USDC", "base": "BTC-PERP", "quote": "USDC"},
+        {"ticker_id": "ETH_USDC", "base": "ETH", "quote": "USDC"},
+        {"ticker_id": "ETH-PERP_USDC", "base": "ETH-PERP", "quote": "USDC"},
+    ]
+    client.get_contracts.return_value = ContractsData(
+        chain_id="421613",
+        endpoint_addr="0x0000000000000000000000000000000000000000",
+        book_addrs=book_addrs,
+    )
+    client.get_health_groups.return_value = HealthGroupsData(
+        health_groups=[[1, 2], [3, 4]]
+    )
+    return client
+
+
+def test_product_registry_lookups(registry_client: MagicMock, book_addrs: list[str]):
+    registry = ProductRegistry(registry_client)
+
+    assert registry.product_ids == [0, 1, 2, 3, 4]
+    assert registry.spot_product_ids == [0, 1, 3]
+    assert registry.perp_product_ids == [2, 4]
+
+    btc_perp = registry.get(2)
+    assert btc_perp.market_type == MarketType.PERP
+    assert btc_perp.symbol == "BTC-PERP"
+    assert btc_perp.ticker_id == "BTC-PERP_USDC"
+    assert (btc_perp.base, btc_perp.quote) == ("BTC-PERP", "USDC")
+    assert btc_perp.book_addr == book_addrs[2]
+    assert btc_perp.health_group == 0
+    assert btc_perp.price_increment_x18 == 10**18
+    assert btc_perp.size_increment == 10**15
+    assert btc_perp.min_size == 10 * 10**18
+    assert btc_perp.taker_fee_rate_x18 == 2 * 10**14
+    assert btc_perp.risk.long_weight_initial_x18 == str(9 * 10**17)
+
+    assert registry.get_by_symbol("BTC-PERP") is btc_perp
+    assert registry.get_by_ticker_id("BTC-PERP_USDC") is btc_perp
+    assert registry.get_by_book_addr(book_addrs[2].upper()) is btc_perp
+    assert registry.get_health_group_products(4) == [3, 4]
+    assert registry.get_health_group_products(0) == []
+    assert registry.get(0).ticker_id is None
+
+    with pytest.raises(ValueError, match="Invalid product id"):
+        registry.get(5)
+    with pytest.raises(ValueError, match="Invalid symbol"):
+        registry.get_by_symbol("DOGE")
+    with pytest.raises(ValueError, match="Invalid ticker id"):
+        registry.get_by_ticker_id("DOGE_USDC")
+
+
+def test_product_registry_refresh(registry_client: MagicMock, all_products_data: dict):
+    registry = ProductRegistry(registry_client)
+    eth = registry.get(3)
+    assert registry_client.get_assets.call_count == 1
+
+    # products and symbols are refreshed, listing metadata is only re-fetched for new products
+    btc_perp = all_products_data["perp_products"][0]
+    btc_perp["book_info"] = dict(btc_perp["book_info"], size_increment=str(10**16))
+    registry_client.get_all_products.return_value = AllProductsData.parse_obj(
+        all_products_data
+    )
+    registry.refresh()
+    assert registry_client.get_all_products.call_count == 2
+    assert registry_client.get_assets.call_count == 1
+    assert registry.get(2).size_increment == 10**16
+    assert registry.get(1).size_increment == 10**15
+    assert registry.get(3) is eth
+
+    new_product = dict(all_products_data["perp_products"][1], product_id=6)
+    all_products_data["perp_products"].append(new_product)
+    registry_client.get_all_products.return_value = AllProductsData.parse_obj(
+        all_products_data
+    )
+    registry.refresh()
+    assert registry_client.get_assets.call_count == 2
+    assert registry.perp_product_ids == [2, 4, 6]
+    assert registry.get(6).symbol is None
@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerBackfill, IndexerClient
+from vertex_protocol.indexer_client.types.query import (
+    IndexerEventsParams,
+    IndexerMatchesParams,
+)
+from vertex_protocol.utils.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def timestamps() -> dict[int, int]:
+    rng = random.Random(35)
+    timestamps = {}
+    timestamp = 1000
+    for submission_idx in range(1, 400):
+        # several submissions can share a second
+        timestamp += rng.choice([0, 0, 1, 3])
+        timestamps[submission_idx] = timestamp
+    return timestamps
+
+
+@pytest.fixture
+def matches(
+    timestamps: dict[int, int], indexer_match: Callable[..., dict]
+) -> list[dict]:
+    rng = random.Random(36)
+    matches = []
+    for submission_idx in timestamps:
+        # several fills can share a submission
+        for fill in range(rng.choice([1, 1, 1, 2, 5])):
+            matches.append(indexer_match(submission_idx, f"{submission_idx}-{fill}"))
+    return matches[::-1]
+
+
+def _match_time(match: dict, timestamps: dict[int, int]) -> int:
+    return timestamps[int(match["submission_idx"])]
+
+
+@pytest.fixture
+def mock_matches_backend(
+    mock_post: MagicMock, matches: list[dict], timestamps: dict[int, int]
+) -> MagicMock:
+    lock = threading.Lock()
+    max_times = []
+
+    def post(url: str, json: dict):
+        params = json["matches"]
+        with lock:
+            max_times.append(params.get("max_time"))
+        rows = [
+            match
+            for match in matches
+            if (
+                params.get("idx") is None
+                or int(match["submission_idx"]) <= params["idx"]
+            )
+            and (
+                params.get("max_time") is None
+                or _match_time(match, timestamps) <= params["max_time"]
+            )
+        ][: params["limit"]]
+        idxs = sorted({int(match["submission_idx"]) for match in rows}, reverse=True)
+        txs = [
+            {"submission_idx": str(idx), "timestamp": str(timestamps[idx]), "tx": {}}
+            for idx in idxs
+        ]
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"matches": rows, "txs": txs}
+        return response
+
+    mock_post.side_effect = post
+    mock_post.max_times = max_times
+    return mock_post
+
+
+@pytest.mark.parametrize("shard_seconds", [None, 1, 7, 50, 10000])
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_backfill_matches(
+    url: str,
+    matches: list[dict],
+    timestamps: dict[int, int],
+    mock_matches_backend: MagicMock,
+    shard_seconds: int,
+    max_workers: int,
+):
+    backfill = IndexerBackfill(IndexerClient({"url": url}), max_workers=max_workers)
+    start_time, end_time = 1100, 1500
+
+    rows = list(
+        backfill.matches(
+            IndexerMatchesParams(subaccount="xxx"),
+            start_time,
+            end_time,
+            shard_seconds=shard_seconds,
+            page_size=4,
+        )
+    )
+
+    expected = [
+        match["digest"]
+        for match in matches
+        if start_time <= _match_time(match, timestamps) <= end_time
+    ]
+    assert [row.digest for row in rows] == expected
+    assert len(set(expected)) == len(expected)
+    assert max(mock_matches_backend.max_times) == end_time
+
+
+def test_backfill_is_bounded(
+    url: str, timestamps: dict[int, int], mock_matches_backend: MagicMock
+):
+    backfill = IndexerBackfill(IndexerClient({"url": url}), max_workers=2)
+
+    end_time = max(timestamps.values())
+    rows = backfill.matches(IndexerMatchesParams(), 1000, end_time, shard_seconds=10)
+    next(rows)
+    rows.close()
+    # only the shards in flight were queried
+    assert len(set(mock_matches_backend.max_times)) <= 3
+
+
+def test_backfill_streams_shards(
+    url: str, timestamps: dict[int, int], mock_matches_backend: MagicMock
+):
+    backfill = IndexerBackfill(IndexerClient({"url": url}), max_workers=1)
+    rows = backfill.matches(
+        IndexerMatchesParams(), 1000, max(timestamps.values()), shard_seconds=10000
+    )
+    next(rows)
+    time.sleep(0.1)
+    # the single shard is consumed as it is paginated, a few pages ahead at most
+    assert 0 < mock_matches_backend.call_count <= 4
+    rows.close()
+
+
+def test_backfill_events_limits_raw_events(mock_post: MagicMock, url: str):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"events": [], "txs": []}
+    mock_post.return_value = response
+    backfill = IndexerBackfill(IndexerClient({"url": url}))
+
+    assert list(backfill.events(IndexerEventsParams(), 0, 100, page_size=5)) == []
+    # the range is split into 15 shards of 7 seconds
+    assert mock_post.call_count == 15
+    for call in mock_post.call_args_list:
+        assert call.kwargs["json"]["events"]["limit"] == {"raw": 6}
+
+
+def test_backfill_invalid_params(url: str):
+    with pytest.raises(ValueError, match="Invalid max workers"):
+        IndexerBackfill(IndexerClient({"url": url}), max_workers=0)
+    backfill = IndexerBackfill(IndexerClient({"url": url}))
+    with pytest.raises(ValueError, match="Invalid time range"):
+        backfill.matches(IndexerMatchesParams(), 10, 5)
+    with pytest.raises(ValueError, match="Invalid shard duration"):
+        backfill.matches(IndexerMatchesParams(), 0, 5, shard_seconds=0)
+
+
+def test_rate_limiter():
+    with pytest.raises(ValueError, match="Invalid rate"):
+        RateLimiter(0)
+
+    rate_limiter = RateLimiter(100, burst=5)
+    start = time.monotonic()
+    threads = [
+        threading.Thread(target=lambda: [rate_limiter.acquire() for _ in range(5)])
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # the burst goes through right away, the remaining 10 requests at 100/s
+    assert time.monotonic() - start >= 0.09
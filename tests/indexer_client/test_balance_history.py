@@ -0,0 +1,118 @@
+from typing import Callable
+
+import pytest
+
+from vertex_protocol.indexer_client import BalanceHistory
+from vertex_protocol.indexer_client.types.models import IndexerEvent, IndexerTx
+from vertex_protocol.utils.math import to_x18
+
+
+def test_balance_history_folds_events(indexer_event: Callable[..., dict]):
+    # long 1 BTC-PERP at 30000, then close at 31000
+    events = [
+        indexer_event(
+            2,
+            2,
+            amount=0,
+            v_quote_balance=0,
+            oracle_price_x18=to_x18(31000),
+            net_entry_unrealized=0,
+            net_entry_cumulative=to_x18(-1000),
+            net_funding_unrealized=0,
+            net_funding_cumulative=to_x18(-3),
+        ),
+        indexer_event(
+            1,
+            2,
+            amount=to_x18(1),
+            v_quote_balance=to_x18(-30000),
+            oracle_price_x18=to_x18(30500),
+            net_entry_unrealized=to_x18(30000),
+            net_entry_cumulative=to_x18(30000),
+            net_funding_unrealized=to_x18(-3),
+            net_funding_cumulative=to_x18(-3),
+        ),
+        indexer_event(1, 1, amount=to_x18(2), net_interest_cumulative=to_x18(1)),
+        indexer_event(1, 4, amount=to_x18(1), isolated=True),
+    ]
+    # events are timed by their tx
+    for event in events:
+        del event["timestamp"]
+    txs = [
+        {"submission_idx": str(idx), "timestamp": str(1700000000 + idx), "tx": {}}
+        for idx in [2, 1]
+    ]
+
+    history = BalanceHistory()
+    assert (
+        history.update(
+            (IndexerEvent.parse_obj(event) for event in events),
+            [IndexerTx.parse_obj(tx) for tx in txs],
+        )
+        == 3
+    )
+    assert history.product_ids == [1, 2]
+    assert history.last_submission_idx == 2
+
+    perp = history.get(2)
+    assert len(perp) == 2
+    assert list(perp.submission_idx) == [1, 2]
+    assert list(perp.timestamp) == [1700000001, 1700000002]
+    assert list(perp.amount) == [1, 0]
+    assert list(perp.v_quote_balance) == [-30000, 0]
+    assert list(perp.oracle_price) == [30500, 31000]
+    assert list(perp.realized_pnl) == [0, 1000]
+    assert list(perp.unrealized_pnl) == [500, 0]
+    assert list(perp.net_funding_cumulative) == [-3, -3]
+    assert list(perp.net_funding_unrealized) == [-3, 0]
+
+    spot = history.get(1)
+    assert list(spot.timestamp) == [1700000001]
+    assert list(spot.amount) == [2]
+    assert list(spot.net_interest_cumulative) == [1]
+
+    with pytest.raises(ValueError):
+        history.get(4)
+
+    isolated = BalanceHistory(isolated=True)
+    assert isolated.update(events, txs) == 1
+    assert isolated.product_ids == [4]
+    assert list(isolated.get(4).timestamp) == [1700000001]
+
+    # events missing their tx can't be timed
+    with pytest.raises(ValueError, match="Invalid events"):
+        BalanceHistory(isolated=True).update(events)
+
+
+def test_balance_history_incremental_updates(indexer_event: Callable[..., dict]):
+    history = BalanceHistory()
+    raw = [
+        indexer_event(idx, 2, amount=to_x18(idx), net_entry_unrealized=to_x18(idx))
+        for idx in range(1, 6)
+    ]
+    models = [IndexerEvent.parse_obj(event) for event in raw]
+
+    assert history.update(raw[:3][::-1]) == 3
+    # overlapping and already folded events are skipped
+    assert history.update(models[::-1]) == 2
+    assert history.update(raw) == 0
+
+    series = history.get(2)
+    assert list(series.submission_idx) == [1, 2, 3, 4, 5]
+    assert list(series.amount) == [1, 2, 3, 4, 5]
+    assert history.last_submission_idx == 5
+
+
+def test_balance_history_large_batches(indexer_event: Callable[..., dict]):
+    template = indexer_event(1, 2, amount=to_x18(1), net_entry_unrealized=to_x18(1))
+    n = 200_000
+    events = [
+        dict(template, submission_idx=str(n - idx), product_id=2 + 2 * (idx % 2))
+        for idx in range(n)
+    ]
+
+    history = BalanceHistory()
+    assert history.update(events) == n
+
+    assert len(history.get(2)) + len(history.get(4)) == n
+    assert list(history.get(4).submission_idx[:2]) == [1, 3]
@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.indexer_client import CandlestickStore, IndexerClient
+from vertex_protocol.indexer_client.types.models import IndexerCandlesticksGranularity
+
+
+def _candlestick(timestamp: int, close: int) -> dict:
+    return {
+        "submission_idx": str(timestamp),
+        "timestamp": str(timestamp),
+        "product_id": 1,
+        "granularity": 60,
+        "open_x18": str(close * 10**18),
+        "high_x18": str((close + 1) * 10**18),
+        "low_x18": str((close - 1) * 10**18),
+        "close_x18": str(close * 10**18),
+        "volume": str(10**18 // 2),
+    }
+
+
+@pytest.fixture
+def candlesticks() -> list[dict]:
+    # newest first, as returned by the indexer
+    return [
+        _candlestick(timestamp, timestamp // 60) for timestamp in range(6000, 0, -60)
+    ]
+
+
+@pytest.fixture
+def mock_candlesticks_backend(mock_post: MagicMock, candlesticks: list[dict]):
+    def post(url: str, json: dict):
+        params = json["candlesticks"]
+        rows = [
+            candlestick
+            for candlestick in candlesticks
+            if params.get("max_time") is None
+            or int(candlestick["timestamp"]) <= params["max_time"]
+        ]
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"candlesticks": rows[: params["limit"]]}
+        return response
+
+    mock_post.side_effect = post
+    return mock_post
+
+
+def test_candlestick_store_delta_sync(
+    url: str,
+    tmp_path,
+    candlesticks: list[dict],
+    mock_candlesticks_backend: MagicMock,
+):
+    path = str(tmp_path / "candles.db")
+    granularity = IndexerCandlesticksGranularity.ONE_MINUTE
+    store = CandlestickStore(IndexerClient({"url": url}), path)
+
+    assert store.sync(1, granularity, start_time=3000, page_size=10) == 51
+    assert store.last_timestamp(1, granularity) == 6000
+
+    # reads are served from disk
+    calls = mock_candlesticks_backend.call_count
+    stored = store.get_candlesticks(1, granularity, start_time=3600, end_time=4200)
+    assert [int(c.timestamp) for c in stored] == list(range(3600, 4201, 60))
+    assert stored[0].close_x18 == str(60 * 10**18)
+    assert store.get_candlesticks(2, granularity) == []
+    assert mock_candlesticks_backend.call_count == calls
+
+    # only bars from the last stored one onwards are fetched, and the last bar is updated
+    candlesticks[0] = _candlestick(6000, 1000)
+    candlesticks.insert(0, _candlestick(6060, 101))
+    assert store.sync(1, granularity, page_size=10) == 2
+    assert store.last_timestamp(1, granularity) == 6060
+    assert store.get_candlesticks(1, granularity, start_time=6000)[0].close_x18 == str(
+        1000 * 10**18
+    )
+    store.close()
+
+    # older bars are backfilled when an earlier start is requested
+    with CandlestickStore(IndexerClient({"url": url}), path) as store:
+        assert len(store.get_candlesticks(1, granularity)) == 52
+        assert store.sync(1, granularity, start_time=1200, page_size=10) == 30 + 1
+        assert len(store.get_candlesticks(1, granularity)) == 82
+        assert store.sync(1, granularity, start_time=1200, page_size=10) == 1
+
+
+def test_candlestick_store_columns(
+    url: str, candlesticks: list[dict], mock_candlesticks_backend: MagicMock
+):
+    granularity = IndexerCandlesticksGranularity.ONE_MINUTE
+    store = CandlestickStore(IndexerClient({"url": url}))
+    assert len(store.get_columns(1, granularity)) == 0
+
+    store.sync(1, granularity)
+    columns = store.get_columns(1, granularity, end_time=600)
+
+    assert list(columns.timestamps) == list(range(60, 601, 60))
+    assert list(columns.close) == [float(i) for i in range(1, 11)]
+    assert list(columns.high) == [float(i + 1) for i in range(1, 11)]
+    assert list(columns.low) == [float(i - 1) for i in range(1, 11)]
+    assert list(columns.volume) == [0.5] * 10
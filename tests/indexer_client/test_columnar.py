@@ -0,0 +1,215 @@
+import math
+import tracemalloc
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerClient
+from vertex_protocol.indexer_client.columnar import matches_to_columns
+from vertex_protocol.indexer_client.types.models import IndexerMarketSnapshot
+from vertex_protocol.indexer_client.types.query import (
+    IndexerCandlesticksParams,
+    IndexerMarketSnapshotsData,
+    IndexerMarketSnapshotsParams,
+    IndexerMatchesData,
+    IndexerMatchesParams,
+    IndexerProductSnapshotsData,
+    IndexerProductSnapshotsParams,
+)
+
+
+def _match(indexer_match: Callable[..., dict], i: int) -> dict:
+    return indexer_match(
+        100000 - i,
+        f"0x{i:064x}",
+        sender=f"0x{i % 5:064x}",
+        base_filled=(i % 7 - 3) * 10**17,
+        quote_filled=-(i % 7 - 3) * 2000 * 10**17,
+        fee=i * 10**12,
+        price_x18=(2000 + i % 100) * 10**18,
+        expiration=4611686020107119633,
+        nonce=i,
+        isolated=i % 2 == 0,
+    )
+
+
+def _mock_response(mock_post: MagicMock, data):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = data
+    mock_post.return_value = response
+
+
+def test_matches_columns(
+    mock_post: MagicMock,
+    url: str,
+    indexer_match: Callable[..., dict],
+    indexer_tx: Callable[..., dict],
+):
+    indexer_client = IndexerClient({"url": url})
+    _mock_response(
+        mock_post,
+        {
+            "matches": [_match(indexer_match, i) for i in range(10)],
+            "txs": [indexer_tx(100000 - i, 1700000000 - i) for i in range(9)],
+        },
+    )
+
+    columns = indexer_client.get_matches_columns(IndexerMatchesParams(subaccount="x"))
+    matches = indexer_client.get_matches(IndexerMatchesParams(subaccount="x")).matches
+
+    assert list(columns["submission_idx"]) == [int(m.submission_idx) for m in matches]
+    # matches are timed by their tx, -1 when it is missing
+    assert list(columns["timestamp"]) == [1700000000 - i for i in range(9)] + [-1]
+    assert columns["digest"] == [m.digest for m in matches]
+    assert columns["sender"] == [m.order.sender for m in matches]
+    assert list(columns["price"]) == [int(m.order.priceX18) / 1e18 for m in matches]
+    assert list(columns["base_filled"]) == [int(m.base_filled) / 1e18 for m in matches]
+    assert list(columns["fee"]) == [int(m.fee) / 1e18 for m in matches]
+    assert list(columns["isolated"]) == [m.isolated for m in matches]
+
+
+def test_candlesticks_columns(mock_post: MagicMock, url: str):
+    indexer_client = IndexerClient({"url": url})
+    _mock_response(
+        mock_post,
+        {
+            "candlesticks": [
+                {
+                    "submission_idx": str(timestamp),
+                    "timestamp": str(timestamp),
+                    "product_id": 1,
+                    "granularity": 60,
+                    "open_x18": str(timestamp * 10**18),
+                    "high_x18": str((timestamp + 1) * 10**18),
+                    "low_x18": str((timestamp - 1) * 10**18),
+                    "close_x18": str(timestamp * 10**18),
+                    "volume": str(10**18),
+                }
+                for timestamp in range(600, 0, -60)
+            ]
+        },
+    )
+
+    columns = indexer_client.get_candlesticks_columns(
+        IndexerCandlesticksParams(product_id=1, granularity=60)
+    )
+
+    assert list(columns.timestamps) == list(range(60, 601, 60))
+    assert list(columns.close) == [float(t) for t in range(60, 601, 60)]
+    assert list(columns.high) == [float(t + 1) for t in range(60, 601, 60)]
+    assert list(columns.volume) == [1.0] * 10
+
+
+def test_product_snapshots_columns(
+    mock_post: MagicMock, url: str, all_products_data: dict
+):
+    indexer_client = IndexerClient({"url": url})
+    spot, perp = (
+        all_products_data["spot_products"][1],
+        all_products_data["perp_products"][0],
+    )
+    data = {
+        "products": [
+            {
+                "submission_idx": "2",
+                "product_id": perp["product_id"],
+                "product": {"perp": perp},
+            },
+            {
+                "submission_idx": "1",
+                "product_id": spot["product_id"],
+                "product": {"spot": spot},
+            },
+        ],
+        "txs": [
+            {"submission_idx": "2", "timestamp": "1700000002", "tx": {}},
+            {"submission_idx": "1", "timestamp": "1700000001", "tx": {}},
+        ],
+    }
+    # the raw response is a valid product snapshots response
+    IndexerProductSnapshotsData.parse_obj(data)
+    _mock_response(mock_post, data)
+
+    columns = indexer_client.get_product_snapshots_columns(
+        IndexerProductSnapshotsParams(product_id=1)
+    )
+
+    assert list(columns["timestamp"]) == [1700000002, 1700000001]
+    assert list(columns["product_id"]) == [2, 1]
+    assert list(columns["is_perp"]) == [1, 0]
+    assert list(columns["oracle_price_x18"]) == [
+        int(perp["oracle_price_x18"]) / 1e18,
+        int(spot["oracle_price_x18"]) / 1e18,
+    ]
+    assert math.isnan(columns["total_deposits_normalized"][0])
+    assert columns["total_deposits_normalized"][1] == (
+        int(spot["state"]["total_deposits_normalized"]) / 1e18
+    )
+    assert columns["open_interest"][0] == int(perp["state"]["open_interest"]) / 1e18
+    assert math.isnan(columns["open_interest"][1])
+
+
+def test_market_snapshots_columns(mock_post: MagicMock, url: str):
+    indexer_client = IndexerClient({"url": url})
+    metrics = {
+        field: {}
+        for field, model_field in IndexerMarketSnapshot.__fields__.items()
+        if model_field.type_ is dict
+    }
+    data = {
+        "snapshots": [
+            dict(
+                metrics,
+                timestamp=1700003600,
+                cumulative_users=10,
+                daily_active_users=3,
+                tvl=str(5 * 10**18),
+                cumulative_trades={"1": 7, "2": 3},
+                open_interests={"2": str(10**18)},
+            ),
+            dict(
+                metrics,
+                timestamp=1700000000,
+                cumulative_users=9,
+                daily_active_users=2,
+                tvl=str(4 * 10**18),
+                cumulative_trades={"1": 5},
+            ),
+        ]
+    }
+    IndexerMarketSnapshotsData.parse_obj(data)
+    _mock_response(mock_post, data)
+
+    columns = indexer_client.get_market_snapshots_columns(
+        IndexerMarketSnapshotsParams(interval={"count": 2, "granularity": 3600})
+    )
+
+    assert list(columns["timestamp"]) == [1700003600, 1700000000]
+    assert list(columns["tvl"]) == [5.0, 4.0]
+    assert list(columns["cumulative_trades.1"]) == [7.0, 5.0]
+    assert columns["cumulative_trades.2"][0] == 3.0
+    assert math.isnan(columns["cumulative_trades.2"][1])
+    assert columns["open_interests.2"][0] == 1.0
+
+
+@pytest.mark.benchmark
+def test_matches_columns_memory_benchmark(indexer_match: Callable[..., dict]):
+    raw_matches = [_match(indexer_match, i) for i in range(50_000)]
+
+    def peak_memory(decode) -> int:
+        tracemalloc.start()
+        try:
+            result = decode()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        return peak
+
+    models_peak = peak_memory(
+        lambda: IndexerMatchesData.parse_obj({"matches": raw_matches, "txs": []})
+    )
+    columns_peak = peak_memory(lambda: matches_to_columns(raw_matches))
+    assert columns_peak * 3 < models_peak
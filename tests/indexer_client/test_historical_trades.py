@@ -0,0 +1,112 @@
+import threading
+from typing import Optional
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerClient
+
+
+def _trade(ticker_id: str, trade_id: int) -> dict:
+    return {
+        "ticker_id": ticker_id,
+        "trade_id": trade_id,
+        "price": 100.5 + trade_id,
+        "base_filled": 0.25 if trade_id % 2 else -0.25,
+        "quote_filled": -25.0,
+        "timestamp": 1700000000 + trade_id,
+        "trade_type": "buy" if trade_id % 2 else "sell",
+    }
+
+
+def _mock_trades(mock_get: MagicMock, num_trades: dict[str, int]) -> list[dict]:
+    requests: list[dict] = []
+    lock = threading.Lock()
+
+    def get(url):
+        query = parse_qs(urlparse(url).query)
+        ticker_id = query["ticker_id"][0]
+        limit = int(query["limit"][0])
+        max_trade_id: Optional[int] = (
+            int(query["max_trade_id"][0]) if "max_trade_id" in query else None
+        )
+        with lock:
+            requests.append(
+                {"ticker_id": ticker_id, "max_trade_id": max_trade_id, "limit": limit}
+            )
+        newest = num_trades[ticker_id]
+        if max_trade_id is not None:
+            newest = min(newest, max_trade_id)
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = [
+            _trade(ticker_id, trade_id)
+            for trade_id in range(newest, max(newest - limit, 0), -1)
+        ]
+        return response
+
+    mock_get.side_effect = get
+    return requests
+
+
+def test_iter_historical_trades(mock_get: MagicMock, url: str):
+    requests = _mock_trades(mock_get, {"BTC-PERP_USDC": 25})
+    indexer_client = IndexerClient({"url": url})
+
+    trades = list(indexer_client.iter_historical_trades("BTC-PERP_USDC", page_size=10))
+    assert [trade.trade_id for trade in trades] == list(range(25, 0, -1))
+    assert [request["max_trade_id"] for request in requests] == [None, 15, 5]
+
+    requests.clear()
+    trades = list(
+        indexer_client.iter_historical_trades(
+            "BTC-PERP_USDC",
+            page_size=10,
+            max_trade_id=22,
+            min_time=1700000008,
+            max_time=1700000020,
+            prefetch=False,
+        )
+    )
+    assert [trade.trade_id for trade in trades] == list(range(20, 7, -1))
+    # pages past `min_time` aren't fetched
+    assert [request["max_trade_id"] for request in requests] == [22, 12]
+
+
+def test_historical_trades_columns(mock_get: MagicMock, url: str):
+    _mock_trades(mock_get, {"BTC-PERP_USDC": 25})
+    indexer_client = IndexerClient({"url": url})
+
+    columns = indexer_client.get_historical_trades_columns(
+        "BTC-PERP_USDC", page_size=10, min_time=1700000003
+    )
+    trades = list(
+        indexer_client.iter_historical_trades(
+            "BTC-PERP_USDC", page_size=10, min_time=1700000003
+        )
+    )
+
+    assert list(columns["trade_id"]) == [trade.trade_id for trade in trades]
+    assert list(columns["timestamp"]) == [trade.timestamp for trade in trades]
+    assert list(columns["price"]) == [trade.price for trade in trades]
+    assert list(columns["base_filled"]) == [trade.base_filled for trade in trades]
+    assert list(columns["quote_filled"]) == [trade.quote_filled for trade in trades]
+    assert list(columns["is_buy"]) == [trade.trade_type == "buy" for trade in trades]
+
+
+def test_get_trade_tapes(mock_get: MagicMock, url: str):
+    num_trades = {"BTC-PERP_USDC": 25, "ETH-PERP_USDC": 7, "BTC_USDC": 0}
+    requests = _mock_trades(mock_get, num_trades)
+    indexer_client = IndexerClient({"url": url})
+
+    tapes = indexer_client.get_trade_tapes(list(num_trades.keys()), page_size=10)
+
+    assert list(tapes.keys()) == list(num_trades.keys())
+    for ticker_id, n in num_trades.items():
+        assert list(tapes[ticker_id]["trade_id"]) == list(range(n, 0, -1))
+    assert len(requests) == 3 + 1 + 1
+    assert indexer_client.get_trade_tapes([]) == {}
+
+    with pytest.raises(ValueError):
+        indexer_client.get_trade_tapes(list(num_trades.keys()), max_workers=0)
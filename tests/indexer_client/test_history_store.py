@@ -0,0 +1,273 @@
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerClient, SubaccountHistoryStore
+from vertex_protocol.indexer_client.types.models import IndexerEventType
+from vertex_protocol.indexer_client.types.query import (
+    IndexerEventsParams,
+    IndexerEventsTxsLimit,
+    IndexerMatchesParams,
+    IndexerSubaccountHistoricalOrdersParams,
+)
+from vertex_protocol.utils.time import now_in_seconds
+
+
+def _order(
+    sender: str,
+    submission_idx: int,
+    product_id: int,
+    isolated=False,
+    base_filled: str = "1",
+) -> dict:
+    return {
+        "submission_idx": str(submission_idx),
+        "digest": f"0x{submission_idx:064x}",
+        "base_filled": base_filled,
+        "quote_filled": "-1",
+        "fee": "0",
+        "subaccount": sender,
+        "product_id": product_id,
+        "amount": "1",
+        "price_x18": "1",
+        "expiration": str(now_in_seconds() + 3600),
+        "nonce": "0",
+        "isolated": isolated,
+    }
+
+
+def _event(indexer_event: Callable[..., dict], *args) -> dict:
+    # events are timed by their tx
+    event = indexer_event(*args)
+    del event["timestamp"]
+    return event
+
+
+def _payment(idx: int, product_id: int) -> dict:
+    return {
+        "product_id": product_id,
+        "idx": str(idx),
+        "timestamp": str(1700000000 + idx),
+        "amount": "1",
+        "balance_amount": "1",
+        "rate_x18": "1",
+        "oracle_price_x18": "1",
+    }
+
+
+@pytest.fixture
+def history(
+    senders: list[str],
+    indexer_event: Callable[..., dict],
+    indexer_match: Callable[..., dict],
+    indexer_tx: Callable[..., dict],
+) -> dict:
+    sender = senders[0]
+    return {
+        "orders": [
+            _order(sender, idx, product_id, isolated=idx == 8)
+            for idx, product_id in [(9, 2), (8, 4), (5, 2), (2, 1)]
+        ],
+        "matches": [
+            indexer_match(idx, f"0x{idx:062x}{fill:02x}", sender)
+            for idx, fill in [(9, 0), (9, 1), (5, 0), (2, 0)]
+        ],
+        "match_txs": [
+            indexer_tx(idx, product_id=product_id, taker=sender)
+            for idx, product_id in [(9, 2), (5, 2), (2, 1)]
+        ],
+        "events": [
+            _event(indexer_event, 9, 2),
+            _event(indexer_event, 9, 0),
+            _event(indexer_event, 7, 0, "deposit_collateral"),
+            _event(indexer_event, 5, 2),
+            _event(indexer_event, 5, 0),
+            _event(indexer_event, 2, 1),
+            _event(indexer_event, 2, 0),
+        ],
+        "event_txs": [indexer_tx(idx) for idx in [9, 7, 5, 2]],
+        "interest_payments": [_payment(idx, 0) for idx in [8, 6, 4, 1]],
+        "funding_payments": [_payment(idx, 2) for idx in [8, 3]],
+    }
+
+
+@pytest.fixture
+def mock_history_backend(mock_post: MagicMock, history: dict) -> MagicMock:
+    def rows_before(rows: list[dict], params: dict, idx_key="submission_idx"):
+        max_idx = params.get("idx", params.get("max_idx"))
+        return [
+            row for row in rows if max_idx is None or int(row[idx_key]) <= int(max_idx)
+        ]
+
+    def post(url: str, json: dict):
+        response = MagicMock()
+        response.status_code = 200
+        if "orders" in json and "digests" in json["orders"]:
+            digests = json["orders"]["digests"]
+            data = {"orders": [o for o in history["orders"] if o["digest"] in digests]}
+        elif "orders" in json:
+            params = json["orders"]
+            data = {"orders": rows_before(history["orders"], params)[: params["limit"]]}
+        elif "matches" in json:
+            params = json["matches"]
+            matches = rows_before(history["matches"], params)[: params["limit"]]
+            idxs = {match["submission_idx"] for match in matches}
+            txs = [tx for tx in history["match_txs"] if tx["submission_idx"] in idxs]
+            data = {"matches": matches, "txs": txs}
+        elif "events" in json:
+            params = json["events"]
+            events = rows_before(history["events"], params)[: params["limit"]["raw"]]
+            idxs = {event["submission_idx"] for event in events}
+            txs = [tx for tx in history["event_txs"] if tx["submission_idx"] in idxs]
+            data = {"events": events, "txs": txs}
+        else:
+            params = json["interest_and_funding"]
+            data = {
+                kind: rows_before(history[kind], params, "idx")[: params["limit"]]
+                for kind in ["interest_payments", "funding_payments"]
+            }
+            # continues from the newest of each kind's oldest payment
+            oldest_idxs = [int(rows[-1]["idx"]) for rows in data.values() if rows]
+            data["next_idx"] = str(max(oldest_idxs) - 1 if oldest_idxs else 0)
+        response.json.return_value = data
+        return response
+
+    mock_post.side_effect = post
+    return mock_post
+
+
+def test_history_store_sync(
+    url: str,
+    tmp_path,
+    senders: list[str],
+    history: dict,
+    indexer_event: Callable[..., dict],
+    indexer_match: Callable[..., dict],
+    indexer_tx: Callable[..., dict],
+    mock_history_backend: MagicMock,
+):
+    path = str(tmp_path / "history.db")
+    store = SubaccountHistoryStore(
+        IndexerClient({"url": url}), senders[0], path, payment_product_ids=[0, 2]
+    )
+
+    assert store.sync(page_size=2) == {
+        "orders": 4,
+        "matches": 4,
+        "events": 7,
+        "payments": 6,
+    }
+    store.close()
+
+    # only new rows are fetched
+    # order 12 is open when synced
+    history["orders"].insert(0, _order(senders[0], 12, 4, base_filled="0"))
+    history["matches"].insert(0, indexer_match(12, f"0x{12:062x}00", senders[0]))
+    history["match_txs"].insert(0, indexer_tx(12, product_id=4, taker=senders[0]))
+    history["events"][:0] = [
+        _event(indexer_event, 12, 4),
+        _event(indexer_event, 12, 0),
+    ]
+    history["event_txs"].insert(0, indexer_tx(12))
+    history["interest_payments"].insert(0, _payment(12, 0))
+    with SubaccountHistoryStore(
+        IndexerClient({"url": url}), senders[0], path, payment_product_ids=[0, 2]
+    ) as store:
+        calls = mock_history_backend.call_count
+        assert store.sync(page_size=2) == {
+            "orders": 1,
+            "matches": 1,
+            "events": 2,
+            "payments": 1,
+        }
+        # a single page per kind of row, plus the one that stops at synced rows
+        assert mock_history_backend.call_count - calls == 4
+
+        # open orders are fetched again until they can't change anymore
+        history["orders"][0] = _order(senders[0], 12, 4)
+        assert store.sync() == {"orders": 0, "matches": 0, "events": 0, "payments": 0}
+        orders = store.get_subaccount_historical_orders(
+            {"subaccount": senders[0], "submission_idx": 12, "limit": 1}
+        ).orders
+        assert orders[0].base_filled == "1"
+        calls = mock_history_backend.call_count
+        store.sync()
+        assert mock_history_backend.call_count - calls == 4
+
+        # syncing overlapping events again doesn't duplicate them
+        store._conn.execute("DELETE FROM syncs WHERE name = 'events'")
+        assert store.sync()["events"] == 9
+        assert len(store.get_events(IndexerEventsParams()).events) == 9
+
+
+def test_history_store_queries(
+    url: str, senders: list[str], history: dict, mock_history_backend: MagicMock
+):
+    store = SubaccountHistoryStore(
+        IndexerClient({"url": url}), senders[0], payment_product_ids=[0, 2]
+    )
+    store.sync(page_size=3)
+    calls = mock_history_backend.call_count
+
+    orders = store.get_subaccount_historical_orders(
+        IndexerSubaccountHistoricalOrdersParams(subaccount=senders[0], product_ids=[2])
+    ).orders
+    assert [order.submission_idx for order in orders] == ["9", "5"]
+    orders = store.get_subaccount_historical_orders(
+        IndexerSubaccountHistoricalOrdersParams(
+            subaccount=senders[0], submission_idx=8, limit=2
+        )
+    ).orders
+    assert [order.submission_idx for order in orders] == ["8", "5"]
+    orders = store.get_subaccount_historical_orders(
+        {"subaccount": senders[0], "isolated": True}
+    ).orders
+    assert [order.submission_idx for order in orders] == ["8"]
+    # orders are timed by the txs of their matches
+    orders = store.get_subaccount_historical_orders(
+        {"subaccount": senders[0], "max_time": 1700000005}
+    ).orders
+    assert [order.submission_idx for order in orders] == ["5", "2"]
+
+    matches = store.get_matches(IndexerMatchesParams(product_ids=[2]))
+    assert [match.digest for match in matches.matches] == [
+        match["digest"] for match in history["matches"][:3]
+    ]
+    assert [tx.submission_idx for tx in matches.txs] == ["9", "5"]
+    matches = store.get_matches(IndexerMatchesParams(max_time=1700000005, limit=1))
+    assert [match.submission_idx for match in matches.matches] == ["5"]
+
+    events = store.get_events(
+        IndexerEventsParams(event_types=[IndexerEventType.DEPOSIT_COLLATERAL])
+    ).events
+    assert [(e.submission_idx, e.product_id) for e in events] == [("7", 0)]
+    events = store.get_events(IndexerEventsParams(max_time=1700000005)).events
+    assert [(e.submission_idx, e.product_id) for e in events] == [
+        ("5", 2),
+        ("5", 0),
+        ("2", 1),
+        ("2", 0),
+    ]
+    events = store.get_events(
+        IndexerEventsParams(limit=IndexerEventsTxsLimit(txs=2), submission_idx=7)
+    ).events
+    assert [(e.submission_idx, e.product_id) for e in events] == [
+        ("7", 0),
+        ("5", 2),
+        ("5", 0),
+    ]
+    events = store.get_events(IndexerEventsParams(product_ids=[1, 2])).events
+    assert [(e.submission_idx, e.product_id) for e in events] == [
+        ("9", 2),
+        ("5", 2),
+        ("2", 1),
+    ]
+
+    payments = store.get_interest_and_funding_payments([0, 2], max_idx=6, limit=2)
+    assert [p.idx for p in payments.interest_payments] == ["6", "4"]
+    assert [p.idx for p in payments.funding_payments] == ["3"]
+    assert payments.next_idx == "2"
+
+    # local queries never hit the indexer
+    assert mock_history_backend.call_count == calls
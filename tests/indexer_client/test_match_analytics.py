@@ -0,0 +1,133 @@
+import math
+from array import array
+from typing import Callable
+
+import pytest
+
+from vertex_protocol.indexer_client.columnar import matches_to_columns
+from vertex_protocol.indexer_client.match_analytics import analyze_matches
+from vertex_protocol.indexer_client.types.query import IndexerMatchesData
+from vertex_protocol.utils.math import to_x18
+
+SENDER = "0x" + "1" * 64
+MAKER = "0x" + "2" * 64
+
+
+def _match(
+    indexer_match: Callable[..., dict],
+    submission_idx: int,
+    base: float,
+    price: float,
+    fee: float = 0,
+    nonce: int = 0,
+    amount: float = 0,
+) -> dict:
+    return indexer_match(
+        submission_idx,
+        f"0x{nonce:064x}",
+        SENDER,
+        base_filled=to_x18(base),
+        quote_filled=to_x18(-base * price),
+        fee=to_x18(fee),
+        price_x18=to_x18(price),
+        amount=to_x18(amount or base),
+        nonce=nonce,
+    )
+
+
+@pytest.fixture
+def data(indexer_match: Callable[..., dict], indexer_tx: Callable[..., dict]) -> dict:
+    matches = [
+        # buy 1 @ 100 then 1 @ 200 as maker, sell 1.5 @ 300 as taker
+        _match(indexer_match, 1, 1, 100, fee=0.1, nonce=1),
+        _match(indexer_match, 2, 1, 200, fee=0.1, nonce=2, amount=2),
+        _match(indexer_match, 3, -1.5, 300, fee=0.5, nonce=3),
+        # product 4: sell 1 @ 10, flip long buying 3 @ 8
+        _match(indexer_match, 4, -1, 10, nonce=4),
+        _match(indexer_match, 5, 3, 8, nonce=5),
+        _match(indexer_match, 6, 1, 1, nonce=6),
+    ]
+    txs = [
+        indexer_tx(
+            idx, product_id=product_id, taker=SENDER, maker=MAKER, taker_nonce=nonce
+        )
+        for idx, product_id, nonce in [
+            (1, 2, 0),
+            (2, 2, 0),
+            (3, 2, 3),
+            (4, 4, 4),
+            (5, 4, 5),
+        ]
+    ]
+    return {"matches": matches[::-1], "txs": txs[::-1]}
+
+
+def test_analyze_matches(data: dict):
+
+    # the match without tx is skipped when asked to
+    from_columns = analyze_matches(
+        matches_to_columns(data["matches"], data["txs"]), skip_unattributed=True
+    )
+    from_models = analyze_matches(
+        IndexerMatchesData.parse_obj(data), skip_unattributed=True
+    )
+    assert from_columns == from_models
+    assert list(from_columns.keys()) == [2, 4]
+
+    perp = from_columns[2]
+    assert perp.fills == 3
+    assert perp.orders == 3
+    assert perp.base_volume == pytest.approx(3.5)
+    assert perp.quote_volume == pytest.approx(750)
+    assert perp.vwap == pytest.approx(750 / 3.5)
+    assert perp.buy_vwap == pytest.approx(150)
+    assert perp.sell_vwap == pytest.approx(300)
+    assert perp.position == pytest.approx(0.5)
+    assert perp.realized_pnl_fifo == pytest.approx(200 + 0.5 * 100)
+    assert perp.realized_pnl_average_cost == pytest.approx(1.5 * 150)
+    assert perp.maker_fees == pytest.approx(0.2)
+    assert perp.taker_fees == pytest.approx(0.5)
+    assert perp.fees == pytest.approx(0.7)
+    assert perp.fill_ratio == pytest.approx(3.5 / 4.5)
+
+    eth = from_columns[4]
+    assert eth.position == pytest.approx(2)
+    assert eth.realized_pnl_fifo == pytest.approx(2)
+    assert eth.realized_pnl_average_cost == pytest.approx(2)
+    assert eth.taker_fees == 0
+    assert math.isnan(eth.sell_vwap) is False
+
+
+def test_analyze_matches_requires_txs(data: dict):
+    with pytest.raises(ValueError, match="must include"):
+        analyze_matches(matches_to_columns(data["matches"]))
+    # unattributed matches would silently skew the analytics
+    with pytest.raises(ValueError, match="1 matches have no"):
+        analyze_matches(IndexerMatchesData.parse_obj(data))
+
+
+def _columns(n: int) -> dict:
+    # alternating buys and sells of product 2, newest first like the indexer
+    base = array("d", [1.0 if i % 2 else -0.5 for i in range(n)])
+    quote = array("d", [-b * (100 + i % 7) for i, b in enumerate(base)])
+    return {
+        "submission_idx": array("q", range(n, 0, -1)),
+        "digest": [f"0x{i}" for i in range(n)],
+        "amount": base,
+        "base_filled": base,
+        "quote_filled": quote,
+        "fee": array("d", [0.01] * n),
+        "cumulative_base_filled": base,
+        "product_id": array("q", [2] * n),
+        "is_taker": array("b", [i % 3 == 0 for i in range(n)]),
+    }
+
+
+def test_analyze_matches_large_batches():
+    columns = _columns(250_000)
+
+    analytics = analyze_matches(columns)[2]
+
+    assert analytics.fills == 250_000
+    assert analytics.fill_ratio == pytest.approx(1)
+    assert analytics.position == pytest.approx(62_500)
@@ -0,0 +1,312 @@
+import threading
+from typing import Callable, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerClient
+from vertex_protocol.indexer_client.pagination import (
+    iter_pages,
+    split_submission_idx_page,
+)
+from vertex_protocol.indexer_client.types.models import IndexerBaseModel
+from vertex_protocol.indexer_client.types.query import (
+    IndexerCandlesticksParams,
+    IndexerEventsParams,
+    IndexerInterestAndFundingParams,
+    IndexerMatchesParams,
+)
+
+
+def _rows_response(key: str, rows: list[dict], **extra) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {key: rows, **extra}
+    return response
+
+
+@pytest.fixture
+def matches(indexer_match: Callable[..., dict]) -> list[dict]:
+    # newest first, several fills can share a submission
+    idxs = [20, 19, 19, 19, 17, 16, 16, 12, 11, 10, 10, 10, 10, 10, 4, 3, 2, 1]
+    return [indexer_match(idx, f"{idx}-{i}") for i, idx in enumerate(idxs)]
+
+
+@pytest.fixture
+def mock_matches_backend(
+    mock_post: MagicMock, matches: list[dict], indexer_tx: Callable[..., dict]
+) -> MagicMock:
+    def post(url: str, json: dict):
+        params = json["matches"]
+        rows = [
+            match
+            for match in matches
+            if params.get("idx") is None
+            or int(match["submission_idx"]) <= params["idx"]
+        ]
+        rows = rows[: params["limit"]]
+        idxs = sorted({int(row["submission_idx"]) for row in rows}, reverse=True)
+        return _rows_response(
+            "matches", rows, txs=[indexer_tx(idx, 1000 + idx) for idx in idxs]
+        )
+
+    mock_post.side_effect = post
+    return mock_post
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 4, 7, 100])
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_matches(
+    url: str,
+    matches: list[dict],
+    mock_matches_backend: MagicMock,
+    page_size: int,
+    prefetch: bool,
+):
+    indexer_client = IndexerClient({"url": url})
+
+    rows = list(
+        indexer_client.iter_matches(
+            IndexerMatchesParams(subaccount="xxx"),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+    )
+
+    assert [row.digest for row in rows] == [match["digest"] for match in matches]
+    for call in mock_matches_backend.call_args_list:
+        assert call.kwargs["json"]["matches"]["limit"] > page_size
+        assert call.kwargs["json"]["matches"]["subaccount"] == "xxx"
+    first_call = mock_matches_backend.call_args_list[0]
+    assert first_call.kwargs["json"]["matches"]["limit"] == page_size + 1
+
+
+def test_iter_matches_bounds(
+    url: str, matches: list[dict], mock_matches_backend: MagicMock
+):
+    indexer_client = IndexerClient({"url": url})
+
+    rows = indexer_client.iter_matches(
+        IndexerMatchesParams(submission_idx=19), page_size=2, min_idx=10
+    )
+    assert [int(row.submission_idx) for row in rows] == [
+        19,
+        19,
+        19,
+        17,
+        16,
+        16,
+        12,
+        11,
+        10,
+        10,
+        10,
+        10,
+        10,
+    ]
+
+    # matches have no timestamp of their own, they are timed by their txs
+    rows = indexer_client.iter_matches(
+        IndexerMatchesParams(), page_size=2, min_time=1016
+    )
+    assert [int(row.submission_idx) for row in rows] == [20, 19, 19, 19, 17, 16, 16]
+
+
+@pytest.mark.parametrize("bounds", [{"min_idx": 17}, {"min_time": 1017}])
+def test_iter_matches_stops_fetching_at_bounds(
+    url: str, mock_matches_backend: MagicMock, bounds: dict
+):
+    indexer_client = IndexerClient({"url": url})
+
+    rows = indexer_client.iter_matches(IndexerMatchesParams(), page_size=2, **bounds)
+    assert [int(row.submission_idx) for row in rows] == [20, 19, 19, 19, 17]
+    # pages of 2 rows: [20], [19, 19, 19], [17, 16], nothing is fetched past 16
+    assert mock_matches_backend.call_count == 3
+
+
+def test_iter_historical_orders_min_time_requires_timestamps(
+    mock_post: MagicMock, url: str
+):
+    indexer_client = IndexerClient({"url": url})
+    order = {
+        "submission_idx": "1",
+        "digest": "0x",
+        "base_filled": "1",
+        "quote_filled": "-1",
+        "fee": "0",
+        "subaccount": "xxx",
+        "product_id": 1,
+        "amount": "1",
+        "price_x18": "1",
+        "expiration": "0",
+        "nonce": "0",
+        "isolated": False,
+    }
+    mock_post.return_value = _rows_response("orders", [order])
+
+    rows = indexer_client.iter_subaccount_historical_orders(
+        {"subaccount": "xxx"}, min_idx=0
+    )
+    assert [row.submission_idx for row in rows] == ["1"]
+    # orders come without txs, a time bound can't be applied to them
+    with pytest.raises(ValueError, match="Invalid min time"):
+        list(
+            indexer_client.iter_subaccount_historical_orders(
+                {"subaccount": "xxx"}, min_time=1000
+            )
+        )
+
+
+def test_iter_matches_is_lazy(
+    url: str, matches: list[dict], mock_matches_backend: MagicMock
+):
+    indexer_client = IndexerClient({"url": url})
+
+    rows = indexer_client.iter_matches(
+        IndexerMatchesParams(), page_size=2, prefetch=False
+    )
+    assert mock_matches_backend.call_count == 0
+    assert next(rows).digest == matches[0]["digest"]
+    assert mock_matches_backend.call_count == 1
+    rows.close()
+
+
+def test_iter_events_limits_raw_events(mock_post: MagicMock, url: str):
+    indexer_client = IndexerClient({"url": url})
+    mock_post.return_value = _rows_response("events", [], txs=[])
+
+    assert list(indexer_client.iter_events(IndexerEventsParams(), page_size=5)) == []
+    assert mock_post.call_args.kwargs["json"]["events"]["limit"] == {"raw": 6}
+
+
+def test_iter_candlesticks(mock_post: MagicMock, url: str):
+    indexer_client = IndexerClient({"url": url})
+    candlesticks = [
+        {
+            "submission_idx": "0",
+            "timestamp": str(timestamp),
+            "product_id": 1,
+            "granularity": 60,
+            "open_x18": "1",
+            "high_x18": "1",
+            "low_x18": "1",
+            "close_x18": "1",
+            "volume": "0",
+        }
+        for timestamp in range(6000, 0, -60)
+    ]
+
+    def post(url: str, json: dict):
+        params = json["candlesticks"]
+        rows = [
+            candlestick
+            for candlestick in candlesticks
+            if params.get("max_time") is None
+            or int(candlestick["timestamp"]) <= params["max_time"]
+        ]
+        return _rows_response("candlesticks", rows[: params["limit"]])
+
+    mock_post.side_effect = post
+
+    rows = list(
+        indexer_client.iter_candlesticks(
+            IndexerCandlesticksParams(product_id=1, granularity=60), page_size=7
+        )
+    )
+    assert [row.timestamp for row in rows] == [row["timestamp"] for row in candlesticks]
+
+    rows = list(
+        indexer_client.iter_candlesticks(
+            IndexerCandlesticksParams(product_id=1, granularity=60, max_time=3000),
+            page_size=7,
+            min_time=2000,
+        )
+    )
+    assert [int(row.timestamp) for row in rows] == list(range(3000, 1999, -60))
+
+
+def test_iter_interest_and_funding_pages(mock_post: MagicMock, url: str):
+    indexer_client = IndexerClient({"url": url})
+
+    def payment(idx: int) -> dict:
+        return {
+            "product_id": 1,
+            "idx": str(idx),
+            "timestamp": str(1000 + idx),
+            "amount": "1",
+            "balance_amount": "1",
+            "rate_x18": "1",
+            "oracle_price_x18": "1",
+        }
+
+    def post(url: str, json: dict):
+        max_idx = int(json["interest_and_funding"].get("max_idx") or 10)
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {
+            "interest_payments": [
+                payment(idx) for idx in range(max_idx, max(max_idx - 2, 0), -1)
+            ],
+            "funding_payments": [],
+            "next_idx": str(max_idx - 2),
+        }
+        return response
+
+    mock_post.side_effect = post
+    params = IndexerInterestAndFundingParams(subaccount="xxx", product_ids=[1], limit=2)
+
+    pages = list(indexer_client.iter_interest_and_funding_pages(params))
+    assert [payment.idx for page in pages for payment in page.interest_payments] == [
+        str(idx) for idx in range(10, 0, -1)
+    ]
+
+    pages = list(indexer_client.iter_interest_and_funding_pages(params, min_time=1005))
+    assert [payment.idx for page in pages for payment in page.interest_payments] == [
+        str(idx) for idx in range(10, 4, -1)
+    ]
+
+    mock_post.reset_mock()
+    pages = list(
+        indexer_client.iter_interest_and_funding_pages(
+            params, min_idx=7, prefetch=False
+        )
+    )
+    assert [payment.idx for page in pages for payment in page.interest_payments] == [
+        str(idx) for idx in range(10, 6, -1)
+    ]
+    # stops at the first page with payments past the bounds
+    assert mock_post.call_count == 3
+
+
+def test_split_submission_idx_page():
+    def rows(*idxs: int) -> list[IndexerBaseModel]:
+        return [IndexerBaseModel(submission_idx=str(idx)) for idx in idxs]
+
+    page, cursor = split_submission_idx_page(rows(5, 4, 3), 3)
+    assert (len(page), cursor) == (3, None)
+
+    page, cursor = split_submission_idx_page(rows(5, 4, 3, 3), 3)
+    assert ([row.submission_idx for row in page], cursor) == (["5", "4"], 3)
+
+    # a single submission spanning the whole page needs a larger limit
+    page, cursor = split_submission_idx_page(rows(5, 5, 5, 5), 3)
+    assert (page, cursor) == ([], 5)
+
+
+def test_iter_pages_prefetches_and_cancels():
+    fetched: list[Optional[int]] = []
+    second_page_fetched = threading.Event()
+
+    def fetch_page(cursor: int) -> tuple[list[int], Optional[int]]:
+        fetched.append(cursor)
+        if cursor == 1:
+            second_page_fetched.set()
+        return [cursor], cursor + 1
+
+    pages = iter_pages(fetch_page, 0)
+    assert next(pages) == [0]
+    # the next page is fetched while the current one is being consumed
+    assert second_page_fetched.wait(timeout=5)
+    pages.close()
+    assert fetched[:2] == [0, 1]
+    assert len(fetched) <= 3
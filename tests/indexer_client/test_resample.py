@@ -0,0 +1,121 @@
+import random
+from array import array
+
+import pytest
+
+from vertex_protocol.indexer_client import CandlestickColumns
+from vertex_protocol.indexer_client.resample import (
+    resample_candlesticks,
+    resample_columns,
+)
+from vertex_protocol.indexer_client.types.models import IndexerCandlestick
+from vertex_protocol.utils.columns import x18_to_float_array
+
+
+@pytest.fixture
+def minute_candlesticks() -> list[IndexerCandlestick]:
+    rng = random.Random(37)
+    candlesticks = []
+    close = 2000 * 10**18
+    # starts mid-bucket and skips minutes without trades
+    for timestamp in range(1_700_000_040, 1_700_000_040 + 86400, 60):
+        if rng.random() < 0.1:
+            continue
+        open_x18 = close
+        close = open_x18 + rng.randint(-(10**19), 10**19)
+        candlesticks.append(
+            IndexerCandlestick(
+                submission_idx=str(timestamp),
+                timestamp=str(timestamp),
+                product_id=3,
+                granularity=60,
+                open_x18=str(open_x18),
+                high_x18=str(max(open_x18, close) + rng.randint(0, 10**18)),
+                low_x18=str(min(open_x18, close) - rng.randint(0, 10**18)),
+                close_x18=str(close),
+                volume=str(rng.randint(0, 10**20)),
+            )
+        )
+    return candlesticks
+
+
+def _expected(candlesticks: list[IndexerCandlestick], granularity: int) -> list[dict]:
+    buckets: dict[int, list[IndexerCandlestick]] = {}
+    for candlestick in candlesticks:
+        start = int(candlestick.timestamp) - int(candlestick.timestamp) % granularity
+        buckets.setdefault(start, []).append(candlestick)
+    return [
+        {
+            "timestamp": str(start),
+            "open_x18": bars[0].open_x18,
+            "high_x18": str(max(int(bar.high_x18) for bar in bars)),
+            "low_x18": str(min(int(bar.low_x18) for bar in bars)),
+            "close_x18": bars[-1].close_x18,
+            "volume": str(sum(int(bar.volume) for bar in bars)),
+        }
+        for start, bars in sorted(buckets.items())
+    ]
+
+
+@pytest.mark.parametrize("granularity", [300, 600, 3600, 10800, 86400])
+def test_resample_candlesticks(
+    minute_candlesticks: list[IndexerCandlestick], granularity: int
+):
+    resampled = resample_candlesticks(minute_candlesticks, granularity)
+
+    assert [
+        bar.dict(
+            include={
+                "timestamp",
+                "open_x18",
+                "high_x18",
+                "low_x18",
+                "close_x18",
+                "volume",
+            }
+        )
+        for bar in resampled
+    ] == _expected(minute_candlesticks, granularity)
+    assert all(bar.granularity == granularity for bar in resampled)
+    assert all(bar.product_id == 3 for bar in resampled)
+
+    # indexer order is preserved
+    assert resample_candlesticks(minute_candlesticks[::-1], granularity) == (
+        resampled[::-1]
+    )
+
+
+def test_resample_columns(minute_candlesticks: list[IndexerCandlestick]):
+    columns = CandlestickColumns(
+        timestamps=array("q", [int(bar.timestamp) for bar in minute_candlesticks]),
+        open=x18_to_float_array(bar.open_x18 for bar in minute_candlesticks),
+        high=x18_to_float_array(bar.high_x18 for bar in minute_candlesticks),
+        low=x18_to_float_array(bar.low_x18 for bar in minute_candlesticks),
+        close=x18_to_float_array(bar.close_x18 for bar in minute_candlesticks),
+        volume=x18_to_float_array(bar.volume for bar in minute_candlesticks),
+    )
+
+    resampled = resample_columns(columns, 10800, source_granularity=60)
+    expected = _expected(minute_candlesticks, 10800)
+
+    assert list(resampled.timestamps) == [int(bar["timestamp"]) for bar in expected]
+    for field, column in [
+        ("open_x18", resampled.open),
+        ("high_x18", resampled.high),
+        ("low_x18", resampled.low),
+        ("close_x18", resampled.close),
+        ("volume", resampled.volume),
+    ]:
+        assert list(column) == pytest.approx(
+            [int(bar[field]) / 10**18 for bar in expected]
+        )
+
+
+def test_resample_invalid_granularity(minute_candlesticks: list[IndexerCandlestick]):
+    assert resample_candlesticks([], 90) == []
+    with pytest.raises(ValueError, match="Invalid granularity provided"):
+        resample_candlesticks(minute_candlesticks, 90)
+    with pytest.raises(ValueError, match="Invalid granularity provided"):
+        resample_columns(
+            CandlestickColumns(*[x18_to_float_array([])] * 6), 90, source_granularity=60
+        )
@@ -0,0 +1,143 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerClient
+from vertex_protocol.utils.expiration import OrderType, get_expiration_timestamp
+from vertex_protocol.utils.time import now_in_seconds
+
+
+def _order(digest: str, base_filled: str = "1", expiration: str = "0") -> dict:
+    return {
+        "submission_idx": "1",
+        "timestamp": "1700000000",
+        "digest": digest,
+        "base_filled": base_filled,
+        "quote_filled": "-1",
+        "fee": "0",
+        "subaccount": "0x" + "1" * 64,
+        "product_id": 2,
+        "amount": "1",
+        "price_x18": "1",
+        "expiration": expiration,
+        "nonce": "0",
+        "isolated": False,
+    }
+
+
+def _digest(i: int) -> str:
+    return f"0x{i:064x}"
+
+
+def test_resolve_historical_orders_by_digest(mock_post: MagicMock, url: str):
+    requested: list[list[str]] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+    barrier = threading.Barrier(3, timeout=5)
+    calls = 0
+
+    def post(url, json):
+        nonlocal in_flight, max_in_flight, calls
+        digests = json["orders"]["digests"]
+        with lock:
+            requested.append(digests)
+            calls += 1
+            call = calls
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        if call <= 3:
+            # first chunks wait for each other to show they're fetched concurrently
+            barrier.wait()
+        response = MagicMock()
+        response.status_code = 200
+        # digest 7 is unknown to the indexer
+        response.json.return_value = {
+            "orders": [_order(digest) for digest in digests if digest != _digest(7)]
+        }
+        with lock:
+            in_flight -= 1
+        return response
+
+    mock_post.side_effect = post
+    indexer_client = IndexerClient({"url": url})
+    digests = [_digest(i) for i in range(10)] + [_digest(1)]
+
+    orders = indexer_client.resolve_historical_orders_by_digest(
+        digests, chunk_size=3, max_workers=3
+    )
+
+    assert sorted(len(chunk) for chunk in requested) == [1, 3, 3, 3]
+    assert sorted(d for chunk in requested for d in chunk) == [
+        _digest(i) for i in range(10)
+    ]
+    assert max_in_flight == 3
+    assert list(orders.keys()) == [_digest(i) for i in range(10) if i != 7]
+    assert all(order.digest == digest for digest, order in orders.items())
+
+    # resolved digests are served from the cache, unknown ones are fetched again
+    requested.clear()
+    orders = indexer_client.resolve_historical_orders_by_digest(
+        [_digest(2), _digest(7), _digest(10)]
+    )
+    assert requested == [[_digest(7), _digest(10)]]
+    assert list(orders.keys()) == [_digest(2), _digest(10)]
+
+    # digests are matched case-insensitively
+    requested.clear()
+    upper_digest = "0x" + _digest(10)[2:].upper()
+    orders = indexer_client.resolve_historical_orders_by_digest([upper_digest])
+    assert requested == []
+    assert orders[upper_digest].digest == _digest(10)
+
+    with pytest.raises(ValueError):
+        indexer_client.resolve_historical_orders_by_digest(digests, chunk_size=0)
+
+
+def test_resolve_historical_orders_caches_terminal_orders(
+    mock_post: MagicMock, url: str
+):
+    open_expiration = str(now_in_seconds() + 3600)
+    orders = {
+        # fully filled
+        _digest(1): _order(_digest(1)),
+        # open
+        _digest(2): _order(_digest(2), "0", open_expiration),
+        # partially filled and expired
+        _digest(3): _order(_digest(3), "0", "1"),
+        # immediate-or-cancel, reduce-only
+        _digest(4): _order(
+            _digest(4),
+            "0",
+            str(get_expiration_timestamp(OrderType.IOC, int(open_expiration), True)),
+        ),
+    }
+    requested: list[list[str]] = []
+
+    def post(url, json):
+        digests = json["orders"]["digests"]
+        requested.append(digests)
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"orders": [orders[digest] for digest in digests]}
+        return response
+
+    mock_post.side_effect = post
+    indexer_client = IndexerClient({"url": url})
+
+    indexer_client.resolve_historical_orders_by_digest(list(orders))
+    requested.clear()
+    resolved = indexer_client.resolve_historical_orders_by_digest(list(orders))
+    # open orders may still fill or be cancelled
+    assert requested == [[_digest(2)]]
+    assert list(resolved.keys()) == list(orders)
+
+    # the least recently resolved orders are evicted first
+    with patch("vertex_protocol.indexer_client.query._HISTORICAL_ORDERS_CACHE_SIZE", 2):
+        indexer_client.resolve_historical_orders_by_digest([_digest(1)])
+        orders[_digest(5)] = _order(_digest(5))
+        indexer_client.resolve_historical_orders_by_digest([_digest(5)])
+    requested.clear()
+    indexer_client.resolve_historical_orders_by_digest([_digest(1), _digest(3)])
+    assert requested == [[_digest(3)]]
@@ -0,0 +1,135 @@
+import json
+import random
+import tracemalloc
+from typing import Callable, Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.indexer_client import IndexerClient
+from vertex_protocol.indexer_client.streaming import iter_json_array
+from vertex_protocol.indexer_client.types.query import IndexerMatchesParams
+
+
+def _match(indexer_match: Callable[..., dict], i: int) -> dict:
+    return indexer_match(
+        100000 - i,
+        f"0x{i:064x}",
+        sender=f"0x{i % 5:064x}",
+        base_filled=i * 10**17,
+        quote_filled=-i * 2000 * 10**17,
+        fee=i * 10**12,
+        price_x18=2000 * 10**18,
+        expiration=4611686020107119633,
+        nonce=i,
+        timestamp=1700000000 - i,
+    )
+
+
+def _chunks(body: bytes, rng: random.Random, max_size: int) -> Iterator[bytes]:
+    pos = 0
+    while pos < len(body):
+        size = rng.randint(1, max_size)
+        yield body[pos : pos + size]
+        pos += size
+
+
+@pytest.mark.parametrize("max_chunk_size", [1, 3, 17, 4096])
+def test_iter_json_array(max_chunk_size: int):
+    rng = random.Random(max_chunk_size)
+    data = {
+        "txs": [{"tx": {"nested": [1, 2, {"a": "]}"}]}, "timestamp": "1"}] * 3,
+        "next": 12345678901234567890,
+        "rows": [
+            {"name": "vertex ✓ 🚀", "escaped": 'quote " and \\ ]', "value": 1.5e-7},
+            12345,
+            -0.25,
+            True,
+            None,
+            "x",
+            [],
+            {},
+        ],
+        "after": "ignored",
+    }
+    body = json.dumps(data, ensure_ascii=False, indent=1).encode()
+
+    rows = list(iter_json_array(_chunks(body, rng, max_chunk_size), "rows"))
+
+    assert rows == data["rows"]
+    assert list(iter_json_array(_chunks(body, rng, max_chunk_size), "txs")) == (
+        data["txs"]
+    )
+
+
+def test_iter_json_array_edge_cases():
+    assert list(iter_json_array([b"{}"], "rows")) == []
+    assert list(iter_json_array([b'{"rows": []}'], "rows")) == []
+    assert list(iter_json_array([b'{"rows": null}'], "rows")) == []
+    assert list(iter_json_array([b'{"other": [1]}'], "rows")) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'{"rows": [1, 2'], "rows"))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'["rows"]'], "rows"))
+
+
+def test_stream_matches(
+    mock_post: MagicMock, url: str, indexer_match: Callable[..., dict]
+):
+    indexer_client = IndexerClient({"url": url})
+    rows = [_match(indexer_match, i) for i in range(50)]
+    body = json.dumps({"txs": [], "matches": rows}).encode()
+    response = MagicMock()
+    response.status_code = 200
+    response.iter_content.side_effect = lambda chunk_size: _chunks(
+        body, random.Random(39), chunk_size
+    )
+    mock_post.return_value = response
+
+    matches = list(
+        indexer_client.stream_matches(
+            IndexerMatchesParams(subaccount="xxx"), chunk_size=100
+        )
+    )
+
+    assert [match.digest for match in matches] == [row["digest"] for row in rows]
+    assert mock_post.call_args.kwargs["stream"] is True
+    assert mock_post.call_args.kwargs["json"]["matches"]["subaccount"] == "xxx"
+    response.close.assert_called_once()
+
+    response.status_code = 500
+    response.text = "error"
+    with pytest.raises(Exception, match="error"):
+        next(indexer_client.stream_matches(IndexerMatchesParams()))
+
+
+@pytest.mark.benchmark
+def test_stream_memory_does_not_grow_with_page_size(
+    mock_post: MagicMock, url: str, indexer_match: Callable[..., dict]
+):
+    indexer_client = IndexerClient({"url": url})
+
+    def body(rows: int) -> Iterator[bytes]:
+        # generates the body lazily, like a socket
+        yield b'{"matches": ['
+        for i in range(rows):
+            yield (b"," if i else b"") + json.dumps(_match(indexer_match, i)).encode()
+        yield b'], "txs": []}'
+
+    def peak_memory(rows: int) -> int:
+        response = MagicMock()
+        response.status_code = 200
+        response.iter_content.side_effect = lambda chunk_size: body(rows)
+        mock_post.return_value = response
+        tracemalloc.start()
+        try:
+            for _ in indexer_client.stream_matches(IndexerMatchesParams()):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak
+
+    small_page_peak = peak_memory(1_000)
+    large_page_peak = peak_memory(10_000)
+    assert large_page_peak < 2 * small_page_peak
@@ -0,0 +1,148 @@
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+from vertex_protocol.trigger_client import TriggerClient, TriggerOrderIndex
+from vertex_protocol.trigger_client.types.query import (
+    ListTriggerOrdersParams,
+    TriggerOrder,
+)
+from vertex_protocol.utils.time import now_in_millis
+
+
+def _trigger_order(
+    sender: str, i: int, updated_at: int, status: str = "pending"
+) -> dict:
+    return {
+        "order": {
+            "product_id": 2 if i % 2 else 4,
+            "order": {
+                "sender": sender,
+                "priceX18": "1000000000000000000",
+                "amount": "1000000000000000000",
+                "expiration": "4611686020107119633",
+                "nonce": str(i),
+            },
+            "signature": "0x",
+            "spot_leverage": None,
+            "digest": f"0x{i:064x}",
+            "trigger": {"price_above": "1000000000000000000"},
+        },
+        "status": status,
+        "updated_at": updated_at,
+    }
+
+
+def _mock_trigger_orders(mock_post: MagicMock, orders: list[dict]) -> list[dict]:
+    requests: list[dict] = []
+
+    def post(url: str, json: dict):
+        requests.append(json)
+        max_update_time: Optional[str] = json.get("max_update_time")
+        max_digest: Optional[str] = json.get("max_digest")
+        # inclusive cursor, most recently updated first
+        page = [
+            order
+            for order in orders
+            if max_update_time is None
+            or (order["updated_at"], order["order"]["digest"])
+            <= (int(max_update_time), max_digest)
+        ][: json["limit"]]
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"status": "success", "data": {"orders": page}}
+        return response
+
+    mock_post.side_effect = post
+    return requests
+
+
+def test_iter_trigger_orders(
+    trigger_client: TriggerClient,
+    list_trigger_orders_params: dict,
+    senders: list[str],
+    mock_post: MagicMock,
+):
+    # pairs of orders share an update time
+    orders = sorted(
+        [_trigger_order(senders[0], i, 1000 + i // 2) for i in range(25)],
+        key=lambda order: (order["updated_at"], order["order"]["digest"]),
+        reverse=True,
+    )
+    requests = _mock_trigger_orders(mock_post, orders)
+    list_trigger_orders_params["recvTime"] = now_in_millis(90)
+    params = ListTriggerOrdersParams.parse_obj(
+        {"tx": list_trigger_orders_params, "pending": True}
+    )
+
+    with patch.object(trigger_client, "_sign", wraps=trigger_client._sign) as mock_sign:
+        result = list(trigger_client.iter_trigger_orders(params, page_size=10))
+
+    assert [order.order.digest for order in result] == [
+        order["order"]["digest"] for order in orders
+    ]
+    assert len(requests) == 3
+    assert mock_sign.call_count == 1
+    assert len({request["signature"] for request in requests}) == 1
+    assert requests[1]["max_digest"] == orders[9]["order"]["digest"]
+    assert requests[1]["max_update_time"] == str(orders[9]["updated_at"])
+
+    # txs about to expire are signed again
+    requests.clear()
+    list_trigger_orders_params["recvTime"] = now_in_millis()
+    params = ListTriggerOrdersParams.parse_obj(
+        {"tx": list_trigger_orders_params, "pending": True}
+    )
+    with patch.object(trigger_client, "_sign", wraps=trigger_client._sign) as mock_sign:
+        assert len(list(trigger_client.iter_trigger_orders(params, page_size=10))) == 25
+    assert mock_sign.call_count == 2
+    assert int(requests[0]["tx"]["recvTime"]) > now_in_millis(60)
+
+
+def test_trigger_order_index(
+    trigger_client: TriggerClient,
+    list_trigger_orders_params: dict,
+    senders: list[str],
+    mock_post: MagicMock,
+):
+    orders = [
+        _trigger_order(senders[0], i, 1000 - i, "pending" if i < 5 else "triggered")
+        for i in range(8)
+    ]
+    _mock_trigger_orders(mock_post, orders)
+    params = ListTriggerOrdersParams.parse_obj(
+        {"tx": list_trigger_orders_params, "pending": False}
+    )
+
+    index = trigger_client.index_trigger_orders(params, page_size=3)
+
+    assert len(index) == 8
+    assert index.product_ids == [2, 4]
+    assert index.statuses == ["pending", "triggered"]
+    assert [o.order.order.nonce for o in index.find(product_id=2)] == [
+        "1",
+        "3",
+        "5",
+        "7",
+    ]
+    assert [o.order.order.nonce for o in index.find(status="triggered")] == [
+        "5",
+        "6",
+        "7",
+    ]
+    assert [
+        o.order.order.nonce for o in index.find(product_id=4, status="pending")
+    ] == ["0", "2", "4"]
+    assert f"0x{3:064x}" in index
+    assert index.get(f"0x{9:064x}") is None
+
+    # newer versions of an order replace older ones
+    index.update(
+        [
+            TriggerOrder.parse_obj(_trigger_order(senders[0], 0, 2000, "triggered")),
+            TriggerOrder.parse_obj(_trigger_order(senders[0], 1, 0, "cancelled")),
+        ]
+    )
+    assert index.find(status="pending")[0].order.order.nonce == "1"
+    assert index.find(status="triggered")[0].order.order.nonce == "0"
+    assert index.statuses == ["pending", "triggered"]
+    assert len(TriggerOrderIndex()) == 0
@@ -0,0 +1,108 @@
+import random
+import sys
+
+import pytest
+
+from vertex_protocol.engine_client.types.models import (
+    PerpBalance,
+    PerpLpBalance,
+    PerpProductBalance,
+)
+from vertex_protocol.indexer_client.types.models import IndexerCandlestick
+from vertex_protocol.utils.columns import (
+    int_column,
+    split_arrays_to_x18,
+    x18_column,
+    x18_columns,
+    x18_split_column,
+    x18_to_float_array,
+    x18_to_split_arrays,
+)
+from vertex_protocol.utils.math import from_x18
+
+
+def test_x18_to_float_array():
+    column = x18_to_float_array(["1000000000000000000", "-2500000000000000000", 0])
+    assert column.typecode == "d"
+    assert column.tolist() == [1.0, -2.5, 0.0]
+
+    rng = random.Random(28)
+    values = [str(rng.randint(-(10**30), 10**30)) for _ in range(1000)]
+    assert x18_to_float_array(values).tolist() == pytest.approx(
+        [from_x18(int(x)) for x in values], rel=1e-15
+    )
+    assert len(memoryview(x18_to_float_array(values))) == 1000
+
+
+def test_x18_split_arrays_are_exact():
+    rng = random.Random(29)
+    values = [rng.randint(-(10**36), 10**36) for _ in range(1000)]
+    hi, lo = x18_to_split_arrays(map(str, values))
+    assert hi.typecode == lo.typecode == "q"
+    assert all(0 <= frac < 10**18 for frac in lo)
+    assert split_arrays_to_x18(hi, lo) == values
+
+    hi, lo = x18_to_split_arrays(["-1"])
+    assert (hi[0], lo[0]) == (-1, 10**18 - 1)
+
+    with pytest.raises(OverflowError):
+        x18_to_split_arrays([str(10**37)])
+
+    with pytest.raises(ValueError, match="Mismatched columns"):
+        split_arrays_to_x18([1], [])
+
+
+def test_model_columns():
+    candlesticks = [
+        IndexerCandlestick(
+            submission_idx=str(i),
+            timestamp=str(1680000000 + 60 * i),
+            product_id=2,
+            granularity=60,
+            open_x18=str((100 + i) * 10**18),
+            high_x18=str((101 + i) * 10**18),
+            low_x18=str((99 + i) * 10**18),
+            close_x18=str((100 + i) * 10**18 + 5 * 10**17),
+            volume=str(i * 10**18),
+        )
+        for i in range(3)
+    ]
+    columns = x18_columns(candlesticks, "open_x18", "close_x18")
+    assert columns["open_x18"].tolist() == [100.0, 101.0, 102.0]
+    assert columns["close_x18"].tolist() == [100.5, 101.5, 102.5]
+    assert int_column(candlesticks, "timestamp").tolist() == [
+        1680000000,
+        1680000060,
+        1680000120,
+    ]
+
+    balances = [
+        PerpProductBalance(
+            product_id=product_id,
+            lp_balance=PerpLpBalance(amount="0", last_cumulative_funding_x18="0"),
+            balance=PerpBalance(
+                amount=str(-product_id * 10**17 - 1),
+                v_quote_balance="0",
+                last_cumulative_funding_x18="0",
+            ),
+        )
+        for product_id in (2, 4)
+    ]
+    assert x18_column(balances, "balance.amount").tolist() == [
+        -0.200000000000000001,
+        -0.400000000000000001,
+    ]
+    hi, lo = x18_split_column(balances, "balance.amount")
+    assert split_arrays_to_x18(hi, lo) == [-(2 * 10**17) - 1, -(4 * 10**17) - 1]
+
+
+def test_x18_to_float_array_matches_per_value_path():
+    rng = random.Random(30)
+    values = [str(rng.randint(0, 10**24)) for _ in range(20000)]
+
+    floats = [from_x18(int(x)) for x in values]
+    column = x18_to_float_array(values)
+    assert column.tolist() == pytest.approx(floats, rel=1e-15)
+
+    list_size = sys.getsizeof(floats) + sum(map(sys.getsizeof, floats))
+    assert sys.getsizeof(column) * 3 < list_size
@@ -0,0 +1,106 @@
+import math
+import random
+import time
+
+import pytest
+
+from vertex_protocol.utils import fixed
+from vertex_protocol.utils.math import from_x18, mul_x18, round_x18, to_x18
+
+# `mul_x18` goes through `Decimal` with 28 digits of precision, so it is only exact
+# while the product of its inputs stays below 1e28.
+DECIMAL_EXACT_BOUND = 10**14
+
+
+def _random_x18(rng: random.Random, bound: int) -> int:
+    return rng.randint(-bound, bound)
+
+
+def test_mul_matches_mul_x18():
+    rng = random.Random(26)
+    for _ in range(5000):
+        x = _random_x18(rng, DECIMAL_EXACT_BOUND)
+        y = _random_x18(rng, DECIMAL_EXACT_BOUND)
+        assert fixed.mul(x, y) == mul_x18(x, y), (x, y)
+
+
+def test_mul_is_exact_for_large_values():
+    x, y = 123456789 * 10**18 + 987654321, 987654321 * 10**18 + 123456789
+    assert fixed.mul(x, y) == 121932631112635269990702636540161562
+    assert fixed.mul(x, y) != mul_x18(x, y)
+    assert fixed.mul(-x, y) == -fixed.mul(x, y)
+
+
+def test_div():
+    rng = random.Random(27)
+    for _ in range(5000):
+        x = _random_x18(rng, 10**30)
+        y = _random_x18(rng, 10**24) or 1
+        expected = abs(x) * 10**18 // abs(y) * (1 if (x >= 0) == (y >= 0) else -1)
+        assert fixed.div(x, y) == expected, (x, y)
+    assert fixed.div(to_x18(1), to_x18(3)) == 333333333333333333
+    assert fixed.div(to_x18(-1), to_x18(3)) == -333333333333333333
+    with pytest.raises(ZeroDivisionError):
+        fixed.div(1, 0)
+
+
+def test_rounding():
+    rng = random.Random(28)
+    for _ in range(5000):
+        x = _random_x18(rng, 10**24)
+        increment = rng.choice([1, 10**12, 10**15, 5 * 10**16, 10**18])
+        assert fixed.floor_to_increment(x, increment) == round_x18(x, increment)
+        rounded = fixed.round_to_increment(x, increment)
+        assert rounded % increment == 0
+        assert abs(rounded - x) * 2 <= increment
+    assert fixed.round_to_increment(15, 10) == 20
+    assert fixed.round_to_increment(-15, 10) == -20
+    assert fixed.round_to_increment(14, 10) == 10
+
+
+def test_from_float_matches_to_x18():
+    rng = random.Random(29)
+    for _ in range(5000):
+        x = round(rng.uniform(-1e6, 1e6), rng.randint(0, 9))
+        tolerance = math.ceil(math.ulp(x) * 10**18) + 1
+        assert abs(fixed.from_float(x) - to_x18(x)) <= tolerance, x
+    assert fixed.from_float(10.15) == 10150000000000000355
+    assert fixed.from_float(0.5) == to_x18(0.5)
+    assert fixed.from_float(-2.25) == to_x18(-2.25)
+    assert fixed.from_float(3) == to_x18(3)
+
+
+def test_to_float_matches_from_x18():
+    rng = random.Random(30)
+    for _ in range(5000):
+        x = _random_x18(rng, 10**30)
+        assert math.isclose(fixed.to_float(x), from_x18(x), rel_tol=1e-15)
+
+
+PRICE_X18, SLIPPAGE = 28898 * 10**18, 0.005
+
+
+def _decimal_slippage_price() -> int:
+    return mul_x18(PRICE_X18, to_x18(1) + to_x18(SLIPPAGE))
+
+
+def _fixed_slippage_price() -> int:
+    return fixed.mul(PRICE_X18, fixed.X18 + fixed.from_float(SLIPPAGE))
+
+
+def test_fixed_slippage_price_matches_decimal_path():
+    assert _fixed_slippage_price() == _decimal_slippage_price()
+
+
+@pytest.mark.benchmark
+def test_fixed_math_benchmark():
+    def best_of(fn, runs: int = 5, iterations: int = 2000) -> float:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    assert best_of(_decimal_slippage_price) / best_of(_fixed_slippage_price) > 3
@@ -0,0 +1,356 @@
+import random
+import time
+from typing import Callable
+
+import pytest
+
+from vertex_protocol.engine_client.types.models import (
+    MaxOrderSizeDirection,
+    ProductRisk,
+)
+from vertex_protocol.engine_client.types.query import SubaccountInfoData
+from vertex_protocol.utils import fixed
+from vertex_protocol.utils.health import (
+    HealthType,
+    SubaccountHealthCalculator,
+    SubaccountLimitsEstimator,
+    calc_risk_weight_x18,
+)
+from vertex_protocol.utils.math import to_x18
+
+BOOK_INFO = {
+    "size_increment": "1000000000000000",
+    "price_increment_x18": "1000000000000000",
+    "min_size": "10000000000000000",
+    "collected_fees": "0",
+    "lp_spread_x18": "3000000000000000",
+}
+
+
+def _risk(long_initial: float, long_maintenance: float, penalty: float = 0) -> dict:
+    return {
+        "long_weight_initial_x18": str(to_x18(long_initial)),
+        "short_weight_initial_x18": str(to_x18(round(2 - long_initial, 6))),
+        "long_weight_maintenance_x18": str(to_x18(long_maintenance)),
+        "short_weight_maintenance_x18": str(to_x18(round(2 - long_maintenance, 6))),
+        "large_position_penalty_x18": str(to_x18(penalty)),
+    }
+
+
+@pytest.fixture
+def subaccount_info(
+    spot_product: Callable[..., dict], perp_product: Callable[..., dict]
+) -> Callable[..., SubaccountInfoData]:
+    def build(
+        usdc: float = 1000,
+        btc: float = 1,
+        eth_perp: float = -2,
+        eth_v_quote: float = 4100,
+        btc_multiplier: float = 1,
+        eth_funding: float = 0,
+        btc_penalty: float = 0,
+    ) -> SubaccountInfoData:
+        return SubaccountInfoData.parse_obj(
+            {
+                "subaccount": "0x" + "00" * 32,
+                "exists": True,
+                "healths": [{"assets": "0", "liabilities": "0", "health": "0"}] * 3,
+                "health_contributions": [],
+                "spot_count": 2,
+                "perp_count": 1,
+                "spot_balances": [
+                    {
+                        "product_id": product_id,
+                        "lp_balance": {"amount": "0"},
+                        "balance": {
+                            "amount": str(to_x18(amount)),
+                            "last_cumulative_multiplier_x18": str(to_x18(1)),
+                        },
+                    }
+                    for product_id, amount in [(0, usdc), (1, btc)]
+                ],
+                "perp_balances": [
+                    {
+                        "product_id": 2,
+                        "lp_balance": {
+                            "amount": "0",
+                            "last_cumulative_funding_x18": "0",
+                        },
+                        "balance": {
+                            "amount": str(to_x18(eth_perp)),
+                            "v_quote_balance": str(to_x18(eth_v_quote)),
+                            "last_cumulative_funding_x18": "0",
+                        },
+                    }
+                ],
+                "spot_products": [
+                    spot_product(0, to_x18(1), _risk(1, 1), BOOK_INFO),
+                    spot_product(
+                        1,
+                        to_x18(30000),
+                        _risk(0.9, 0.95, btc_penalty),
+                        BOOK_INFO,
+                        deposits_multiplier_x18=to_x18(btc_multiplier),
+                        borrows_multiplier_x18=to_x18(btc_multiplier),
+                    ),
+                ],
+                "perp_products": [
+                    perp_product(
+                        2,
+                        to_x18(2000),
+                        _risk(0.9, 0.95),
+                        BOOK_INFO,
+                        cumulative_funding_x18=to_x18(eth_funding),
+                    ),
+                ],
+            }
+        )
+
+    return build
+
+
+def test_healths(subaccount_info: Callable[..., SubaccountInfoData]):
+    calculator = SubaccountHealthCalculator.from_subaccount_info(subaccount_info())
+    assert calculator.product_ids == [0, 1, 2]
+    # 1000 + 1 * 30000 * 0.9 + (-2 * 2000 * 1.1 + 4100)
+    assert calculator.health() == to_x18(27700)
+    # 1000 + 1 * 30000 * 0.95 + (-2 * 2000 * 1.05 + 4100)
+    assert calculator.health(HealthType.MAINTENANCE) == to_x18(29400)
+    # 1000 + 30000 + (-4000 + 4100)
+    assert calculator.health(HealthType.UNWEIGHTED) == to_x18(31100)
+    assert calculator.healths() == [to_x18(27700), to_x18(29400), to_x18(31100)]
+    assert calculator.contribution(2) == to_x18(-300)
+    assert calculator.position(2) == (to_x18(-2), to_x18(4100))
+
+
+def test_healths_apply_interest_and_funding(
+    subaccount_info: Callable[..., SubaccountInfoData],
+):
+    calculator = SubaccountHealthCalculator.from_subaccount_info(
+        subaccount_info(btc_multiplier=1.1, eth_funding=10)
+    )
+    assert calculator.position(1) == (to_x18(1.1), 0)
+    # shorts receive funding when cumulative funding goes up
+    assert calculator.position(2) == (to_x18(-2), to_x18(4120))
+    assert calculator.health(HealthType.UNWEIGHTED) == to_x18(1000 + 33000 + 120)
+
+
+def test_health_deltas_match_updated_balances(
+    subaccount_info: Callable[..., SubaccountInfoData],
+):
+    calculator = SubaccountHealthCalculator.from_subaccount_info(subaccount_info())
+
+    # buy 0.5 BTC spot at 29000 and close 1 ETH perp short at 2050
+    deltas = calculator.order_deltas(1, to_x18(0.5), to_x18(29000))
+    deltas += calculator.order_deltas(2, to_x18(1), to_x18(2050), fee=to_x18(1))
+    assert deltas == [
+        (1, to_x18(0.5), to_x18(-14500)),
+        (2, to_x18(1), to_x18(-2051)),
+    ]
+    expected = SubaccountHealthCalculator.from_subaccount_info(
+        subaccount_info(usdc=-13500, btc=1.5, eth_perp=-1, eth_v_quote=2049)
+    )
+    for health_type in HealthType:
+        assert calculator.health(health_type, deltas) == expected.health(health_type)
+    assert calculator.healths(deltas) == expected.healths()
+    # what-ifs don't change the calculator
+    assert calculator.health() == to_x18(27700)
+
+    calculator.apply(deltas)
+    assert calculator.healths() == expected.healths()
+    assert calculator.position(0) == expected.position(0)
+
+    with pytest.raises(ValueError, match="Invalid product id"):
+        calculator.health(deltas=[(5, 1, 0)])
+
+
+def test_large_position_penalty(subaccount_info: Callable[..., SubaccountInfoData]):
+    risk = ProductRisk.parse_obj(_risk(0.9, 0.95, penalty=0.01))
+    # 1.1 / (1 + 0.01 * sqrt(x)) < 0.9 past x = (1.1 / 0.9 - 1) / 0.01 squared ~= 493.8
+    assert calc_risk_weight_x18(risk, to_x18(400), HealthType.INITIAL) == to_x18(0.9)
+    # 1.1 / (1 + 0.01 * 30)
+    assert (
+        calc_risk_weight_x18(risk, to_x18(900), HealthType.INITIAL)
+        == 846153846153846153
+    )
+    # 0.9 * (1 + 0.01 * sqrt(x)) > 1.1 past the same threshold
+    assert calc_risk_weight_x18(risk, -to_x18(400), HealthType.INITIAL) == to_x18(1.1)
+    assert calc_risk_weight_x18(risk, -to_x18(900), HealthType.INITIAL) == to_x18(1.17)
+    assert calc_risk_weight_x18(risk, to_x18(900), HealthType.UNWEIGHTED) == to_x18(1)
+
+    calculator = SubaccountHealthCalculator.from_subaccount_info(
+        subaccount_info(btc=900, btc_penalty=0.01)
+    )
+    assert calculator.contribution(1) == 900 * 30000 * 846153846153846153
+
+
+@pytest.mark.benchmark
+def test_health_what_if_benchmark(subaccount_info: Callable[..., SubaccountInfoData]):
+    calculator = SubaccountHealthCalculator.from_subaccount_info(subaccount_info())
+    rng = random.Random(30)
+    scenarios = [
+        calculator.order_deltas(
+            rng.choice([1, 2]),
+            rng.randint(-(10**19), 10**19),
+            rng.randint(1000, 40000) * 10**18,
+        )
+        for _ in range(10000)
+    ]
+    start = time.perf_counter()
+    healths = [calculator.health(HealthType.INITIAL, deltas) for deltas in scenarios]
+    elapsed = time.perf_counter() - start
+    assert len(healths) == 10000
+    assert elapsed < 1
+
+
+def test_max_order_size(subaccount_info: Callable[..., SubaccountInfoData]):
+    estimator = SubaccountLimitsEstimator(subaccount_info())
+    long, short = MaxOrderSizeDirection.LONG, MaxOrderSizeDirection.SHORT
+
+    # each BTC bought at 30000 costs 30000 - 30000 * 0.9 = 3000 of the 27700 initial health
+    assert estimator.max_order_size(1, to_x18(30000), long) == to_x18(9.233)
+    assert estimator.max_order_size(1, str(to_x18(30000)), long, False) == to_x18(0.033)
+    # selling the 1 BTC held adds 3000 of health, then each BTC shorted costs 3000
+    assert estimator.max_order_size(1, to_x18(30000), short) == to_x18(11.233)
+    assert estimator.max_order_size(1, to_x18(30000), short, False) == to_x18(1)
+    # closing the 2 ETH short adds 2 * 200, then each ETH long costs 200
+    assert estimator.max_order_size(2, to_x18(2000), long) == to_x18(142.5)
+    assert estimator.max_order_size(2, to_x18(2000), long, False) == to_x18(142.5)
+    # fees are paid on top of the order's notional
+    assert estimator.max_order_size(
+        1, to_x18(30000), long, False, fee_rate_x18=to_x18(0.01)
+    ) == to_x18(0.033)
+    assert estimator.max_order_size(
+        1, to_x18(30000), long, fee_rate_x18=to_x18(0.01)
+    ) == to_x18(8.393)
+
+    with pytest.raises(ValueError, match="Invalid product id"):
+        estimator.max_order_size(5, to_x18(1), long)
+
+
+def test_max_order_size_with_negative_health(
+    subaccount_info: Callable[..., SubaccountInfoData],
+):
+    estimator = SubaccountLimitsEstimator(subaccount_info(usdc=-30000))
+    assert estimator.calculator.health() < 0
+    # only orders that don't lower health further are allowed: selling the BTC held
+    # adds 3000 of health, which the next BTC shorted takes back
+    assert estimator.max_order_size(1, to_x18(30000), MaxOrderSizeDirection.LONG) == 0
+    assert estimator.max_order_size(
+        1, to_x18(30000), MaxOrderSizeDirection.SHORT
+    ) == to_x18(2)
+
+
+def test_max_withdrawable(subaccount_info: Callable[..., SubaccountInfoData]):
+    estimator = SubaccountLimitsEstimator(subaccount_info())
+    assert estimator.max_withdrawable(0) == to_x18(27700)
+    assert estimator.max_withdrawable(0, spot_leverage=False) == to_x18(1000)
+    # 1 BTC costs 27000 of health, then each borrowed BTC costs 33000
+    assert abs(estimator.max_withdrawable(1) - to_x18(1 + 700 / 33000)) < 10**4
+    assert estimator.max_withdrawable(1, spot_leverage=False) == to_x18(1)
+
+    with pytest.raises(ValueError, match="Invalid product id"):
+        estimator.max_withdrawable(2)
+
+
+def test_max_lp_mintable(subaccount_info: Callable[..., SubaccountInfoData]):
+    estimator = SubaccountLimitsEstimator(subaccount_info())
+    # pools are empty, so base and quote are provided at the oracle price
+    assert estimator.max_lp_mintable(1, spot_leverage=False) == (
+        to_x18(0.033),
+        to_x18(990),
+    )
+    # each base unit minted costs 27000 + 30000 of health
+    assert estimator.max_lp_mintable(1) == (to_x18(0.485), to_x18(14550))
+    assert estimator.max_lp_mintable(2, spot_leverage=False) == (
+        to_x18(0.5),
+        to_x18(1000),
+    )
+
+
+def test_limits_estimator_updates_on_fills(
+    subaccount_info: Callable[..., SubaccountInfoData],
+):
+    estimator = SubaccountLimitsEstimator(subaccount_info())
+    estimator.update_subaccount(subaccount_info(usdc=31000))
+    assert estimator.max_withdrawable(0, spot_leverage=False) == to_x18(31000)
+
+    # 30000 more of initial health, at 3000 per BTC bought
+    assert estimator.max_order_size(
+        1, to_x18(30000), MaxOrderSizeDirection.LONG
+    ) == to_x18(19.233)
+
+
+def test_limits_estimator_invariants(subaccount_info_data: dict):
+    # 1000 USDC, 1 BTC, ETH-PERP -2 with 4100 v_quote, i.e. 27700 of initial health
+    info = SubaccountInfoData.parse_obj(subaccount_info_data)
+    estimator = SubaccountLimitsEstimator(info)
+    calculator = estimator.calculator
+    size_increments = {
+        product.product_id: int(product.book_info.size_increment)
+        for product in info.spot_products + info.perp_products
+    }
+    assert calculator.health(HealthType.INITIAL) == to_x18(27700)
+
+    def initial_health(product_id: int, amount: int, price_x18: int) -> int:
+        return calculator.health(
+            HealthType.INITIAL, calculator.order_deltas(product_id, amount, price_x18)
+        )
+
+    # max order sizes are the largest multiple of the size increment keeping health >= 0
+    for product_id, price_x18 in [
+        (1, to_x18(30000)),
+        (2, to_x18(30000)),
+        (4, to_x18(2000)),
+    ]:
+        for direction in MaxOrderSizeDirection:
+            sign = 1 if direction == MaxOrderSizeDirection.LONG else -1
+            size = estimator.max_order_size(product_id, price_x18, direction)
+            assert size > 0
+            assert size % size_increments[product_id] == 0
+            assert initial_health(product_id, sign * size, price_x18) >= 0
+            assert (
+                initial_health(
+                    product_id, sign * (size + size_increments[product_id]), price_x18
+                )
+                < 0
+            )
+
+    # without spot leverage, spot orders are limited by the balances they spend
+    assert estimator.max_order_size(
+        1, to_x18(30000), MaxOrderSizeDirection.SHORT, spot_leverage=False
+    ) == to_x18(1)
+    no_leverage_long = estimator.max_order_size(
+        1, to_x18(30000), MaxOrderSizeDirection.LONG, spot_leverage=False
+    )
+    assert fixed.mul(no_leverage_long, to_x18(30000)) <= to_x18(1000)
+    assert fixed.mul(no_leverage_long + size_increments[1], to_x18(30000)) > to_x18(
+        1000
+    )
+
+    # max withdrawable is the largest amount keeping health >= 0
+    withdrawable = estimator.max_withdrawable(0)
+    assert calculator.health(HealthType.INITIAL, [(0, -withdrawable, 0)]) >= 0
+    assert calculator.health(HealthType.INITIAL, [(0, -withdrawable - 1, 0)]) < 0
+    assert estimator.max_withdrawable(0, spot_leverage=False) == to_x18(1000)
+    with pytest.raises(ValueError):
+        estimator.max_withdrawable(2)
+
+    # LP mints are limited by the quote balance without spot leverage
+    base, quote = estimator.max_lp_mintable(1, spot_leverage=False)
+    assert 0 < base <= to_x18(1)
+    assert base % size_increments[1] == 0
+    assert 0 < quote <= to_x18(1000)
+
+
+def test_limits_estimator_quote_product(subaccount_info_data: dict):
+    # the quote product has a size increment of 0, sizes are left unrounded
+    estimator = SubaccountLimitsEstimator(
+        SubaccountInfoData.parse_obj(subaccount_info_data)
+    )
+    assert estimator.max_order_size(
+        0, to_x18(1), MaxOrderSizeDirection.SHORT, spot_leverage=False
+    ) == to_x18(1000)
+    assert estimator.max_order_size(
+        0, to_x18(1), MaxOrderSizeDirection.LONG, spot_leverage=False
+    ) == to_x18(1000)
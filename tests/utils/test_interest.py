@@ -0,0 +1,95 @@
+import random
+from typing import Callable
+
+import pytest
+
+from vertex_protocol.engine_client.types.models import SpotProduct
+from vertex_protocol.utils.interest import (
+    calc_borrow_rate_in_period,
+    calc_borrow_rate_per_second,
+    calc_deposit_rate_in_period,
+    calc_interest_rates,
+    calc_utilization_ratio,
+)
+from vertex_protocol.utils.time import TimeInSeconds
+
+
+def _spot_product(
+    spot_product: Callable[..., dict],
+    product_id: int,
+    total_deposits: int,
+    total_borrows: int,
+    rng: random.Random,
+) -> SpotProduct:
+    return SpotProduct.parse_obj(
+        spot_product(
+            product_id,
+            rng.randint(1, 50000) * 10**18,
+            deposits_multiplier_x18=10**18 + rng.randint(0, 10**17),
+            borrows_multiplier_x18=10**18 + rng.randint(0, 10**17),
+            total_deposits_normalized=total_deposits,
+            total_borrows_normalized=total_borrows,
+        )
+    )
+
+
+def test_calc_interest_rates_matches_scalar_functions(
+    spot_product: Callable[..., dict],
+):
+    rng = random.Random(29)
+    products = [
+        _spot_product(spot_product, 0, 0, 0, rng),
+        _spot_product(spot_product, 1, 10**24, 0, rng),
+    ]
+    for product_id in range(2, 200, 2):
+        deposits = rng.randint(1, 10**27)
+        products.append(
+            _spot_product(
+                spot_product, product_id, deposits, rng.randint(1, deposits), rng
+            )
+        )
+
+    periods = [TimeInSeconds.DAY, TimeInSeconds.YEAR]
+    rates = calc_interest_rates(products, periods, interest_fee_fraction=0.2)
+
+    assert rates.product_ids.tolist() == [product.product_id for product in products]
+    assert rates.utilization[0] == rates.utilization[1] == 0
+    assert rates.borrow_rates[TimeInSeconds.YEAR][1] == 0
+    assert any(utilization > 0.8 for utilization in rates.utilization)
+    for i, product in enumerate(products):
+        assert rates.utilization[i] == pytest.approx(
+            calc_utilization_ratio(product), rel=1e-12
+        )
+        assert rates.borrow_rates_per_second[i] == pytest.approx(
+            calc_borrow_rate_per_second(product), rel=1e-12
+        )
+        for period in periods:
+            assert rates.borrow_rates[period][i] == pytest.approx(
+                calc_borrow_rate_in_period(product, period), rel=1e-9
+            )
+            assert rates.deposit_rates[period][i] == pytest.approx(
+                calc_deposit_rate_in_period(product, period, 0.2), rel=1e-9
+            )
+
+
+def test_calc_interest_rates_empty():
+    rates = calc_interest_rates([], [TimeInSeconds.YEAR])
+    assert len(rates.product_ids) == 0
+    assert len(rates.borrow_rates[TimeInSeconds.YEAR]) == 0
+
+
+def test_calc_interest_rates_deduplicates_periods(spot_product: Callable[..., dict]):
+    rng = random.Random(30)
+    products = [
+        _spot_product(spot_product, product_id, 10**24, 10**23 * product_id, rng)
+        for product_id in range(1, 4)
+    ]
+    rates = calc_interest_rates(
+        products, [TimeInSeconds.DAY, TimeInSeconds.YEAR, TimeInSeconds.DAY]
+    )
+    assert list(rates.borrow_rates) == [TimeInSeconds.DAY, TimeInSeconds.YEAR]
+    for i, product in enumerate(products):
+        assert rates.borrow_rates[TimeInSeconds.DAY][i] == pytest.approx(
+            calc_borrow_rate_in_period(product, TimeInSeconds.DAY), rel=1e-9
+        )
+    assert len(rates.deposit_rates[TimeInSeconds.DAY]) == len(products)
@@ -0,0 +1,174 @@
+import time
+
+import pytest
+
+from vertex_protocol.utils.bytes32 import hex_to_bytes32
+from vertex_protocol.utils.ladder import build_ladder_levels, build_order_ladder
+from vertex_protocol.utils.math import mul_x18, round_x18, to_x18
+
+PRICE_INCREMENT_X18 = 10**16  # 0.01
+SIZE_INCREMENT = 10**15  # 0.001
+MIN_SIZE = 10 * 10**18  # 10 USDC notional
+
+
+def test_build_ladder_levels_rounds_to_increments():
+    levels = build_ladder_levels(
+        [28898.374, 0.3, 10.15],
+        [0.1234, -100.0, 2.0006],
+        PRICE_INCREMENT_X18,
+        SIZE_INCREMENT,
+        MIN_SIZE,
+    )
+    assert levels == [
+        (28898370000000000000000, 123000000000000000),
+        (300000000000000000, -100000000000000000000),
+        (10150000000000000000, 2001000000000000000),
+    ]
+    # increments as returned in `ProductBookInfo`
+    assert (
+        build_ladder_levels(
+            [28898.374, 0.3, 10.15],
+            [0.1234, -100.0, 2.0006],
+            str(PRICE_INCREMENT_X18),
+            str(SIZE_INCREMENT),
+            str(MIN_SIZE),
+        )
+        == levels
+    )
+
+
+def test_build_ladder_levels_matches_decimal_path_on_increments():
+    prices = [1000 + i * 0.25 for i in range(200)]
+    amounts = [(-1) ** i * round(0.5 + i * 0.001, 3) for i in range(200)]
+    levels = build_ladder_levels(
+        prices, amounts, PRICE_INCREMENT_X18, SIZE_INCREMENT, MIN_SIZE
+    )
+    assert levels == [
+        (
+            round_x18(to_x18(price), PRICE_INCREMENT_X18),
+            round_x18(to_x18(abs(amount)), SIZE_INCREMENT) * (1 if amount > 0 else -1),
+        )
+        for price, amount in zip(prices, amounts)
+    ]
+
+
+def test_build_ladder_levels_handles_large_values():
+    levels = build_ladder_levels([1e12], [1e9], 1, 1, MIN_SIZE)
+    assert levels == [(10**30, 10**27)]
+
+
+def test_build_ladder_levels_validation():
+    with pytest.raises(ValueError, match="Mismatched ladder"):
+        build_ladder_levels([1.0, 2.0], [1.0], PRICE_INCREMENT_X18, 1, 0)
+
+    with pytest.raises(ValueError, match="Invalid ladder level 1"):
+        build_ladder_levels(
+            [100.0, 0.001], [1.0, 1.0], PRICE_INCREMENT_X18, SIZE_INCREMENT, 0
+        )
+
+    with pytest.raises(ValueError, match="Invalid ladder level 0"):
+        build_ladder_levels(
+            [100.0], [0.0004], PRICE_INCREMENT_X18, SIZE_INCREMENT, MIN_SIZE
+        )
+
+    # 0.05 * 100 = 5 USDC notional, below min size
+    with pytest.raises(ValueError, match="Invalid ladder level 0"):
+        build_ladder_levels(
+            [100.0], [0.05], PRICE_INCREMENT_X18, SIZE_INCREMENT, MIN_SIZE
+        )
+
+    levels = build_ladder_levels(
+        [100.0, 0.001, 100.0, 100.0],
+        [1.0, 1.0, 0.05, -0.2],
+        PRICE_INCREMENT_X18,
+        SIZE_INCREMENT,
+        MIN_SIZE,
+        skip_invalid=True,
+    )
+    assert levels == [(100 * 10**18, 10**18), (100 * 10**18, -2 * 10**17)]
+
+
+def test_build_order_ladder(senders: list[str]):
+    orders = build_order_ladder(
+        senders[0],
+        [100.0, 101.0],
+        [1.0, -1.0],
+        PRICE_INCREMENT_X18,
+        SIZE_INCREMENT,
+        MIN_SIZE,
+        expiration=4611687701117784255,
+        nonces=[1, 2],
+    )
+    assert [order.dict() for order in orders] == [
+        {
+            "sender": hex_to_bytes32(senders[0]),
+            "priceX18": 100 * 10**18,
+            "amount": 10**18,
+            "expiration": 4611687701117784255,
+            "nonce": 1,
+        },
+        {
+            "sender": hex_to_bytes32(senders[0]),
+            "priceX18": 101 * 10**18,
+            "amount": -(10**18),
+            "expiration": 4611687701117784255,
+            "nonce": 2,
+        },
+    ]
+
+    with pytest.raises(ValueError, match="nonces"):
+        build_order_ladder(
+            senders[0],
+            [100.0, 101.0],
+            [1.0, -1.0],
+            PRICE_INCREMENT_X18,
+            SIZE_INCREMENT,
+            MIN_SIZE,
+            expiration=1,
+            nonces=[1],
+        )
+
+
+BENCHMARK_PRICES = [28000 + i * 0.37 for i in range(50)]
+BENCHMARK_AMOUNTS = [0.01 * (i + 1) for i in range(50)]
+
+
+def _decimal_ladder_levels() -> list[tuple[int, int]]:
+    levels = []
+    for price, amount in zip(BENCHMARK_PRICES, BENCHMARK_AMOUNTS):
+        price_x18 = round_x18(to_x18(price), PRICE_INCREMENT_X18)
+        amount_x18 = round_x18(to_x18(amount), SIZE_INCREMENT)
+        if price_x18 <= 0 or amount_x18 == 0:
+            raise ValueError
+        if abs(mul_x18(amount_x18, price_x18)) < MIN_SIZE:
+            raise ValueError
+        levels.append((price_x18, amount_x18))
+    return levels
+
+
+def _ladder_levels() -> list[tuple[int, int]]:
+    return build_ladder_levels(
+        BENCHMARK_PRICES,
+        BENCHMARK_AMOUNTS,
+        PRICE_INCREMENT_X18,
+        SIZE_INCREMENT,
+        MIN_SIZE,
+    )
+
+
+def test_build_ladder_levels_matches_decimal_path():
+    assert _ladder_levels() == _decimal_ladder_levels()
+
+
+@pytest.mark.benchmark
+def test_build_ladder_levels_benchmark():
+    def best_of(fn, runs: int = 5, iterations: int = 200) -> float:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    assert best_of(_decimal_ladder_levels) / best_of(_ladder_levels) > 3
@@ -0,0 +1,162 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from vertex_protocol.engine_client import EngineClient
+from vertex_protocol.engine_client.types.execute import (
+    PlaceIsolatedOrderParams,
+    PlaceOrderParams,
+    PlaceOrderRequest,
+)
+from vertex_protocol.engine_client.types.query import AllProductsData
+from vertex_protocol.trigger_client import TriggerClient
+from vertex_protocol.trigger_client.types.execute import PlaceTriggerOrderParams
+from vertex_protocol.utils.exceptions import InvalidOrderException
+from vertex_protocol.utils.execute import IsolatedOrderParams, OrderParams
+from vertex_protocol.utils.expiration import OrderType, get_expiration_timestamp
+from vertex_protocol.utils.math import to_x18
+from vertex_protocol.utils.order_validation import OrderValidator
+from vertex_protocol.utils.time import now_in_seconds
+
+
+def _order(
+    price: float, amount: float, expires_in: int = 60, reduce_only: bool = False
+) -> OrderParams:
+    return OrderParams(
+        sender="0x" + "1" * 64,
+        priceX18=to_x18(price),
+        amount=to_x18(amount),
+        expiration=get_expiration_timestamp(
+            OrderType.DEFAULT, now_in_seconds() + expires_in, reduce_only
+        ),
+        nonce=1,
+    )
+
+
+def _mock_success(mock_post: MagicMock):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"status": "success", "signature": "0x"}
+    mock_post.return_value = response
+
+
+def test_order_validator(all_products_data: dict):
+    # product 1: price increment 1, size increment 0.001 and min notional 10
+    all_products = AllProductsData.parse_obj(all_products_data)
+    strict = OrderValidator.from_all_products(all_products)
+    rounding = OrderValidator.from_all_products(all_products, auto_round=True)
+
+    valid = _order(30000, -0.001)
+    assert strict.validate(1, valid) is valid
+    assert rounding.validate(1, valid) is valid
+
+    for invalid in [_order(30000.5, 0.001), _order(30000, 0.0015)]:
+        with pytest.raises(InvalidOrderException, match="is not a multiple of"):
+            strict.validate(1, invalid)
+        with pytest.raises(InvalidOrderException, match="is not a multiple of"):
+            rounding.validate(1, invalid, auto_round=False)
+
+    rounded = rounding.validate(1, _order(30000.5, -0.0015))
+    assert rounded.priceX18 == to_x18(30001)
+    # amounts are rounded toward zero
+    assert rounded.amount == to_x18(-0.001)
+
+    # orders that can't be fixed by rounding are always rejected
+    with pytest.raises(InvalidOrderException, match="rounds to zero"):
+        rounding.validate(1, _order(30000, 0.0005))
+    with pytest.raises(InvalidOrderException, match="minimum size"):
+        rounding.validate(1, _order(3000, 0.001))
+    with pytest.raises(InvalidOrderException, match="has passed"):
+        rounding.validate(1, _order(30000, 0.001, expires_in=-1))
+    with pytest.raises(InvalidOrderException, match="zero amount"):
+        rounding.validate(1, _order(30000, 0))
+    with pytest.raises(InvalidOrderException, match="has passed"):
+        OrderValidator(strict.rules, min_time_to_expiration=120).validate(
+            1, _order(30000, 0.001)
+        )
+    with pytest.raises(InvalidOrderException, match="has passed"):
+        OrderValidator(strict.rules, min_time_to_expiration=120).validate(
+            1, _order(30000, 0.001, reduce_only=True)
+        )
+
+    # the quote product has no book, so its orders aren't validated
+    assert 0 not in strict.rules
+    quote = _order(1, 10)
+    assert strict.validate(0, quote) is quote
+
+    # orders of unknown products are passed through
+    unknown = _order(0.5, 0.5)
+    assert strict.validate(99, unknown) is unknown
+
+    assert strict.stats.validated == 3
+    assert strict.stats.rejected == 2
+    assert strict.stats.round_trips_saved == 2
+    assert rounding.stats.validated == 8
+    assert rounding.stats.rounded == 1
+    assert rounding.stats.rejected == 6
+    assert rounding.stats.round_trips_saved == 7
+
+
+def test_place_order_validation(
+    engine_client: EngineClient, mock_post: MagicMock, all_products_data: dict
+):
+    _mock_success(mock_post)
+    with patch.object(
+        engine_client._querier,
+        "get_all_products",
+        return_value=AllProductsData.parse_obj(all_products_data),
+    ):
+        validator = engine_client.enable_order_validation(auto_round=True)
+    assert engine_client.order_validator is validator
+
+    res = engine_client.place_order(
+        PlaceOrderParams(product_id=1, order=_order(30000.4, 0.0019))
+    )
+    order = PlaceOrderRequest(**res.req).place_order.order
+    assert int(order.priceX18) == to_x18(30000)
+    assert int(order.amount) == to_x18(0.001)
+
+    # pre-signed orders are never rounded
+    with pytest.raises(InvalidOrderException):
+        engine_client.place_order(
+            PlaceOrderParams(product_id=1, order=_order(30000.4, 0.001), signature="0x")
+        )
+    with pytest.raises(InvalidOrderException):
+        engine_client.place_isolated_order(
+            PlaceIsolatedOrderParams(
+                product_id=2,
+                isolated_order=IsolatedOrderParams(
+                    **_order(30000, 0.0001).dict(), margin=to_x18(10)
+                ),
+            )
+        )
+    assert mock_post.call_count == 1
+    assert validator.stats.round_trips_saved == 3
+
+
+def test_place_trigger_order_validation(
+    trigger_client: TriggerClient, mock_post: MagicMock, all_products_data: dict
+):
+    _mock_success(mock_post)
+    trigger_client.order_validator = OrderValidator.from_all_products(
+        AllProductsData.parse_obj(all_products_data)
+    )
+
+    with pytest.raises(InvalidOrderException):
+        trigger_client.place_trigger_order(
+            PlaceTriggerOrderParams(
+                product_id=2,
+                order=_order(30000.5, 0.001),
+                trigger={"price_above": str(to_x18(31000))},
+            )
+        )
+    assert mock_post.call_count == 0
+
+    trigger_client.place_trigger_order(
+        PlaceTriggerOrderParams(
+            product_id=2,
+            order=_order(30000, 0.001),
+            trigger={"price_above": str(to_x18(31000))},
+        )
+    )
+    assert mock_post.call_count == 1
@@ -0,0 +1,323 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from vertex_protocol.client.apis.market.scheduler import (
+    ExecutionAlgo,
+    ExecutionScheduler,
+    ParentOrderParams,
+    ParentOrderStatus,
+)
+from vertex_protocol.engine_client import EngineClient
+from vertex_protocol.engine_client.types.execute import (
+    CancelOrdersResponse,
+    ExecuteResponse,
+    PlaceOrderParams,
+)
+from vertex_protocol.engine_client.types.query import OrderData
+from vertex_protocol.indexer_client import IndexerClient
+from vertex_protocol.utils.bytes32 import bytes32_to_hex
+from vertex_protocol.utils.math import to_x18
+from vertex_protocol.utils.nonce import gen_order_nonce
+from vertex_protocol.utils.order_validation import OrderRules, OrderValidator
+
+
+class FakeBook:
+    """
+    Engine and indexer double keeping the open child orders of a single subaccount, and the
+    filled amount of every placed order.
+    """
+
+    def __init__(self, fill_on_place: bool):
+        self.fill_on_place = fill_on_place
+        self.open_orders: dict[str, int] = {}
+        self.filled: dict[str, int] = {}
+        self.placed: list[PlaceOrderParams] = []
+        self.client = MagicMock(spec=EngineClient)
+        self.client.order_validator = OrderValidator(
+            {
+                2: OrderRules(
+                    price_increment_x18=to_x18(1),
+                    size_increment=to_x18(0.001),
+                    min_size=to_x18(10),
+                )
+            }
+        )
+        self.client.sign_order.side_effect = self.sign_order
+        self.client.get_order_digest.side_effect = lambda order, _: self.digest(order)
+        self.client.execute.side_effect = self.execute
+        self.client.get_subaccount_open_orders.side_effect = (
+            lambda product_id, sender: SimpleNamespace(
+                orders=[
+                    SimpleNamespace(digest=digest, unfilled_amount=str(unfilled))
+                    for digest, unfilled in self.open_orders.items()
+                ]
+            )
+        )
+        self.client.cancel_orders.side_effect = self.cancel_orders
+        self.indexer = MagicMock(spec=IndexerClient)
+        self.indexer.resolve_historical_orders_by_digest.side_effect = lambda digests: {
+            digest: SimpleNamespace(base_filled=str(self.filled[digest]))
+            for digest in digests
+            if digest in self.filled
+        }
+
+    @staticmethod
+    def digest(order) -> str:
+        return f"0x{int(order.nonce):064x}"
+
+    def sign_order(self, params: PlaceOrderParams) -> PlaceOrderParams:
+        params = params.copy(deep=True)
+        params.order.nonce = gen_order_nonce()
+        params.signature = "0x"
+        return params
+
+    def execute(self, params: PlaceOrderParams) -> ExecuteResponse:
+        self.placed.append(params)
+        digest = self.digest(params.order)
+        if self.fill_on_place:
+            self.filled[digest] = int(params.order.amount)
+        else:
+            self.filled[digest] = 0
+            self.open_orders[digest] = int(params.order.amount)
+        return ExecuteResponse(status="success")
+
+    def fill(self, amount: Optional[int] = None):
+        for digest, unfilled in list(self.open_orders.items()):
+            fill = unfilled if amount is None else amount
+            self.filled[digest] += fill
+            if fill == unfilled:
+                del self.open_orders[digest]
+            else:
+                self.open_orders[digest] = unfilled - fill
+
+    def cancel_orders(self, params) -> ExecuteResponse:
+        cancelled = [
+            OrderData(
+                product_id=2,
+                sender="0x",
+                price_x18="0",
+                amount="0",
+                expiration="0",
+                nonce="0",
+                unfilled_amount=str(self.open_orders.pop(digest)),
+                digest=digest,
+                placed_at="0",
+            )
+            for digest in map(bytes32_to_hex, params.digests)
+            if digest in self.open_orders
+        ]
+        return ExecuteResponse(
+            status="success", data=CancelOrdersResponse(cancelled_orders=cancelled)
+        )
+
+
+def _params(sender: str, algo: ExecutionAlgo, **kwargs) -> ParentOrderParams:
+    return ParentOrderParams(
+        **{
+            "product_id": 2,
+            "sender": sender,
+            "amount": to_x18(1),
+            "price_x18": to_x18(30000),
+            "algo": algo,
+            "duration": 0.4,
+            "interval": 0.05,
+            **kwargs,
+        }
+    )
+
+
+def test_twap(senders: list[str]):
+    book = FakeBook(fill_on_place=True)
+    scheduler = ExecutionScheduler(
+        book.client, refresh_interval=0, indexer_client=book.indexer
+    )
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        parent = await scheduler.submit(
+            _params(senders[0], ExecutionAlgo.TWAP, duration=0.2)
+        )
+        await scheduler.join()
+        return parent, [child.placed_at - start for child in parent.children]
+
+    parent, offsets = asyncio.run(run())
+    scheduler.close()
+
+    assert parent.status == ParentOrderStatus.FILLED
+    assert [child.amount for child in parent.children] == [to_x18(0.25)] * 4
+    assert parent.filled_amount == to_x18(1)
+    assert book.client.sign_order.call_count == 4
+    # child orders are placed on fixed deadlines
+    for i, offset in enumerate(offsets):
+        assert offset == pytest.approx(i * 0.05, abs=0.03)
+    book.client.cancel_orders.assert_not_called()
+
+
+def test_iceberg(senders: list[str]):
+    book = FakeBook(fill_on_place=False)
+    scheduler = ExecutionScheduler(
+        book.client, refresh_interval=0, indexer_client=book.indexer
+    )
+
+    async def run():
+        parent = await scheduler.submit(
+            _params(
+                senders[0],
+                ExecutionAlgo.ICEBERG,
+                amount=-to_x18(1),
+                display_amount=to_x18(0.4),
+            )
+        )
+        await asyncio.sleep(0.02)
+        # one child order is visible at a time
+        assert [child.amount for child in parent.children] == [-to_x18(0.4)]
+        book.fill()
+        await asyncio.sleep(0.06)
+        assert [child.amount for child in parent.children] == [
+            -to_x18(0.4),
+            -to_x18(0.4),
+        ]
+        book.fill(-to_x18(0.1))
+        await scheduler.join()
+        return parent
+
+    parent = asyncio.run(run())
+    scheduler.close()
+
+    # the working child order is cancelled once the parent order expires
+    assert parent.status == ParentOrderStatus.EXPIRED
+    assert parent.filled_amount == -to_x18(0.5)
+    assert parent.working_amount == 0
+    assert book.open_orders == {}
+    assert book.client.cancel_orders.call_count == 1
+
+
+def test_pov_and_concurrent_parent_orders(senders: list[str]):
+    book = FakeBook(fill_on_place=True)
+    volume = {"traded": 0}
+
+    def market_volume(product_id: int) -> int:
+        volume["traded"] += to_x18(1)
+        return volume["traded"]
+
+    scheduler = ExecutionScheduler(
+        book.client,
+        market_volume=market_volume,
+        refresh_interval=0,
+        indexer_client=book.indexer,
+    )
+
+    async def run():
+        pov = await scheduler.submit(
+            _params(
+                senders[0],
+                ExecutionAlgo.POV,
+                participation_rate=0.5,
+                duration=10,
+            )
+        )
+        iceberg = await scheduler.submit(
+            _params(
+                senders[1],
+                ExecutionAlgo.ICEBERG,
+                display_amount=to_x18(0.5),
+                duration=10,
+            )
+        )
+        await asyncio.sleep(0.02)
+        await scheduler.cancel(iceberg.id)
+        await scheduler.join()
+        return pov, iceberg
+
+    pov, iceberg = asyncio.run(run())
+    scheduler.close()
+
+    # half of the volume traded since the order started, until it is filled
+    assert pov.status == ParentOrderStatus.FILLED
+    assert [child.amount for child in pov.children] == [to_x18(0.5), to_x18(0.5)]
+    assert iceberg.status == ParentOrderStatus.CANCELLED
+    assert scheduler.get(iceberg.id) is iceberg
+    assert scheduler.parent_orders == [pov, iceberg]
+
+
+def test_child_orders_closed_outside_the_scheduler(senders: list[str]):
+    book = FakeBook(fill_on_place=False)
+    scheduler = ExecutionScheduler(
+        book.client, refresh_interval=0, indexer_client=book.indexer
+    )
+
+    async def run():
+        parent = await scheduler.submit(
+            _params(
+                senders[0],
+                ExecutionAlgo.ICEBERG,
+                display_amount=to_x18(0.4),
+            )
+        )
+        await asyncio.sleep(0.02)
+        # partially filled, then cancelled outside the scheduler
+        book.fill(to_x18(0.1))
+        book.open_orders.clear()
+        await asyncio.sleep(0.06)
+        first = parent.children[0]
+        assert (first.filled_amount, first.is_open) == (to_x18(0.1), False)
+        # the next child order is placed once the first one is confirmed closed
+        assert len(parent.children) == 2
+        await scheduler.join()
+        return parent
+
+    parent = asyncio.run(run())
+    scheduler.close()
+
+    assert parent.status == ParentOrderStatus.EXPIRED
+    assert parent.filled_amount == to_x18(0.1)
+    assert book.indexer.resolve_historical_orders_by_digest.call_count == 1
+
+
+def test_pov_without_indexer(senders: list[str]):
+    book = FakeBook(fill_on_place=True)
+    volume = {"traded": 0}
+
+    def market_volume(product_id: int) -> int:
+        volume["traded"] += to_x18(1)
+        return volume["traded"]
+
+    scheduler = ExecutionScheduler(
+        book.client, market_volume=market_volume, refresh_interval=0
+    )
+
+    async def run():
+        parent = await scheduler.submit(
+            _params(senders[0], ExecutionAlgo.POV, participation_rate=0.5, duration=0.3)
+        )
+        await scheduler.join()
+        return parent
+
+    parent = asyncio.run(run())
+    scheduler.close()
+
+    # child orders leaving the open orders are assumed filled, so none is placed twice
+    assert parent.status == ParentOrderStatus.FILLED
+    assert sum(int(params.order.amount) for params in book.placed) == to_x18(1)
+
+
+def test_invalid_parent_orders(senders: list[str]):
+    scheduler = ExecutionScheduler(FakeBook(fill_on_place=True).client)
+
+    async def submit(**kwargs):
+        await scheduler.submit(_params(senders[0], **kwargs))
+
+    for kwargs in [
+        {"algo": ExecutionAlgo.TWAP, "amount": 0},
+        {"algo": ExecutionAlgo.TWAP, "interval": 0},
+        {"algo": ExecutionAlgo.POV, "participation_rate": 0.1},
+        {"algo": ExecutionAlgo.ICEBERG},
+    ]:
+        with pytest.raises(ValueError, match="Invalid parent order"):
+            asyncio.run(submit(**kwargs))
+    scheduler.close()
@@ -1,3 +1,4 @@
+from vertex_protocol.engine_client.order_pool import PresignedOrderPool
 from vertex_protocol.engine_client.types.execute import (
     BurnLpParams,
     CancelAndPlaceParams,
@@ -8,8 +9,14 @@ from vertex_protocol.engine_client.types.execute import (
     PlaceMarketOrderParams,
     PlaceOrderParams,
     PlaceIsolatedOrderParams,
+    PlaceSmartMarketOrderParams,
+    SmartMarketOrderResponse,
 )
 from vertex_protocol.client.apis.base import VertexBaseAPI
+from vertex_protocol.client.apis.market.scheduler import (
+    ExecutionScheduler,
+    market_volume_from_indexer,
+)
 from vertex_protocol.trigger_client.types.execute import (
     PlaceTriggerOrderParams,
     CancelTriggerOrdersParams,
@@ -107,6 +114,60 @@ class MarketExecuteAPI(VertexBaseAPI):
         """
         return self.context.engine_client.place_market_order(params)
 
+    def place_smart_market_order(
+        self, params: PlaceSmartMarketOrderParams
+    ) -> SmartMarketOrderResponse:
+        """
+        Places a market order priced off the depth of the book, see `EngineExecuteClient.place_smart_market_order`.
+
+        Args:
+            params (PlaceSmartMarketOrderParams): Parameters required to place the market order.
+
+        Returns:
+            SmartMarketOrderResponse: The expected execution of the order and the responses of its child orders.
+
+        Raises:
+            Exception: If there is an error during the execution or the response status is not "success".
+        """
+        return self.context.engine_client.place_smart_market_order(params)
+
+    def create_execution_scheduler(
+        self, max_workers: int = 8, refresh_interval: float = 1
+    ) -> ExecutionScheduler:
+        """
+        Creates a scheduler running TWAP, POV and iceberg parent orders through the engine.
+
+        POV orders track the products' traded volume from the indexer's market snapshots, and the
+        fills of child orders leaving the open orders are confirmed through the indexer.
+
+        Args:
+            max_workers (int): Size of the thread pool running blocking engine calls. Defaults to 8.
+
+            refresh_interval (float): Minimum seconds between open orders queries of a product and subaccount. Defaults to 1.
+
+        Returns:
+            ExecutionScheduler: The scheduler, whose parent orders run on the event loop they are submitted from.
+        """
+        return ExecutionScheduler(
+            self.context.engine_client,
+            market_volume=market_volume_from_indexer(self.context.indexer_client),
+            max_workers=max_workers,
+            refresh_interval=refresh_interval,
+            indexer_client=self.context.indexer_client,
+        )
+
+    def create_presigned_order_pool(self, **kwargs) -> PresignedOrderPool:
+        """
+        Creates a pool of orders signed ahead of time for anticipated price / amount grids.
+
+        Args:
+            **kwargs: Options of the pool, see `PresignedOrderPool`.
+
+        Returns:
+            PresignedOrderPool: The pool. Call `start` to refresh its orders in the background.
+        """
+        return PresignedOrderPool(self.context.engine_client, **kwargs)
+
     def cancel_orders(self, params: CancelOrdersParams) -> ExecuteResponse:
         """
         Cancels orders through the engine.
@@ -0,0 +1,634 @@
+import asyncio
+import itertools
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from vertex_protocol.engine_client import EngineClient
+from vertex_protocol.engine_client.types.execute import (
+    CancelOrdersParams,
+    CancelOrdersResponse,
+    PlaceOrderParams,
+)
+from vertex_protocol.indexer_client import IndexerClient
+from vertex_protocol.indexer_client.types.query import (
+    IndexerMarketSnapshotInterval,
+    IndexerMarketSnapshotsParams,
+)
+from vertex_protocol.utils.bytes32 import subaccount_to_hex
+from vertex_protocol.utils.enum import StrEnum
+from vertex_protocol.utils.execute import OrderParams
+from vertex_protocol.utils.expiration import OrderType, get_expiration_timestamp
+from vertex_protocol.utils.fixed import X18
+from vertex_protocol.utils.model import VertexBaseModel
+from vertex_protocol.utils.nonce import RECV_TIME_MARGIN_MS
+from vertex_protocol.utils.order_validation import OrderRules, OrderValidator
+from vertex_protocol.utils.subaccount import Subaccount
+from vertex_protocol.utils.time import now_in_millis
+
+T = TypeVar("T")
+
+
+class ExecutionAlgo(StrEnum):
+    TWAP = "twap"
+    POV = "pov"
+    ICEBERG = "iceberg"
+
+
+class ParentOrderStatus(StrEnum):
+    RUNNING = "running"
+    FILLED = "filled"
+    EXPIRED = "expired"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class ParentOrderParams(VertexBaseModel):
+    """
+    Parameters of a parent order, executed by an `ExecutionScheduler` as child limit orders.
+
+    Attributes:
+        product_id (int): The id of the product to trade.
+
+        sender (Subaccount): The subaccount placing the child orders.
+
+        amount (int): Total amount to fill, x18. Positive for a `long` position and negative for a `short`.
+
+        price_x18 (int): Limit price of every child order, x18.
+
+        algo (ExecutionAlgo): `twap` splits the order into equal child orders placed every `interval`,
+        `pov` places child orders tracking `participation_rate` of the product's traded volume and
+        `iceberg` places child orders of `display_amount` one at a time.
+
+        duration (float): Seconds the parent order runs for. Child orders still working afterwards are cancelled.
+
+        interval (float): Seconds between child order decisions. Defaults to 10.
+
+        participation_rate (Optional[float]): Share of the product's traded volume to fill, required by `pov`.
+
+        display_amount (Optional[int]): Absolute amount of each child order, x18, required by `iceberg`.
+
+        spot_leverage (Optional[bool]): An optional flag indicating whether leverage should be used for child orders.
+    """
+
+    product_id: int
+    sender: Subaccount
+    amount: int
+    price_x18: int
+    algo: ExecutionAlgo
+    duration: float
+    interval: float = 10
+    participation_rate: Optional[float]
+    display_amount: Optional[int]
+    spot_leverage: Optional[bool]
+
+
+class ChildOrder(VertexBaseModel):
+    """
+    A child order placed for a parent order.
+
+    Attributes:
+        digest (str): Digest of the order.
+
+        amount (int): Amount of the order, x18, signed like the parent order.
+
+        filled_amount (int): Amount filled so far, x18, signed like the parent order.
+
+        is_open (bool): Whether the order may still fill.
+
+        placed_at (Optional[float]): Event loop time the engine accepted the order at, None while it's being placed.
+    """
+
+    digest: str
+    amount: int
+    filled_amount: int = 0
+    is_open: bool = True
+    placed_at: Optional[float]
+
+
+class ParentOrder:
+    """
+    Local state of a parent order run by an `ExecutionScheduler`.
+    """
+
+    def __init__(self, parent_id: int, params: ParentOrderParams):
+        self.id = parent_id
+        self.params = params
+        self.status = ParentOrderStatus.RUNNING
+        self.children: list[ChildOrder] = []
+        self.error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[Future] = None
+
+    @property
+    def filled_amount(self) -> int:
+        """
+        Amount filled by all child orders, x18, signed like the parent order.
+        """
+        return sum(child.filled_amount for child in self.children)
+
+    @property
+    def working_amount(self) -> int:
+        """
+        Unfilled amount of open child orders, x18, signed like the parent order.
+        """
+        return sum(
+            child.amount - child.filled_amount
+            for child in self.children
+            if child.is_open
+        )
+
+    @property
+    def remaining_amount(self) -> int:
+        """
+        Amount no child order has been placed for yet, x18, signed like the parent order.
+        """
+        return self.params.amount - self.filled_amount - self.working_amount
+
+    @property
+    def is_done(self) -> bool:
+        """
+        Whether the parent order stopped running.
+        """
+        return self.status != ParentOrderStatus.RUNNING
+
+
+class OrderStateTracker:
+    """
+    Locally tracked open orders of each product and subaccount.
+
+    Open orders are queried at most once per `refresh_interval` per product and subaccount, so
+    concurrent parent orders on the same book share queries.
+    """
+
+    def __init__(
+        self,
+        engine_client: EngineClient,
+        run: Callable[..., Any],
+        refresh_interval: float = 1,
+    ):
+        self._engine_client = engine_client
+        self._run = run
+        self.refresh_interval = refresh_interval
+        self._snapshots: dict[tuple[int, str], tuple[float, dict[str, int]]] = {}
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+    async def get(self, product_id: int, sender: str) -> tuple[float, dict[str, int]]:
+        """
+        Retrieves the open orders of a subaccount, querying them if the local state is stale.
+
+        Args:
+            product_id (int): ID of the product.
+
+            sender (str): Subaccount as a hex string.
+
+        Returns:
+            tuple[float, dict[str, int]]: The event loop time the open orders were queried at, and
+            the unfilled amount of each open order by lowercase digest.
+        """
+        key = (product_id, sender.lower())
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            snapshot = self._snapshots.get(key)
+            if snapshot is None or loop.time() - snapshot[0] >= self.refresh_interval:
+                queried_at = loop.time()
+                open_orders = await self._run(
+                    self._engine_client.get_subaccount_open_orders, product_id, sender
+                )
+                snapshot = (
+                    queried_at,
+                    {
+                        order.digest.lower(): int(order.unfilled_amount)
+                        for order in open_orders.orders
+                    },
+                )
+                self._snapshots[key] = snapshot
+            return snapshot
+
+
+def market_volume_from_indexer(
+    indexer_client: IndexerClient, granularity: int = 60
+) -> Callable[[int], int]:
+    """
+    Builds a `pov` volume source from the indexer's market snapshots.
+
+    Args:
+        indexer_client (IndexerClient): The indexer client used to query market snapshots.
+
+        granularity (int): Granularity of the snapshots in seconds, which bounds how often the volume updates. Defaults to 60.
+
+    Returns:
+        Callable[[int], int]: Returns the cumulative traded amount of a product, x18.
+    """
+
+    def market_volume(product_id: int) -> int:
+        snapshots = indexer_client.get_market_snapshots(
+            IndexerMarketSnapshotsParams(
+                interval=IndexerMarketSnapshotInterval(
+                    count=1, granularity=granularity, max_time=None
+                ),
+                product_ids=[product_id],
+            )
+        ).snapshots
+        return int(snapshots[0].cumulative_trade_sizes[str(product_id)])
+
+    return market_volume
+
+
+class ExecutionScheduler:
+    """
+    Runs TWAP, POV and iceberg parent orders as child limit orders on a single event loop.
+
+    Blocking engine calls run on a thread pool so that many parent orders can run concurrently
+    without stalling the loop. Child orders are scheduled against fixed deadlines rather than
+    relative sleeps, so timing doesn't drift under load, and `twap` and `iceberg` child orders are
+    signed one step ahead so that placing them is a single request. Fills are tracked through the
+    subaccount's open orders, see `OrderStateTracker`. Child orders leaving the open orders may have
+    been filled, expired or cancelled outside the scheduler, so their final fill is confirmed
+    through the indexer, or assumed complete without one. Child orders still working when a
+    parent order stops are cancelled.
+    """
+
+    def __init__(
+        self,
+        engine_client: EngineClient,
+        market_volume: Optional[Callable[[int], int]] = None,
+        max_workers: int = 8,
+        refresh_interval: float = 1,
+        indexer_client: Optional[IndexerClient] = None,
+    ):
+        """
+        Initializes the scheduler.
+
+        Args:
+            engine_client (EngineClient): The engine client used to sign, place and cancel child orders.
+
+            market_volume (Callable[[int], int], optional): Returns the cumulative traded amount of a
+            product, x18. Required by `pov` orders, see `market_volume_from_indexer`.
+
+            max_workers (int): Size of the thread pool running blocking engine calls. Defaults to 8.
+
+            refresh_interval (float): Minimum seconds between open orders queries of a product and subaccount. Defaults to 1.
+
+            indexer_client (IndexerClient, optional): The indexer client confirming the fills of child orders
+            that left the open orders. Without it, such child orders are assumed filled.
+        """
+        self._engine_client = engine_client
+        self._market_volume = market_volume
+        self._indexer_client = indexer_client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._tracker = OrderStateTracker(engine_client, self._run, refresh_interval)
+        self._rules: Optional[dict[int, OrderRules]] = (
+            engine_client.order_validator.rules
+            if engine_client.order_validator is not None
+            else None
+        )
+        self._rules_lock: Optional[asyncio.Lock] = None
+        self._parent_orders: dict[int, ParentOrder] = {}
+        self._ids = itertools.count()
+
+    @property
+    def parent_orders(self) -> list[ParentOrder]:
+        """
+        Parent orders submitted to the scheduler, in submission order.
+        """
+        return list(self._parent_orders.values())
+
+    def get(self, parent_id: int) -> Optional[ParentOrder]:
+        """
+        Retrieves a parent order by ID.
+
+        Args:
+            parent_id (int): ID of the parent order.
+
+        Returns:
+            Optional[ParentOrder]: The parent order, None if it wasn't submitted to the scheduler.
+        """
+        return self._parent_orders.get(parent_id)
+
+    async def submit(self, params: ParentOrderParams) -> ParentOrder:
+        """
+        Starts running a parent order on the current event loop.
+
+        Args:
+            params (ParentOrderParams): Parameters of the parent order.
+
+        Returns:
+            ParentOrder: The running parent order.
+
+        Raises:
+            ValueError: If the parameters are invalid for the order's algo.
+        """
+        params = ParentOrderParams.parse_obj(params)
+        if params.amount == 0 or params.price_x18 <= 0:
+            raise ValueError(
+                f"Invalid parent order provided: amount {params.amount} at price {params.price_x18}"
+            )
+        if params.duration <= 0 or params.interval <= 0:
+            raise ValueError(
+                f"Invalid parent order provided: duration {params.duration} and interval {params.interval} must be positive"
+            )
+        if params.algo == ExecutionAlgo.POV and (
+            not params.participation_rate or self._market_volume is None
+        ):
+            raise ValueError(
+                "Invalid parent order provided: `pov` requires a participation rate and a market volume source"
+            )
+        if params.algo == ExecutionAlgo.ICEBERG and not params.display_amount:
+            raise ValueError(
+                "Invalid parent order provided: `iceberg` requires a display amount"
+            )
+        parent = ParentOrder(next(self._ids), params)
+        self._parent_orders[parent.id] = parent
+        parent._task = asyncio.create_task(self._execute(parent))
+        return parent
+
+    async def cancel(self, parent_id: int):
+        """
+        Stops a parent order and cancels its working child orders.
+
+        Args:
+            parent_id (int): ID of the parent order.
+        """
+        parent = self._parent_orders.get(parent_id)
+        if parent is None or parent._task is None:
+            return
+        parent._task.cancel()
+        await asyncio.gather(parent._task, return_exceptions=True)
+
+    async def join(self):
+        """
+        Waits for every submitted parent order to stop.
+        """
+        await asyncio.gather(
+            *[parent._task for parent in self.parent_orders if parent._task],
+            return_exceptions=True,
+        )
+
+    def close(self):
+        """
+        Shuts down the thread pool. Parent orders must be stopped first.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.wrap_future(self._executor.submit(fn, *args))
+
+    async def _get_rules(self, product_id: int) -> Optional[OrderRules]:
+        if self._rules is None:
+            if self._rules_lock is None:
+                self._rules_lock = asyncio.Lock()
+            async with self._rules_lock:
+                if self._rules is None:
+                    all_products = await self._run(self._engine_client.get_all_products)
+                    self._rules = OrderValidator.from_all_products(all_products).rules
+        return self._rules.get(product_id)
+
+    async def _execute(self, parent: ParentOrder):
+        try:
+            await self._run_algo(parent)
+        except asyncio.CancelledError:
+            parent.status = ParentOrderStatus.CANCELLED
+        except Exception as e:
+            parent.status = ParentOrderStatus.FAILED
+            parent.error = e
+        try:
+            await self._cancel_children(parent)
+        except Exception as e:
+            parent.error = parent.error or e
+
+    async def _run_algo(self, parent: ParentOrder):
+        params = parent.params
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + params.duration
+        # child orders outlive the parent order, which cancels them when it stops
+        expiration = get_expiration_timestamp(
+            OrderType.DEFAULT, int(time.time() + params.duration + params.interval) + 1
+        )
+        slices = self._plan_slices(params, await self._get_rules(params.product_id))
+        volume_start = (
+            await self._run(self._market_volume, params.product_id)
+            if params.algo == ExecutionAlgo.POV and self._market_volume
+            else 0
+        )
+        presigned: Optional[asyncio.Future] = None
+        tick = 0
+        try:
+            while True:
+                await self._sync(parent)
+                if parent.filled_amount == params.amount:
+                    parent.status = ParentOrderStatus.FILLED
+                    return
+                if loop.time() >= deadline:
+                    parent.status = ParentOrderStatus.EXPIRED
+                    return
+
+                amount = 0
+                if params.algo == ExecutionAlgo.TWAP and tick < len(slices):
+                    amount = slices[tick]
+                elif params.algo == ExecutionAlgo.ICEBERG:
+                    if parent.working_amount == 0 and slices:
+                        amount = slices[0]
+                elif params.algo == ExecutionAlgo.POV:
+                    amount = await self._pov_amount(parent, volume_start)
+
+                if amount:
+                    if presigned is None:
+                        presigned = self._presign(parent, amount, expiration)
+                    signed, digest = await presigned
+                    presigned = None
+                    await self._place(parent, signed, digest)
+                    if params.algo == ExecutionAlgo.ICEBERG:
+                        slices.pop(0)
+                if presigned is None and params.algo != ExecutionAlgo.POV:
+                    # signs the next child order while waiting for the next tick
+                    next_index = 0 if params.algo == ExecutionAlgo.ICEBERG else tick + 1
+                    if next_index < len(slices):
+                        presigned = self._presign(
+                            parent, slices[next_index], expiration
+                        )
+
+                tick += 1
+                await asyncio.sleep(
+                    max(0, min(start + tick * params.interval, deadline) - loop.time())
+                )
+        finally:
+            if presigned is not None:
+                presigned.cancel()
+
+    def _plan_slices(
+        self, params: ParentOrderParams, rules: Optional[OrderRules]
+    ) -> list[int]:
+        total = abs(params.amount)
+        size_increment = rules.size_increment if rules else 1
+        # child orders must stay above the minimum notional
+        min_amount = (
+            -(-rules.min_size * X18 // params.price_x18) if rules is not None else 0
+        )
+        if params.algo == ExecutionAlgo.ICEBERG:
+            size = max(
+                abs(params.display_amount or total) // size_increment * size_increment,
+                size_increment,
+                -(-min_amount // size_increment) * size_increment,
+            )
+            count = max(1, -(-total // size))
+            if count > 1 and total - size * (count - 1) < min_amount:
+                count -= 1
+        elif params.algo == ExecutionAlgo.TWAP:
+            count = max(1, int(-(-params.duration // params.interval)))
+            count = min(
+                count,
+                max(1, total // size_increment),
+                max(1, total // min_amount) if min_amount else count,
+            )
+            size = total // count // size_increment * size_increment
+        else:
+            return []
+        sizes = [size] * (count - 1) + [total - size * (count - 1)]
+        sign = 1 if params.amount > 0 else -1
+        return [sign * size for size in sizes if size > 0]
+
+    async def _pov_amount(self, parent: ParentOrder, volume_start: int) -> int:
+        params = parent.params
+        assert self._market_volume is not None and params.participation_rate
+        volume = await self._run(self._market_volume, params.product_id)
+        target = min(
+            abs(params.amount),
+            int((volume - volume_start) * params.participation_rate),
+        )
+        amount = target - abs(parent.filled_amount + parent.working_amount)
+        rules = await self._get_rules(params.product_id)
+        if rules is not None:
+            amount = amount // rules.size_increment * rules.size_increment
+            is_last = amount == abs(parent.remaining_amount)
+            if amount * params.price_x18 < rules.min_size * X18 and not is_last:
+                return 0
+        if amount <= 0:
+            return 0
+        return amount if params.amount > 0 else -amount
+
+    def _presign(
+        self, parent: ParentOrder, amount: int, expiration: int
+    ) -> asyncio.Future:
+        return asyncio.ensure_future(
+            self._run(self._sign_child, parent.params, amount, expiration)
+        )
+
+    def _sign_child(
+        self, params: ParentOrderParams, amount: int, expiration: int
+    ) -> tuple[PlaceOrderParams, str]:
+        signed = self._engine_client.sign_order(
+            PlaceOrderParams(  # type: ignore
+                product_id=params.product_id,
+                order=OrderParams(  # type: ignore
+                    sender=params.sender,
+                    priceX18=params.price_x18,
+                    amount=amount,
+                    expiration=expiration,
+                ),
+                spot_leverage=params.spot_leverage,
+            )
+        )
+        digest = self._engine_client.get_order_digest(signed.order, params.product_id)
+        return signed, digest.lower()
+
+    async def _place(
+        self,
+        parent: ParentOrder,
+        signed: PlaceOrderParams,
+        digest: str,
+    ):
+        recv_time = int(signed.order.nonce or 0) >> 20
+        if recv_time - now_in_millis() < RECV_TIME_MARGIN_MS:
+            signed, digest = await self._run(
+                self._sign_child,
+                parent.params,
+                int(signed.order.amount),
+                int(signed.order.expiration),
+            )
+        child = ChildOrder(
+            digest=digest, amount=int(signed.order.amount), placed_at=None
+        )
+        parent.children.append(child)
+        # the request completes even if the parent order is cancelled meanwhile
+        parent._inflight = self._executor.submit(self._engine_client.execute, signed)
+        try:
+            await asyncio.shield(asyncio.wrap_future(parent._inflight))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            child.is_open = False
+            raise
+        # open orders queried before the engine accepted the order can't include it
+        child.placed_at = asyncio.get_running_loop().time()
+
+    async def _sync(self, parent: ParentOrder):
+        open_children = [child for child in parent.children if child.is_open]
+        if not open_children:
+            return
+        queried_at, open_orders = await self._tracker.get(
+            parent.params.product_id, subaccount_to_hex(parent.params.sender)
+        )
+        closed = []
+        for child in open_children:
+            if child.digest in open_orders:
+                child.filled_amount = child.amount - open_orders[child.digest]
+            elif child.placed_at is not None and child.placed_at < queried_at:
+                closed.append(child)
+        if closed:
+            await self._confirm_closed(closed, final=False)
+
+    async def _confirm_closed(self, children: list[ChildOrder], final: bool):
+        # missing orders may have been filled, expired or cancelled outside the scheduler
+        orders = (
+            await self._run(
+                self._indexer_client.resolve_historical_orders_by_digest,
+                [child.digest for child in children],
+            )
+            if self._indexer_client is not None
+            else {}
+        )
+        for child in children:
+            order = orders.get(child.digest)
+            if order is not None:
+                child.filled_amount = int(order.base_filled)
+                child.is_open = False
+            elif final or self._indexer_client is None:
+                # unconfirmed orders are assumed filled, so that the parent order never over-trades
+                child.filled_amount = child.amount
+                child.is_open = False
+
+    async def _cancel_children(self, parent: ParentOrder):
+        if parent._inflight is not None:
+            # waits for a child order still being placed, failures are already recorded
+            await asyncio.gather(
+                asyncio.wrap_future(parent._inflight), return_exceptions=True
+            )
+        open_children = [child for child in parent.children if child.is_open]
+        if not open_children:
+            return
+        res = await self._run(
+            self._engine_client.cancel_orders,
+            CancelOrdersParams(  # type: ignore
+                sender=parent.params.sender,
+                productIds=[parent.params.product_id] * len(open_children),
+                digests=[child.digest for child in open_children],
+            ),
+        )
+        cancelled = (
+            {
+                order.digest.lower(): int(order.unfilled_amount)
+                for order in res.data.cancelled_orders
+            }
+            if isinstance(res.data, CancelOrdersResponse)
+            else {}
+        )
+        for child in open_children:
+            if child.digest in cancelled:
+                child.filled_amount = child.amount - cancelled[child.digest]
+                child.is_open = False
+        missing = [child for child in open_children if child.is_open]
+        if missing:
+            await self._confirm_closed(missing, final=True)
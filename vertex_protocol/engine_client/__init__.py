@@ -1,6 +1,9 @@
 from vertex_protocol.engine_client.types import EngineClientOpts
 from vertex_protocol.engine_client.execute import EngineExecuteClient
 from vertex_protocol.engine_client.query import EngineQueryClient
+from vertex_protocol.engine_client.registry import ProductInfo, ProductRegistry
+from vertex_protocol.engine_client.fees import FeeEstimator, FeeSchedule
+from vertex_protocol.engine_client.order_pool import PresignedOrder, PresignedOrderPool
 
 
 class EngineClient(EngineQueryClient, EngineExecuteClient):  # type: ignore
@@ -32,4 +35,10 @@ __all__ = [
     "EngineClientOpts",
     "EngineExecuteClient",
     "EngineQueryClient",
+    "ProductInfo",
+    "ProductRegistry",
+    "FeeEstimator",
+    "FeeSchedule",
+    "PresignedOrder",
+    "PresignedOrderPool",
 ]
@@ -22,6 +22,8 @@ from vertex_protocol.engine_client.types.execute import (
     PlaceIsolatedOrderParams,
     PlaceMarketOrderParams,
     PlaceOrderParams,
+    PlaceSmartMarketOrderParams,
+    SmartMarketOrderResponse,
     WithdrawCollateralParams,
     to_execute_request,
 )
@@ -32,10 +34,17 @@ from vertex_protocol.utils.bytes32 import subaccount_to_hex
 from vertex_protocol.utils.exceptions import (
     BadStatusCodeException,
     ExecuteFailedException,
+    InsufficientLiquidityException,
 )
 from vertex_protocol.utils.expiration import OrderType, get_expiration_timestamp
-from vertex_protocol.utils.math import mul_x18, round_x18, to_x18
+from vertex_protocol.utils import fixed
+from vertex_protocol.utils.market_impact import (
+    estimate_market_impact,
+    slice_market_order,
+)
+from vertex_protocol.utils.math import round_x18, to_x18
 from vertex_protocol.utils.model import VertexBaseModel, is_instance_of_union
+from vertex_protocol.utils.order_validation import OrderValidator
 from vertex_protocol.utils.subaccount import Subaccount, SubaccountParams
 from vertex_protocol.utils.execute import VertexBaseExecute
 
@@ -61,6 +70,30 @@ class EngineExecuteClient(VertexBaseExecute):
         self._opts: EngineClientOpts = EngineClientOpts.parse_obj(opts)
         self.url: str = self._opts.url
         self.session = requests.Session()
+        self.order_validator: Optional[OrderValidator] = None
+
+    def enable_order_validation(
+        self, auto_round: bool = False, min_time_to_expiration: int = 0
+    ) -> OrderValidator:
+        """
+        Validates orders locally before signing them, against the products' book info.
+
+        Book info is fetched once and cached by the validator, see `OrderValidator`.
+
+        Args:
+            auto_round (bool): Whether to round prices and amounts instead of rejecting orders. Defaults to False.
+
+            min_time_to_expiration (int): Reject orders expiring within this many seconds. Defaults to 0.
+
+        Returns:
+            OrderValidator: The validator, whose `stats` report the round trips saved.
+        """
+        self.order_validator = OrderValidator.from_all_products(
+            self._querier.get_all_products(),
+            auto_round=auto_round,
+            min_time_to_expiration=min_time_to_expiration,
+        )
+        return self.order_validator
 
     def tx_nonce(self, sender: str) -> int:
         """
@@ -115,11 +148,27 @@ class EngineExecuteClient(VertexBaseExecute):
             BadStatusCodeException: If the server response status code is not 200.
             ExecuteFailedException: If there's an error in the execution or the response status is not "success".
         """
-        res = self.session.post(f"{self.url}/execute", json=req.dict())
+        return self.execute_payload(req.dict())
+
+    def execute_payload(self, payload: dict) -> ExecuteResponse:
+        """
+        Sends an already serialized execute request, e.g: a pre-signed order, without parsing it again.
+
+        Args:
+            payload (dict): The serialized request, see `ExecuteRequest.dict`.
+
+        Returns:
+            ExecuteResponse: The response from the executed operation.
+
+        Raises:
+            BadStatusCodeException: If the server response status code is not 200.
+            ExecuteFailedException: If there's an error in the execution or the response status is not "success".
+        """
+        res = self.session.post(f"{self.url}/execute", json=payload)
         if res.status_code != 200:
             raise BadStatusCodeException(res.text)
         try:
-            execute_res = ExecuteResponse(**res.json(), req=req.dict())
+            execute_res = ExecuteResponse(**res.json(), req=payload)
         except Exception:
             raise ExecuteFailedException(res.text)
         if execute_res.status != "success":
@@ -143,13 +192,38 @@ class EngineExecuteClient(VertexBaseExecute):
 
         Returns:
             ExecuteResponse: Response of the execution, including status and potential error message.
+
+        Raises:
+            InvalidOrderException: If `order_validator` is set and the order is invalid.
+        """
+        return self.execute(self.sign_order(params))
+
+    def sign_order(self, params: PlaceOrderParams) -> PlaceOrderParams:
+        """
+        Prepares and signs an order without placing it, so that it can be placed later with `execute`.
+
+        Args:
+            params (PlaceOrderParams): Parameters required for placing an order.
+
+        Returns:
+            PlaceOrderParams: A copy of the parameters with the order's nonce and signature set.
+
+        Raises:
+            InvalidOrderException: If `order_validator` is set and the order is invalid.
         """
         params = PlaceOrderParams.parse_obj(params)
         params.order = self.prepare_execute_params(params.order, True)
+        if self.order_validator is not None:
+            # pre-signed orders can't be rounded
+            params.order = self.order_validator.validate(
+                params.product_id,
+                params.order,
+                auto_round=None if params.signature is None else False,
+            )
         params.signature = params.signature or self._sign(
             VertexExecuteType.PLACE_ORDER, params.order.dict(), params.product_id
         )
-        return self.execute(params)
+        return params
 
     def place_isolated_order(self, params: PlaceIsolatedOrderParams) -> ExecuteResponse:
         """
@@ -161,9 +235,18 @@ class EngineExecuteClient(VertexBaseExecute):
 
         Returns:
             ExecuteResponse: Response of the execution, including status and potential error message.
+
+        Raises:
+            InvalidOrderException: If `order_validator` is set and the order is invalid.
         """
         params = PlaceIsolatedOrderParams.parse_obj(params)
         params.isolated_order = self.prepare_execute_params(params.isolated_order, True)
+        if self.order_validator is not None:
+            params.isolated_order = self.order_validator.validate(
+                params.product_id,
+                params.isolated_order,
+                auto_round=None if params.signature is None else False,
+            )
         params.signature = params.signature or self._sign(
             VertexExecuteType.PLACE_ISOLATED_ORDER,
             params.isolated_order.dict(),
@@ -186,9 +269,9 @@ class EngineExecuteClient(VertexBaseExecute):
         self._assert_book_not_empty(orderbook.bids, orderbook.asks, is_bid)
         slippage = to_x18(params.slippage or 0.005)  # defaults to 0.5%
         market_price_x18 = (
-            mul_x18(orderbook.bids[0][0], to_x18(1) + slippage)
+            fixed.mul(int(orderbook.bids[0][0]), fixed.X18 + slippage)
             if is_bid
-            else mul_x18(orderbook.asks[0][0], to_x18(1) - slippage)
+            else fixed.mul(int(orderbook.asks[0][0]), fixed.X18 - slippage)
         )
         price_increment_x18 = self._querier._get_subaccount_product_position(
             subaccount_to_hex(params.market_order.sender), params.product_id
@@ -211,6 +294,77 @@ class EngineExecuteClient(VertexBaseExecute):
             )
         )
 
+    def place_smart_market_order(
+        self, params: PlaceSmartMarketOrderParams
+    ) -> SmartMarketOrderResponse:
+        """
+        Places a market order priced off the depth of the book instead of its top.
+
+        The book is fetched once and walked to the levels the order takes from. If they fill the
+        whole order within `slippage`, it is placed as a single FOK order limited at the last of
+        them, so it can't fill worse than the visible book. Otherwise, or if `max_child_orders` is
+        greater than 1, the fillable part is split into IOC child orders, each sized to and limited
+        at consecutive levels of the book.
+
+        Args:
+            params (PlaceSmartMarketOrderParams): Parameters required for placing the market order.
+
+        Returns:
+            SmartMarketOrderResponse: The expected execution of the order and the responses of its child orders.
+
+        Raises:
+            InsufficientLiquidityException: If the book can't fill the order within `slippage` and `allow_partial` is not set.
+
+            ExecuteFailedException: If a child order fails, child orders placed before it are not cancelled.
+        """
+        params = PlaceSmartMarketOrderParams.parse_obj(params)
+        liquidity = self._querier.get_market_liquidity(
+            params.product_id, params.depth or 20
+        )
+        amount = int(params.market_order.amount)
+        self._assert_book_not_empty(liquidity.bids, liquidity.asks, amount > 0)
+        slippage = params.slippage or 0.005  # defaults to 0.5%
+        impact = estimate_market_impact(
+            liquidity.bids, liquidity.asks, amount, slippage
+        )
+        if impact.fillable_amount == 0 or (
+            not impact.is_fully_fillable and not params.allow_partial
+        ):
+            raise InsufficientLiquidityException(
+                f"Insufficient liquidity to fill order: {impact.fillable_amount} of {amount} fillable within slippage {slippage}"
+            )
+        max_child_orders = params.max_child_orders or 1
+        if impact.is_fully_fillable and max_child_orders == 1:
+            children = [(impact.worst_price_x18, amount)]
+            order_type = OrderType.FOK
+        else:
+            children = slice_market_order(
+                liquidity.bids, liquidity.asks, amount, slippage, max_child_orders
+            )
+            order_type = OrderType.IOC
+        responses = []
+        for i, (price_x18, child_amount) in enumerate(children):
+            order = OrderParams(
+                sender=params.market_order.sender,
+                amount=child_amount,
+                # child orders can't share a nonce
+                nonce=params.market_order.nonce if i == 0 else None,
+                priceX18=price_x18,
+                expiration=get_expiration_timestamp(
+                    order_type, int(time.time()) + 1000, bool(params.reduce_only)
+                ),
+            )
+            responses.append(
+                self.place_order(
+                    PlaceOrderParams(  # type: ignore
+                        product_id=params.product_id,
+                        order=order,
+                        spot_leverage=params.spot_leverage,
+                    )
+                )
+            )
+        return SmartMarketOrderResponse(impact=impact, responses=responses)
+
     def cancel_orders(self, params: CancelOrdersParams) -> ExecuteResponse:
         """
         Execute a cancel orders operation.
@@ -390,10 +544,11 @@ class EngineExecuteClient(VertexBaseExecute):
         )
         balance, product = position.balance, position.product
         closing_spread_x18 = to_x18(0.005)
+        oracle_price_x18 = int(product.oracle_price_x18)
         closing_price_x18 = (
-            mul_x18(product.oracle_price_x18, to_x18(1) - closing_spread_x18)
+            fixed.mul(oracle_price_x18, fixed.X18 - closing_spread_x18)
             if int(balance.balance.amount) > 0
-            else mul_x18(product.oracle_price_x18, to_x18(1) + closing_spread_x18)
+            else fixed.mul(oracle_price_x18, fixed.X18 + closing_spread_x18)
         )
         return self.place_order(
             PlaceOrderParams(  # type: ignore
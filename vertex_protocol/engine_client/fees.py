@@ -0,0 +1,294 @@
+import threading
+import time
+from array import array
+from typing import TYPE_CHECKING, Optional, Sequence
+from vertex_protocol.engine_client.types.query import FeeRatesData
+from vertex_protocol.utils import fixed
+from vertex_protocol.utils.fixed import X18
+from vertex_protocol.utils.ladder import LadderLevel
+
+if TYPE_CHECKING:
+    from vertex_protocol.engine_client.query import EngineQueryClient
+    from vertex_protocol.engine_client.registry import ProductRegistry
+
+
+class FeeSchedule:
+    """
+    Fee rates of a subaccount, decoded once from `FeeRatesData` for local fee estimates.
+
+    Fees are charged in quote on the notional of each fill, i.e: `abs(amount) * price`, at
+    the product's maker or taker rate. Maker rates can be negative, i.e: rebates. Taker
+    orders additionally pay `taker_sequencer_fee` once.
+    """
+
+    def __init__(
+        self, fee_rates: FeeRatesData, registry: Optional["ProductRegistry"] = None
+    ):
+        """
+        Decodes fee rates.
+
+        Args:
+            fee_rates (FeeRatesData): Fee rates of the subaccount, see `EngineQueryClient.get_fee_rates`.
+
+            registry (ProductRegistry, optional): Provides the default rates of products missing
+            from `fee_rates`, e.g: listed after they were fetched.
+        """
+        self.taker_fee_rates_x18 = [int(rate) for rate in fee_rates.taker_fee_rates_x18]
+        self.maker_fee_rates_x18 = [int(rate) for rate in fee_rates.maker_fee_rates_x18]
+        self.taker_sequencer_fee = int(fee_rates.taker_sequencer_fee)
+        self.withdraw_sequencer_fees = [
+            int(fee) for fee in fee_rates.withdraw_sequencer_fees
+        ]
+        self._registry = registry
+
+    def fee_rate_x18(self, product_id: int, is_taker: bool) -> int:
+        """
+        Retrieves the fee rate of a product.
+
+        Args:
+            product_id (int): ID of the product.
+
+            is_taker (bool): Whether to retrieve the taker or the maker rate.
+
+        Returns:
+            int: The x18 fee rate.
+
+        Raises:
+            ValueError: If the product has no fee rate.
+        """
+        rates = self.taker_fee_rates_x18 if is_taker else self.maker_fee_rates_x18
+        if 0 <= product_id < len(rates):
+            return rates[product_id]
+        if self._registry is not None:
+            product = self._registry.get(product_id)
+            rate = (
+                product.taker_fee_rate_x18 if is_taker else product.maker_fee_rate_x18
+            )
+            if rate is not None:
+                return rate
+        raise ValueError(f"Invalid product id provided: {product_id}")
+
+    def estimate_order_fee(
+        self, product_id: int, price_x18: int, amount: int, is_taker: bool = True
+    ) -> int:
+        """
+        Estimates the fee of filling an order, truncated like the engine.
+
+        Args:
+            product_id (int): ID of the product.
+
+            price_x18 (int): Fill price, x18.
+
+            amount (int): Filled amount, x18. Positive for a `long` fill and negative for a `short`.
+
+            is_taker (bool): Whether the order is a taker. Defaults to True.
+
+        Returns:
+            int: The fee in quote, x18. Negative for maker rebates.
+        """
+        notional = fixed.mul(abs(int(amount)), int(price_x18))
+        fee = fixed.mul(notional, self.fee_rate_x18(product_id, is_taker))
+        return fee + self.taker_sequencer_fee if is_taker else fee
+
+    def estimate_ladder_fees(
+        self, product_id: int, levels: Sequence[LadderLevel], is_taker: bool = False
+    ) -> list[int]:
+        """
+        Estimates the fee of each level of an order ladder, see `build_ladder_levels`.
+
+        Args:
+            product_id (int): ID of the product.
+
+            levels (Sequence[LadderLevel]): `(priceX18, amount)` of each level.
+
+            is_taker (bool): Whether the orders are takers. Defaults to False, as ladders are usually resting orders.
+
+        Returns:
+            list[int]: The fee of each level in quote, x18.
+        """
+        rate = self.fee_rate_x18(product_id, is_taker)
+        sequencer_fee = self.taker_sequencer_fee if is_taker else 0
+        mul = fixed.mul
+        return [
+            mul(mul(abs(amount), price_x18), rate) + sequencer_fee
+            for price_x18, amount in levels
+        ]
+
+    def estimate_fees(
+        self,
+        product_id: int,
+        prices: Sequence[float],
+        amounts: Sequence[float],
+        is_taker: bool = True,
+    ) -> array:
+        """
+        Estimates fees on floats, e.g: to price quotes.
+
+        Args:
+            product_id (int): ID of the product.
+
+            prices (Sequence[float]): Fill prices.
+
+            amounts (Sequence[float]): Filled amounts.
+
+            is_taker (bool): Whether the orders are takers. Defaults to True.
+
+        Returns:
+            array: The float64 fee of each fill, in quote.
+        """
+        rate = self.fee_rate_x18(product_id, is_taker) / X18
+        sequencer_fee = self.taker_sequencer_fee / X18 if is_taker else 0.0
+        return array(
+            "d",
+            [
+                abs(amount) * price * rate + sequencer_fee
+                for price, amount in zip(prices, amounts)
+            ],
+        )
+
+    def fee_adjusted_price_x18(
+        self, product_id: int, price_x18: int, is_bid: bool, is_taker: bool = True
+    ) -> int:
+        """
+        Effective price of a fill once fees are paid, excluding the flat sequencer fee.
+
+        Args:
+            product_id (int): ID of the product.
+
+            price_x18 (int): Fill price, x18.
+
+            is_bid (bool): Whether the fill is a buy, which fees make more expensive, or a sell.
+
+            is_taker (bool): Whether the order is a taker. Defaults to True.
+
+        Returns:
+            int: The fee adjusted price, x18.
+        """
+        fee = fixed.mul(int(price_x18), self.fee_rate_x18(product_id, is_taker))
+        return int(price_x18) + fee if is_bid else int(price_x18) - fee
+
+    def withdraw_fee(self, product_id: int) -> int:
+        """
+        Retrieves the sequencer fee of withdrawing a product.
+
+        Args:
+            product_id (int): ID of the product.
+
+        Returns:
+            int: The fee, in the product's x18 units.
+
+        Raises:
+            ValueError: If the product has no withdraw fee.
+        """
+        if 0 <= product_id < len(self.withdraw_sequencer_fees):
+            return self.withdraw_sequencer_fees[product_id]
+        raise ValueError(f"Invalid product id provided: {product_id}")
+
+
+class FeeEstimator:
+    """
+    Caches the `FeeSchedule` of each subaccount, refreshing it once it is older than `ttl`.
+
+    Estimates are local once a subaccount's rates are cached, so fee-aware pricing adds no
+    network latency.
+    """
+
+    def __init__(
+        self,
+        client: "EngineQueryClient",
+        ttl: float = 300,
+        registry: Optional["ProductRegistry"] = None,
+    ):
+        """
+        Initializes the estimator.
+
+        Args:
+            client (EngineQueryClient): The engine client used to fetch fee rates.
+
+            ttl (float): Time to live of cached fee rates, in seconds. Defaults to 5 minutes.
+
+            registry (ProductRegistry, optional): Provides the default rates of products missing
+            from fetched fee rates.
+
+        Raises:
+            ValueError: If the ttl is negative.
+        """
+        if ttl < 0:
+            raise ValueError(f"Invalid ttl provided: {ttl}")
+        self._client = client
+        self.ttl = ttl
+        self._registry = registry
+        self._schedules: dict[str, tuple[float, FeeSchedule]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, subaccount: str) -> FeeSchedule:
+        """
+        Retrieves the fee schedule of a subaccount, fetching it if missing or expired.
+
+        Args:
+            subaccount (str): Subaccount as a hex string.
+
+        Returns:
+            FeeSchedule: The subaccount's fee schedule.
+        """
+        subaccount = subaccount.lower()
+        with self._lock:
+            cached = self._schedules.get(subaccount)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        return self.refresh(subaccount)
+
+    def refresh(self, subaccount: str) -> FeeSchedule:
+        """
+        Fetches the fee rates of a subaccount and caches its fee schedule.
+
+        Args:
+            subaccount (str): Subaccount as a hex string.
+
+        Returns:
+            FeeSchedule: The subaccount's fee schedule.
+        """
+        schedule = FeeSchedule(self._client.get_fee_rates(subaccount), self._registry)
+        with self._lock:
+            self._schedules[subaccount.lower()] = (time.monotonic(), schedule)
+        return schedule
+
+    def invalidate(self, subaccount: Optional[str] = None):
+        """
+        Drops cached fee rates, so they are fetched again on next use.
+
+        Args:
+            subaccount (str, optional): Subaccount to drop. Defaults to all subaccounts.
+        """
+        with self._lock:
+            if subaccount is None:
+                self._schedules.clear()
+            else:
+                self._schedules.pop(subaccount.lower(), None)
+
+    def estimate_order_fee(
+        self,
+        subaccount: str,
+        product_id: int,
+        price_x18: int,
+        amount: int,
+        is_taker: bool = True,
+    ) -> int:
+        """
+        Estimates the fee of filling an order of a subaccount, see `FeeSchedule.estimate_order_fee`.
+        """
+        return self.get(subaccount).estimate_order_fee(
+            product_id, price_x18, amount, is_taker
+        )
+
+    def estimate_ladder_fees(
+        self,
+        subaccount: str,
+        product_id: int,
+        levels: Sequence[LadderLevel],
+        is_taker: bool = False,
+    ) -> list[int]:
+        """
+        Estimates the fees of an order ladder of a subaccount, see `FeeSchedule.estimate_ladder_fees`.
+        """
+        return self.get(subaccount).estimate_ladder_fees(product_id, levels, is_taker)
@@ -0,0 +1,386 @@
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Sequence
+
+from vertex_protocol.engine_client.execute import EngineExecuteClient
+from vertex_protocol.engine_client.types.execute import (
+    ExecuteResponse,
+    PlaceOrderParams,
+    to_execute_request,
+)
+from vertex_protocol.utils.execute import OrderParams
+from vertex_protocol.utils.expiration import OrderType, get_expiration_timestamp
+from vertex_protocol.utils.model import VertexBaseModel
+from vertex_protocol.utils.subaccount import Subaccount
+from vertex_protocol.utils.time import now_in_millis, now_in_seconds
+
+PoolKey = tuple[int, int, int]
+
+# leaves time for a pooled order to reach the engine, in milliseconds
+_SEND_MARGIN_MS = 1000
+
+
+class PresignedOrder(VertexBaseModel):
+    """
+    A signed and serialized place order request, ready to be sent.
+
+    Attributes:
+        product_id (int): The id of the order's product.
+
+        price_x18 (int): Price of the order, x18.
+
+        amount (int): Amount of the order, x18.
+
+        payload (dict): The serialized request, see `PlaceOrderRequest`.
+
+        valid_until (int): Unix time in milliseconds after which the engine rejects the order, i.e:
+        the earliest of its nonce's `recv_time` and its expiration.
+    """
+
+    product_id: int
+    price_x18: int
+    amount: int
+    payload: dict
+    valid_until: int
+
+
+class PresignedOrderPoolStats(VertexBaseModel):
+    """
+    Counters of a `PresignedOrderPool`.
+
+    Attributes:
+        hits (int): Number of orders sent from a ready signed payload.
+
+        misses (int): Number of orders that had to be signed when sent.
+
+        signed (int): Number of orders signed, including refreshes.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    signed: int = 0
+
+
+class _GridSpec(VertexBaseModel):
+    product_id: int
+    sender: Subaccount
+    order_type: OrderType
+    reduce_only: bool
+    spot_leverage: Optional[bool]
+
+
+class PresignedOrderPool:
+    """
+    Keeps signed orders ready for anticipated price / amount grids, so that placing one of them
+    is a single request.
+
+    Nonces, EIP-712 signatures and request serialization are done ahead of time on a thread pool.
+    Nonces embed a `recv_time` after which the engine rejects orders, so orders are signed again
+    in the background, see `start`, once they get within `refresh_margin` of it. A sent order is
+    signed again right away, since nonces can't be reused. The thread pool is shut down by `stop`,
+    and created again when the pool is used afterwards.
+    """
+
+    def __init__(
+        self,
+        client: EngineExecuteClient,
+        order_type: OrderType = OrderType.IOC,
+        expiration: int = 120,
+        refresh_margin: int = 10,
+        refresh_interval: float = 1,
+        max_workers: int = 4,
+    ):
+        """
+        Initializes the pool.
+
+        Args:
+            client (EngineExecuteClient): The engine client used to sign and send orders.
+
+            order_type (OrderType): Type of the pooled orders. Defaults to IOC.
+
+            expiration (int): Seconds orders are valid for once signed. Defaults to 2 minutes.
+
+            refresh_margin (int): Seconds before their nonce's `recv_time` or expiration orders are signed again. Defaults to 10.
+
+            refresh_interval (float): Seconds between background refreshes. Defaults to 1.
+
+            max_workers (int): Size of the thread pool signing orders. Defaults to 4.
+
+        Raises:
+            ValueError: If orders would be stale as soon as they are signed.
+        """
+        if refresh_margin >= expiration:
+            raise ValueError(
+                f"Invalid refresh margin provided: {refresh_margin} must be lower than expiration {expiration}"
+            )
+        self._client = client
+        self.order_type = order_type
+        self.expiration = expiration
+        self.refresh_margin = refresh_margin
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._grids: dict[PoolKey, _GridSpec] = {}
+        self._orders: dict[PoolKey, PresignedOrder] = {}
+        # keys being signed, so that refreshes don't sign them twice
+        self._pending: set[PoolKey] = set()
+        self._stats = PresignedOrderPoolStats()
+        # re-entrant, as signing callbacks may run on the thread scheduling them
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._orders)
+
+    def __enter__(self) -> "PresignedOrderPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def stats(self) -> PresignedOrderPoolStats:
+        """
+        A snapshot of the pool's counters.
+        """
+        with self._lock:
+            return self._stats.copy()
+
+    def add_grid(
+        self,
+        product_id: int,
+        sender: Subaccount,
+        prices_x18: Sequence[int],
+        amounts: Sequence[int],
+        reduce_only: bool = False,
+        spot_leverage: Optional[bool] = None,
+    ) -> int:
+        """
+        Signs an order for every price and amount of a grid, replacing orders already pooled for them.
+
+        Args:
+            product_id (int): The id of the orders' product.
+
+            sender (Subaccount): The subaccount placing the orders.
+
+            prices_x18 (Sequence[int]): Prices of the grid, x18.
+
+            amounts (Sequence[int]): Amounts of the grid, x18. Positive for a `long` position and negative for a `short`.
+
+            reduce_only (bool): Whether the orders can only reduce the size of an existing position. Defaults to False.
+
+            spot_leverage (Optional[bool]): An optional flag indicating whether leverage should be used for the orders.
+
+        Returns:
+            int: The number of orders signed.
+
+        Raises:
+            InvalidOrderException: If the client's `order_validator` is set and an order of the grid is invalid.
+        """
+        spec = _GridSpec(
+            product_id=product_id,
+            sender=sender,
+            order_type=self.order_type,
+            reduce_only=reduce_only,
+            spot_leverage=spot_leverage,
+        )
+        keys = [
+            (product_id, int(price_x18), int(amount))
+            for price_x18, amount in itertools.product(prices_x18, amounts)
+        ]
+        with self._lock:
+            for key in keys:
+                self._grids[key] = spec
+                self._pending.add(key)
+        try:
+            orders = list(self._get_executor().map(self._sign, keys))
+        except Exception:
+            with self._lock:
+                for key in keys:
+                    self._grids.pop(key, None)
+                    self._pending.discard(key)
+            raise
+        with self._lock:
+            for key, order in zip(keys, orders):
+                self._store(key, order)
+        return len(orders)
+
+    def remove_grid(self, product_id: int):
+        """
+        Drops every pooled order of a product.
+
+        Args:
+            product_id (int): The id of the product.
+        """
+        with self._lock:
+            for key in [key for key in self._grids if key[0] == product_id]:
+                del self._grids[key]
+                self._orders.pop(key, None)
+
+    def take(
+        self, product_id: int, price_x18: int, amount: int
+    ) -> Optional[PresignedOrder]:
+        """
+        Removes a ready order from the pool, and signs a replacement in the background.
+
+        Args:
+            product_id (int): The id of the order's product.
+
+            price_x18 (int): Price of the order, x18.
+
+            amount (int): Amount of the order, x18.
+
+        Returns:
+            Optional[PresignedOrder]: The order, None if it isn't in the pool or is stale.
+        """
+        key = (product_id, int(price_x18), int(amount))
+        with self._lock:
+            order = self._orders.pop(key, None)
+            if (
+                order is not None
+                and order.valid_until - now_in_millis() < _SEND_MARGIN_MS
+            ):
+                order = None
+            self._schedule(key)
+        return order
+
+    def send(self, product_id: int, price_x18: int, amount: int) -> ExecuteResponse:
+        """
+        Places an order of a grid, signing it on the spot if no ready order is pooled.
+
+        Args:
+            product_id (int): The id of the order's product.
+
+            price_x18 (int): Price of the order, x18.
+
+            amount (int): Amount of the order, x18.
+
+        Returns:
+            ExecuteResponse: Response of the execution, including status and potential error message.
+
+        Raises:
+            ValueError: If the order isn't part of a grid of the pool.
+        """
+        order = self.take(product_id, price_x18, amount)
+        if order is None:
+            key = (product_id, int(price_x18), int(amount))
+            if key not in self._grids:
+                raise ValueError(
+                    f"Invalid order provided: {key} is not part of a grid of the pool"
+                )
+            order = self._sign(key)
+            with self._lock:
+                self._stats.misses += 1
+        else:
+            with self._lock:
+                self._stats.hits += 1
+        return self._client.execute_payload(order.payload)
+
+    def refresh(self) -> int:
+        """
+        Signs again the orders within `refresh_margin` of going stale, and the missing ones.
+
+        Returns:
+            int: The number of orders scheduled for signing.
+        """
+        stale_at = now_in_millis(self.refresh_margin)
+        with self._lock:
+            keys = [
+                key
+                for key in self._grids
+                if key not in self._pending
+                and (
+                    key not in self._orders or self._orders[key].valid_until <= stale_at
+                )
+            ]
+            for key in keys:
+                self._schedule(key)
+        return len(keys)
+
+    def start(self):
+        """
+        Starts refreshing orders on a background thread, every `refresh_interval`.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops refreshing orders and shuts down the signing thread pool.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def _schedule(self, key: PoolKey):
+        # must be called with the lock held
+        if key in self._grids and key not in self._pending:
+            self._pending.add(key)
+            future = self._get_executor().submit(self._sign, key)
+            future.add_done_callback(lambda future: self._on_signed(key, future))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _on_signed(self, key: PoolKey, future: Future):
+        with self._lock:
+            if future.cancelled() or future.exception() is not None:
+                # retried on the next refresh
+                self._pending.discard(key)
+                return
+            self._store(key, future.result())
+
+    def _store(self, key: PoolKey, order: PresignedOrder):
+        # must be called with the lock held
+        self._pending.discard(key)
+        if key in self._grids:
+            self._orders[key] = order
+
+    def _sign(self, key: PoolKey) -> PresignedOrder:
+        product_id, price_x18, amount = key
+        spec = self._grids[key]
+        expiration = now_in_seconds() + self.expiration
+        params = self._client.sign_order(
+            PlaceOrderParams(  # type: ignore
+                product_id=product_id,
+                order=OrderParams(  # type: ignore
+                    sender=spec.sender,
+                    priceX18=price_x18,
+                    amount=amount,
+                    expiration=get_expiration_timestamp(
+                        spec.order_type, expiration, spec.reduce_only
+                    ),
+                ),
+                spot_leverage=spec.spot_leverage,
+            )
+        )
+        recv_time = int(params.order.nonce or 0) >> 20
+        order = PresignedOrder(
+            product_id=product_id,
+            price_x18=price_x18,
+            amount=amount,
+            payload=to_execute_request(params).dict(),
+            valid_until=min(recv_time, expiration * 1000),
+        )
+        with self._lock:
+            self._stats.signed += 1
+        return order
@@ -440,23 +440,17 @@ class EngineQueryClient:
         )
 
     def _get_subaccount_product_position(
-        self, subaccount: str, product_id: int
+        self,
+        subaccount: str,
+        product_id: int,
+        summary: Optional[SubaccountInfoData] = None,
     ) -> SubaccountPosition:
-        summary = self.get_subaccount_info(subaccount)
+        # callers looking up several products should pass the summary they already have
+        summary = summary or self.get_subaccount_info(subaccount)
         try:
-            balance = [
-                balance
-                for balance in summary.spot_balances + summary.perp_balances
-                if balance.product_id == product_id
-            ][0]
-            product = [
-                product
-                for product in summary.spot_products + summary.perp_products
-                if product.product_id == product_id
-            ][0]
+            return summary.parse_subaccount_position(product_id)
         except Exception as e:
             raise Exception(f"Invalid product id provided {product_id}. Error: {e}")
-        return SubaccountPosition(balance=balance, product=product)
 
     def get_assets(self) -> AssetsData:
         return ensure_data_type(self._query_v2(f"{self.url_v2}/assets"), list)
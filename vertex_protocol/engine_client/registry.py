@@ -0,0 +1,326 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from vertex_protocol.engine_client.query import EngineQueryClient
+from vertex_protocol.engine_client.types.models import (
+    Asset,
+    MarketPair,
+    MarketType,
+    PerpProduct,
+    ProductRisk,
+    SpotProduct,
+    SymbolData,
+)
+from vertex_protocol.engine_client.types.query import (
+    AllProductsData,
+    ContractsData,
+    HealthGroupsData,
+    SymbolsData,
+)
+from vertex_protocol.utils.model import VertexBaseModel
+
+
+class ProductInfo(VertexBaseModel):
+    """
+    Metadata of a product, aggregated from the engine's metadata endpoints.
+    """
+
+    product_id: int
+    market_type: MarketType
+    symbol: Optional[str]
+    ticker_id: Optional[str]
+    base: Optional[str]
+    quote: Optional[str]
+    book_addr: Optional[str]
+    health_group: Optional[int]
+    price_increment_x18: int
+    size_increment: int
+    min_size: int
+    maker_fee_rate_x18: Optional[int]
+    taker_fee_rate_x18: Optional[int]
+    risk: ProductRisk
+
+
+class ProductRegistry:
+    """
+    In-memory registry of all products, with O(1) lookups by product id, symbol,
+    ticker id and book address.
+
+    The registry is built once from concurrent metadata queries (`get_all_products`,
+    `get_symbols`, `get_assets`, `get_pairs`, `get_contracts` and `get_health_groups`).
+    `refresh` only re-fetches products and symbols, and the remaining metadata when new
+    products are listed.
+    """
+
+    def __init__(self, client: EngineQueryClient, max_workers: int = 6):
+        """
+        Builds the registry.
+
+        Args:
+            client (EngineQueryClient): The engine client used to fetch product metadata.
+
+            max_workers (int): Maximum number of concurrent metadata queries. Defaults to 6.
+        """
+        self._client = client
+        self._max_workers = max_workers
+        self._products: dict[int, ProductInfo] = {}
+        self._by_symbol: dict[str, ProductInfo] = {}
+        self._by_ticker_id: dict[str, ProductInfo] = {}
+        self._by_book_addr: dict[str, ProductInfo] = {}
+        self._health_groups: list[list[int]] = []
+        self._health_group_by_product_id: dict[int, int] = {}
+        self._assets: dict[int, Asset] = {}
+        self._pairs: dict[str, MarketPair] = {}
+        self._book_addrs: list[str] = []
+        self.refresh(full=True)
+
+    @property
+    def product_ids(self) -> list[int]:
+        """
+        IDs of every product, in ascending order.
+        """
+        return sorted(self._products.keys())
+
+    @property
+    def spot_product_ids(self) -> list[int]:
+        """
+        IDs of every spot product, in ascending order.
+        """
+        return [
+            product_id
+            for product_id in self.product_ids
+            if self._products[product_id].market_type == MarketType.SPOT
+        ]
+
+    @property
+    def perp_product_ids(self) -> list[int]:
+        """
+        IDs of every perp product, in ascending order.
+        """
+        return [
+            product_id
+            for product_id in self.product_ids
+            if self._products[product_id].market_type == MarketType.PERP
+        ]
+
+    @property
+    def health_groups(self) -> list[list[int]]:
+        """
+        `[spot_product_id, perp_product_id]` pairs, indexed by health group.
+        """
+        return self._health_groups
+
+    def get(self, product_id: int) -> ProductInfo:
+        """
+        Retrieves a product by ID.
+
+        Args:
+            product_id (int): ID of the product.
+
+        Returns:
+            ProductInfo: The product's metadata.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        try:
+            return self._products[product_id]
+        except KeyError:
+            raise ValueError(f"Invalid product id provided: {product_id}")
+
+    def get_by_symbol(self, symbol: str) -> ProductInfo:
+        """
+        Retrieves a product by symbol, e.g: `BTC-PERP`.
+
+        Args:
+            symbol (str): Symbol of the product.
+
+        Returns:
+            ProductInfo: The product's metadata.
+
+        Raises:
+            ValueError: If the symbol is unknown.
+        """
+        try:
+            return self._by_symbol[symbol]
+        except KeyError:
+            raise ValueError(f"Invalid symbol provided: {symbol}")
+
+    def get_by_ticker_id(self, ticker_id: str) -> ProductInfo:
+        """
+        Retrieves a product by ticker id, e.g: `BTC-PERP_USDC`.
+
+        Args:
+            ticker_id (str): Ticker id of the product.
+
+        Returns:
+            ProductInfo: The product's metadata.
+
+        Raises:
+            ValueError: If the ticker id is unknown.
+        """
+        try:
+            return self._by_ticker_id[ticker_id]
+        except KeyError:
+            raise ValueError(f"Invalid ticker id provided: {ticker_id}")
+
+    def get_by_book_addr(self, book_addr: str) -> ProductInfo:
+        """
+        Retrieves a product by the address of its orderbook contract.
+
+        Args:
+            book_addr (str): Address of the orderbook. Case insensitive.
+
+        Returns:
+            ProductInfo: The product's metadata.
+
+        Raises:
+            ValueError: If the address is unknown.
+        """
+        try:
+            return self._by_book_addr[book_addr.lower()]
+        except KeyError:
+            raise ValueError(f"Invalid book address provided: {book_addr}")
+
+    def get_health_group_products(self, product_id: int) -> list[int]:
+        """
+        Retrieves the products sharing a health group with a product.
+
+        Args:
+            product_id (int): ID of the product.
+
+        Returns:
+            list[int]: `[spot_product_id, perp_product_id]` of the group, or an empty list
+            if the product is not part of a health group.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        health_group = self.get(product_id).health_group
+        if health_group is None:
+            return []
+        return self._health_groups[health_group]
+
+    def refresh(self, full: bool = False):
+        """
+        Refreshes the registry's products and symbols.
+
+        Assets, pairs, contracts and health groups only change when products are listed,
+        so they are only re-fetched when new products show up or `full` is set.
+
+        Args:
+            full (bool): Whether to re-fetch all metadata. Defaults to False.
+        """
+        metadata_futures = []
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            all_products_future = executor.submit(self._client.get_all_products)
+            symbols_future = executor.submit(self._client.get_symbols)
+            if full:
+                metadata_futures = self._submit_metadata_queries(executor)
+            all_products: AllProductsData = all_products_future.result()
+            symbols: SymbolsData = symbols_future.result()
+            product_ids = {
+                product.product_id
+                for product in all_products.spot_products + all_products.perp_products
+            }
+            if not full and not product_ids.issubset(self._products.keys()):
+                full = True
+                metadata_futures = self._submit_metadata_queries(executor)
+            if full:
+                self._set_metadata(*[future.result() for future in metadata_futures])
+
+        symbols_by_product_id = {
+            int(symbol.product_id): symbol for symbol in symbols.symbols.values()
+        }
+        products: list[Union[SpotProduct, PerpProduct]] = [
+            *all_products.spot_products,
+            *all_products.perp_products,
+        ]
+        for product in products:
+            info = self._product_info(
+                product, symbols_by_product_id.get(product.product_id)
+            )
+            if self._products.get(product.product_id) != info:
+                self._products[product.product_id] = info
+        for product_id in self._products.keys() - product_ids:
+            del self._products[product_id]
+        self._build_indexes()
+
+    def _submit_metadata_queries(self, executor: ThreadPoolExecutor) -> list:
+        return [
+            executor.submit(self._client.get_assets),
+            executor.submit(self._client.get_pairs),
+            executor.submit(self._client.get_contracts),
+            executor.submit(self._client.get_health_groups),
+        ]
+
+    def _set_metadata(
+        self,
+        assets: list,
+        pairs: list,
+        contracts: ContractsData,
+        health_groups: HealthGroupsData,
+    ):
+        self._assets = {
+            asset.product_id: asset for asset in map(Asset.parse_obj, assets)
+        }
+        self._pairs = {
+            pair.ticker_id: pair for pair in map(MarketPair.parse_obj, pairs)
+        }
+        self._book_addrs = contracts.book_addrs
+        self._health_groups = health_groups.health_groups
+        self._health_group_by_product_id = {
+            product_id: i
+            for i, group in enumerate(self._health_groups)
+            for product_id in group
+        }
+
+    def _product_info(
+        self,
+        product: Union[SpotProduct, PerpProduct],
+        symbol: Optional[SymbolData],
+    ) -> ProductInfo:
+        product_id = product.product_id
+        asset = self._assets.get(product_id)
+        ticker_id = asset.ticker_id if asset is not None else None
+        pair = self._pairs.get(ticker_id) if ticker_id is not None else None
+        health_group = self._health_group_by_product_id.get(product_id)
+        return ProductInfo(
+            product_id=product_id,
+            market_type=(
+                MarketType.SPOT if isinstance(product, SpotProduct) else MarketType.PERP
+            ),
+            symbol=symbol.symbol if symbol is not None else None,
+            ticker_id=ticker_id,
+            base=pair.base if pair is not None else None,
+            quote=pair.quote if pair is not None else None,
+            book_addr=(
+                self._book_addrs[product_id]
+                if product_id < len(self._book_addrs)
+                else None
+            ),
+            health_group=health_group,
+            price_increment_x18=int(product.book_info.price_increment_x18),
+            size_increment=int(product.book_info.size_increment),
+            min_size=int(product.book_info.min_size),
+            maker_fee_rate_x18=(
+                int(symbol.maker_fee_rate_x18) if symbol is not None else None
+            ),
+            taker_fee_rate_x18=(
+                int(symbol.taker_fee_rate_x18) if symbol is not None else None
+            ),
+            risk=product.risk,
+        )
+
+    def _build_indexes(self):
+        products = self._products.values()
+        self._by_symbol = {
+            product.symbol: product for product in products if product.symbol
+        }
+        self._by_ticker_id = {
+            product.ticker_id: product for product in products if product.ticker_id
+        }
+        self._by_book_addr = {
+            product.book_addr.lower(): product
+            for product in products
+            if product.book_addr
+        }
@@ -9,6 +9,7 @@ from vertex_protocol.utils.execute import (
     OrderParams,
     SignatureParams,
 )
+from vertex_protocol.utils.market_impact import MarketImpact
 from vertex_protocol.utils.model import VertexBaseModel
 from vertex_protocol.utils.bytes32 import (
     bytes32_to_hex,
@@ -18,7 +19,6 @@ from vertex_protocol.utils.bytes32 import (
 from vertex_protocol.utils.subaccount import Subaccount
 from vertex_protocol.engine_client.types.query import OrderData
 
-
 Digest = Union[str, bytes]
 
 
@@ -91,6 +91,38 @@ class PlaceMarketOrderParams(SignatureParams):
     reduce_only: Optional[bool]
 
 
+class PlaceSmartMarketOrderParams(VertexBaseModel):
+    """
+    Class for defining the parameters needed to place a depth-aware market order.
+
+    Attributes:
+        product_id (int): The id of the product for which the order is being placed.
+
+        market_order (MarketOrderParams): The parameters of the market order.
+
+        slippage (Optional[float]): Maximum distance from the top of the book the order can fill at. Defaults to 0.005 (0.5%)
+
+        depth (Optional[int]): Number of book levels to fetch. Defaults to 20.
+
+        max_child_orders (Optional[int]): Maximum number of IOC child orders the order is split into. Defaults to 1.
+
+        allow_partial (Optional[bool]): Whether to place the fillable part of the order when the visible book can't fill it within `slippage`. Defaults to False.
+
+        spot_leverage (Optional[bool]): An optional flag indicating whether leverage should be used for the order. By default, leverage is assumed.
+
+        reduce_only (Optional[bool]): When True, the order can only reduce the size of an existing position.
+    """
+
+    product_id: int
+    market_order: MarketOrderParams
+    slippage: Optional[float]
+    depth: Optional[int]
+    max_child_orders: Optional[int]
+    allow_partial: Optional[bool]
+    spot_leverage: Optional[bool]
+    reduce_only: Optional[bool]
+
+
 class CancelOrdersParams(BaseParamsSigned):
     """
     Parameters to cancel specific orders.
@@ -635,6 +667,20 @@ class ExecuteResponse(VertexBaseModel):
     id: Optional[int]
 
 
+class SmartMarketOrderResponse(VertexBaseModel):
+    """
+    Represents the outcome of a depth-aware market order.
+
+    Attributes:
+        impact (MarketImpact): Expected execution of the order against the fetched book.
+
+        responses (list[ExecuteResponse]): Responses of the placed child orders, in placement order.
+    """
+
+    impact: MarketImpact
+    responses: list[ExecuteResponse]
+
+
 def to_execute_request(params: ExecuteParams) -> ExecuteRequest:
     """
     Maps `ExecuteParams` to its corresponding `ExecuteRequest` object based on the parameter type.
@@ -1,6 +1,6 @@
 from vertex_protocol.utils.enum import StrEnum
-from typing import Optional, Union
-from pydantic import validator
+from typing import Any, Optional, Sequence, Union
+from pydantic import PrivateAttr, validator
 from vertex_protocol.utils.model import VertexBaseModel
 from vertex_protocol.engine_client.types.models import (
     ApplyDeltaTx,
@@ -21,6 +21,7 @@ from vertex_protocol.engine_client.types.models import (
     SymbolData,
     PerpProductBalance,
     MarketLiquidity,
+    SubaccountPosition,
 )
 
 
@@ -292,6 +293,23 @@ class OrderData(VertexBaseModel):
     placed_at: str
 
 
+def _lookup_product_id(
+    model: VertexBaseModel, index_attr: str, product_id: int, *items: Sequence[Any]
+) -> Any:
+    """
+    Looks up an item by product ID through an index stored in the model's `index_attr`
+    private attribute, built on first use from `items`. Later lists take precedence.
+    """
+    index: Optional[dict[int, Any]] = getattr(model, index_attr)
+    if index is None:
+        index = {item.product_id: item for group in items for item in group}
+        setattr(model, index_attr, index)
+    try:
+        return index[product_id]
+    except KeyError:
+        raise ValueError(f"Invalid product id provided: {product_id}")
+
+
 class SubaccountInfoData(VertexBaseModel):
     """
     Model for detailed info about a subaccount, including balances.
@@ -308,12 +326,22 @@ class SubaccountInfoData(VertexBaseModel):
     spot_products: list[SpotProduct]
     perp_products: list[PerpProduct]
 
+    _balances_by_product_id: Optional[
+        dict[int, Union[SpotProductBalance, PerpProductBalance]]
+    ] = PrivateAttr(default=None)
+    _products_by_product_id: Optional[dict[int, Union[SpotProduct, PerpProduct]]] = (
+        PrivateAttr(default=None)
+    )
+
     def parse_subaccount_balance(
         self, product_id: int
     ) -> Union[SpotProductBalance, PerpProductBalance]:
         """
         Parses the balance of a subaccount for a given product.
 
+        Lookups go through a product_id index built on first use, so balances
+        should not be modified afterwards.
+
         Args:
             product_id (int): The ID of the product to lookup.
 
@@ -323,15 +351,54 @@ class SubaccountInfoData(VertexBaseModel):
         Raises:
             ValueError: If the product ID provided is not found.
         """
-        for spot_balance in self.spot_balances:
-            if spot_balance.product_id == product_id:
-                return spot_balance
+        return _lookup_product_id(
+            self,
+            "_balances_by_product_id",
+            product_id,
+            self.perp_balances,
+            self.spot_balances,
+        )
+
+    def parse_subaccount_product(
+        self, product_id: int
+    ) -> Union[SpotProduct, PerpProduct]:
+        """
+        Parses the product state returned along with the subaccount balances.
+
+        Args:
+            product_id (int): The ID of the product to lookup.
 
-        for perp_balance in self.perp_balances:
-            if perp_balance.product_id == product_id:
-                return perp_balance
+        Returns:
+            Union[SpotProduct, PerpProduct]: The product.
 
-        raise ValueError(f"Invalid product id provided: {product_id}")
+        Raises:
+            ValueError: If the product ID provided is not found.
+        """
+        return _lookup_product_id(
+            self,
+            "_products_by_product_id",
+            product_id,
+            self.perp_products,
+            self.spot_products,
+        )
+
+    def parse_subaccount_position(self, product_id: int) -> SubaccountPosition:
+        """
+        Parses the balance of a subaccount for a given product, along with the product.
+
+        Args:
+            product_id (int): The ID of the product to lookup.
+
+        Returns:
+            SubaccountPosition: The balance and product.
+
+        Raises:
+            ValueError: If the product ID provided is not found.
+        """
+        return SubaccountPosition(
+            balance=self.parse_subaccount_balance(product_id),
+            product=self.parse_subaccount_product(product_id),
+        )
 
 
 class IsolatedPositionsData(VertexBaseModel):
@@ -388,6 +455,34 @@ class AllProductsData(VertexBaseModel):
     spot_products: list[SpotProduct]
     perp_products: list[PerpProduct]
 
+    _products_by_product_id: Optional[dict[int, Union[SpotProduct, PerpProduct]]] = (
+        PrivateAttr(default=None)
+    )
+
+    def get_product(self, product_id: int) -> Union[SpotProduct, PerpProduct]:
+        """
+        Retrieves a product by ID.
+
+        Lookups go through a product_id index built on first use, so products
+        should not be modified afterwards.
+
+        Args:
+            product_id (int): The ID of the product to lookup.
+
+        Returns:
+            Union[SpotProduct, PerpProduct]: The product.
+
+        Raises:
+            ValueError: If the product ID provided is not found.
+        """
+        return _lookup_product_id(
+            self,
+            "_products_by_product_id",
+            product_id,
+            self.perp_products,
+            self.spot_products,
+        )
+
 
 class MarketPriceData(VertexBaseModel):
     """
@@ -1,4 +1,9 @@
 from vertex_protocol.indexer_client.query import IndexerQueryClient
+from vertex_protocol.indexer_client.backfill import IndexerBackfill
+from vertex_protocol.indexer_client.balance_history import BalanceHistory
+from vertex_protocol.indexer_client.candlestick_store import CandlestickStore
+from vertex_protocol.indexer_client.columnar import CandlestickColumns
+from vertex_protocol.indexer_client.history_store import SubaccountHistoryStore
 from vertex_protocol.indexer_client.types import IndexerClientOpts
 
 
@@ -25,4 +30,13 @@ class IndexerClient(IndexerQueryClient):
         super().__init__(opts)
 
 
-__all__ = ["IndexerClient", "IndexerClientOpts", "IndexerQueryClient"]
+__all__ = [
+    "IndexerClient",
+    "IndexerClientOpts",
+    "IndexerQueryClient",
+    "IndexerBackfill",
+    "CandlestickStore",
+    "CandlestickColumns",
+    "SubaccountHistoryStore",
+    "BalanceHistory",
+]
@@ -0,0 +1,355 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from queue import Full, Queue
+from typing import Any, Callable, Iterator, Optional
+from vertex_protocol.indexer_client.pagination import (
+    IndexedRow,
+    RowsPage,
+    iter_submission_idx_rows,
+)
+from vertex_protocol.indexer_client.query import IndexerQueryClient
+from vertex_protocol.indexer_client.types.models import (
+    IndexerEvent,
+    IndexerHistoricalOrder,
+    IndexerMatch,
+)
+from vertex_protocol.indexer_client.types.query import (
+    IndexerBaseParams,
+    IndexerEventsParams,
+    IndexerEventsRawLimit,
+    IndexerMatchesParams,
+    IndexerSubaccountHistoricalOrdersParams,
+)
+from vertex_protocol.utils.rate_limit import RateLimiter
+
+
+class IndexerBackfill:
+    """
+    Backfills indexer history over a time range by splitting it into time shards that
+    are paginated concurrently.
+
+    Shards are paginated by `submission_idx` within their `[min_time, max_time]` bounds, rows
+    being timed by the txs of their response, and their rows are emitted newest first, in the same order as a sequential walk. Adjacent
+    shards overlap by one second and rows are de-duplicated on `submission_idx`, so the
+    output is exact regardless of the indexer's `max_time` inclusivity. Requests from all
+    shards share a single rate budget, so a backfill's throughput is bound by the allowed
+    request rate rather than by round trips.
+    """
+
+    def __init__(
+        self,
+        client: IndexerQueryClient,
+        max_workers: int = 4,
+        max_requests_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+    ):
+        """
+        Initializes the backfill engine.
+
+        Args:
+            client (IndexerQueryClient): The indexer client used to query history.
+
+            max_workers (int): Maximum number of shards paginated concurrently. Defaults to 4.
+
+            max_requests_per_second (float, optional): Rate budget shared by all shards. Unlimited by default.
+
+            burst (int, optional): Maximum number of requests sent at once when a rate budget is set.
+            Defaults to one second worth of requests.
+
+        Raises:
+            ValueError: If `max_workers` isn't positive.
+        """
+        if max_workers <= 0:
+            raise ValueError(f"Invalid max workers provided: {max_workers}")
+        self.client = client
+        self.max_workers = max_workers
+        self.rate_limiter = (
+            RateLimiter(max_requests_per_second, burst)
+            if max_requests_per_second is not None
+            else None
+        )
+
+    def matches(
+        self,
+        params: IndexerMatchesParams,
+        start_time: int,
+        end_time: int,
+        shard_seconds: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[IndexerMatch]:
+        """
+        Backfills matches within a time range, newest first.
+
+        Args:
+            params (IndexerMatchesParams): Query parameters. Pagination fields are ignored.
+
+            start_time (int): Start of the range, in seconds, inclusive.
+
+            end_time (int): End of the range, in seconds, inclusive.
+
+            shard_seconds (int, optional): Duration of each shard. Defaults to splitting the range
+            into four shards per worker.
+
+            page_size (int): Number of matches to fetch per query. Defaults to 500.
+
+        Returns:
+            Iterator[IndexerMatch]: The matches.
+        """
+        return self.backfill(
+            IndexerMatchesParams.parse_obj(params),
+            lambda page_params: attrgetter("matches", "txs")(
+                self.client.get_matches(page_params)
+            ),
+            start_time,
+            end_time,
+            shard_seconds,
+            page_size,
+        )
+
+    def events(
+        self,
+        params: IndexerEventsParams,
+        start_time: int,
+        end_time: int,
+        shard_seconds: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[IndexerEvent]:
+        """
+        Backfills events within a time range, newest first.
+
+        Args:
+            params (IndexerEventsParams): Query parameters. Pagination fields are ignored.
+
+            start_time (int): Start of the range, in seconds, inclusive.
+
+            end_time (int): End of the range, in seconds, inclusive.
+
+            shard_seconds (int, optional): Duration of each shard. Defaults to splitting the range
+            into four shards per worker.
+
+            page_size (int): Number of events to fetch per query. Defaults to 500.
+
+        Returns:
+            Iterator[IndexerEvent]: The events.
+        """
+        return self.backfill(
+            IndexerEventsParams.parse_obj(params),
+            lambda page_params: attrgetter("events", "txs")(
+                self.client.get_events(page_params)
+            ),
+            start_time,
+            end_time,
+            shard_seconds,
+            page_size,
+            lambda limit: IndexerEventsRawLimit(raw=limit),
+        )
+
+    def historical_orders(
+        self,
+        params: IndexerSubaccountHistoricalOrdersParams,
+        start_time: int,
+        end_time: int,
+        shard_seconds: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[IndexerHistoricalOrder]:
+        """
+        Backfills the historical orders of a subaccount within a time range, newest first.
+
+        Orders come without txs, so they can only be backfilled if they carry their own `timestamp`.
+
+        Args:
+            params (IndexerSubaccountHistoricalOrdersParams): Query parameters. Pagination fields are ignored.
+
+            start_time (int): Start of the range, in seconds, inclusive.
+
+            end_time (int): End of the range, in seconds, inclusive.
+
+            shard_seconds (int, optional): Duration of each shard. Defaults to splitting the range
+            into four shards per worker.
+
+            page_size (int): Number of orders to fetch per query. Defaults to 500.
+
+        Returns:
+            Iterator[IndexerHistoricalOrder]: The historical orders.
+        """
+        return self.backfill(
+            IndexerSubaccountHistoricalOrdersParams.parse_obj(params),
+            lambda page_params: (
+                self.client.get_subaccount_historical_orders(page_params).orders,
+                [],
+            ),
+            start_time,
+            end_time,
+            shard_seconds,
+            page_size,
+        )
+
+    def backfill(
+        self,
+        params: IndexerBaseParams,
+        get_rows: Callable[[Any], RowsPage[IndexedRow]],
+        start_time: int,
+        end_time: int,
+        shard_seconds: Optional[int] = None,
+        page_size: int = 500,
+        to_limit: Callable[[int], Any] = lambda limit: limit,
+    ) -> Iterator[IndexedRow]:
+        """
+        Backfills the rows of any indexer query paginated by `submission_idx`, newest first.
+
+        At most `max_workers` shards are in flight at any time: the oldest one is streamed as
+        it is paginated, while the next ones fill buffers of up to `page_size` rows. The next
+        shard is only submitted once the oldest one has been emitted.
+
+        Args:
+            params (IndexerBaseParams): Query parameters. Pagination fields are ignored.
+
+            get_rows (Callable[[Any], RowsPage]): Queries the rows of a page and the txs of the same response,
+            given its parameters.
+
+            start_time (int): Start of the range, in seconds, inclusive.
+
+            end_time (int): End of the range, in seconds, inclusive.
+
+            shard_seconds (int, optional): Duration of each shard. Defaults to splitting the range
+            into four shards per worker.
+
+            page_size (int): Number of rows to fetch per query. Defaults to 500.
+
+            to_limit (Callable[[int], Any]): Converts a row count to the query's `limit`.
+
+        Returns:
+            Iterator[IndexedRow]: The rows within the range.
+
+        Raises:
+            ValueError: If the range or shard duration is invalid, or while iterating if a row
+            has neither a timestamp nor a tx to time it by.
+        """
+        if start_time > end_time:
+            raise ValueError(f"Invalid time range provided: [{start_time}, {end_time}]")
+        if shard_seconds is None:
+            shard_seconds = -(-(end_time - start_time + 1) // (self.max_workers * 4))
+        if shard_seconds <= 0:
+            raise ValueError(f"Invalid shard duration provided: {shard_seconds}")
+
+        def get_rate_limited_rows(page_params: Any) -> RowsPage[IndexedRow]:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            return get_rows(page_params)
+
+        def iter_shard(max_time: int, min_time: int) -> Iterator[IndexedRow]:
+            shard_params = params.copy(update={"idx": None, "max_time": max_time})
+            return iter_submission_idx_rows(
+                shard_params,
+                get_rate_limited_rows,
+                page_size,
+                min_time=min_time,
+                prefetch=False,
+                to_limit=to_limit,
+            )
+
+        return self._emit_shards(
+            iter_shard, self._shards(start_time, end_time, shard_seconds), page_size
+        )
+
+    def _shards(
+        self, start_time: int, end_time: int, shard_seconds: int
+    ) -> Iterator[tuple[int, int]]:
+        # newest first, each shard overlaps the next one by a second
+        shard_end = end_time
+        while shard_end >= start_time:
+            shard_start = max(start_time, shard_end - shard_seconds + 1)
+            max_time = shard_end if shard_end == end_time else shard_end + 1
+            yield max_time, shard_start
+            shard_end = shard_start - 1
+
+    def _emit_shards(
+        self,
+        iter_shard: Callable[[int, int], Iterator[IndexedRow]],
+        shards: Iterator[tuple[int, int]],
+        buffer_size: int,
+    ) -> Iterator[IndexedRow]:
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        stopped = threading.Event()
+        pending: list[_ShardBuffer] = []
+
+        def submit(shard: tuple[int, int]):
+            buffer = _ShardBuffer(buffer_size, stopped)
+            executor.submit(buffer.fill, iter_shard, shard)
+            pending.append(buffer)
+
+        try:
+            for shard in shards:
+                submit(shard)
+                if len(pending) == self.max_workers:
+                    break
+            min_emitted_idx: Optional[int] = None
+            while pending:
+                buffer = pending[0]
+                shard_min_idx: Optional[int] = None
+                # the oldest shard is streamed while the next ones fill their buffers
+                for row in buffer:
+                    idx = int(row.submission_idx)
+                    if min_emitted_idx is not None and idx >= min_emitted_idx:
+                        # already emitted by the previous, overlapping shard
+                        continue
+                    shard_min_idx = idx
+                    yield row
+                pending.pop(0)
+                next_shard = next(shards, None)
+                if next_shard is not None:
+                    submit(next_shard)
+                if shard_min_idx is not None:
+                    min_emitted_idx = shard_min_idx
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _ShardBuffer:
+    """
+    Bounded queue of the rows of a shard, filled by a worker thread and drained by the consumer.
+    """
+
+    _END = object()
+
+    def __init__(self, size: int, stopped: threading.Event):
+        self._queue: Queue = Queue(maxsize=size)
+        self._stopped = stopped
+
+    def fill(
+        self, iter_shard: Callable[[int, int], Iterator[Any]], shard: tuple[int, int]
+    ):
+        rows = iter_shard(*shard)
+        try:
+            for row in rows:
+                if not self._put(row):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        finally:
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()
+        self._put(self._END)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            item = self._queue.get()
+            if item is self._END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _put(self, item: Any) -> bool:
+        # gives up once the backfill is closed, so workers never block on abandoned shards
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
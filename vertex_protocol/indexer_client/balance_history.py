@@ -0,0 +1,270 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Union
+from vertex_protocol.indexer_client.types.models import (
+    IndexerEvent,
+    IndexerPerpProductBalanceData,
+    IndexerPerpProductData,
+    IndexerTx,
+)
+from vertex_protocol.utils.fixed import X18
+
+# Raw events, as decoded from the indexer's JSON, are folded without building models.
+RawIndexerEvent = dict[str, Any]
+RawIndexerTx = dict[str, Any]
+
+
+def _float_array() -> array:
+    return array("d")
+
+
+def _int_array() -> array:
+    return array("q")
+
+
+@dataclass
+class ProductBalanceSeries:
+    """
+    Time series of a product's balance and PnL, one entry per event, oldest first.
+
+    All values but `submission_idx` and `timestamp` are float64 arrays converted from x18.
+    PnL follows the indexer's tracked fields:
+
+    - `realized_pnl` = `net_entry_unrealized` - `net_entry_cumulative`
+    - `unrealized_pnl` = `amount` * `oracle_price` - `net_entry_unrealized`, at the event's oracle price
+    """
+
+    product_id: int
+    submission_idx: array = field(default_factory=_int_array)
+    timestamp: array = field(default_factory=_int_array)
+    amount: array = field(default_factory=_float_array)
+    v_quote_balance: array = field(default_factory=_float_array)
+    oracle_price: array = field(default_factory=_float_array)
+    net_entry_unrealized: array = field(default_factory=_float_array)
+    net_entry_cumulative: array = field(default_factory=_float_array)
+    net_funding_unrealized: array = field(default_factory=_float_array)
+    net_funding_cumulative: array = field(default_factory=_float_array)
+    net_interest_unrealized: array = field(default_factory=_float_array)
+    net_interest_cumulative: array = field(default_factory=_float_array)
+    realized_pnl: array = field(default_factory=_float_array)
+    unrealized_pnl: array = field(default_factory=_float_array)
+
+    def __len__(self) -> int:
+        return len(self.submission_idx)
+
+
+class BalanceHistory:
+    """
+    Reconstructs per product balance and PnL time series from a subaccount's events.
+
+    Each event carries the product's balance after the event and the tracked entry,
+    funding and interest totals, so reconstruction is a single fold with no replay of
+    balance changes. Series are stored as compact columns, see `ProductBalanceSeries`.
+
+    Events are timed by their txs, so they are folded incrementally with `update` along with
+    them, e.g: pages of `get_events` or of a `SubaccountHistoryStore`.
+    """
+
+    def __init__(self, isolated: bool = False):
+        """
+        Initializes an empty history.
+
+        Args:
+            isolated (bool): Whether to fold the events of isolated positions instead of the
+            subaccount's cross-margin events. Defaults to False.
+        """
+        self.isolated = isolated
+        self._series: dict[int, ProductBalanceSeries] = {}
+        self._last_idx: Optional[int] = None
+
+    @property
+    def product_ids(self) -> list[int]:
+        """
+        IDs of the products with at least one event, in ascending order.
+        """
+        return sorted(self._series.keys())
+
+    @property
+    def last_submission_idx(self) -> Optional[int]:
+        """
+        `submission_idx` of the newest folded event, None if no event was folded.
+        """
+        return self._last_idx
+
+    def get(self, product_id: int) -> ProductBalanceSeries:
+        """
+        Retrieves the time series of a product.
+
+        Args:
+            product_id (int): ID of the product.
+
+        Returns:
+            ProductBalanceSeries: The product's series.
+
+        Raises:
+            ValueError: If no event of the product was folded.
+        """
+        try:
+            return self._series[product_id]
+        except KeyError:
+            raise ValueError(f"Invalid product id provided: {product_id}")
+
+    def update(
+        self,
+        events: Iterable[Union[IndexerEvent, RawIndexerEvent]],
+        txs: Optional[Iterable[Union[IndexerTx, RawIndexerTx]]] = None,
+    ) -> int:
+        """
+        Folds a batch of events into the time series.
+
+        Events can be in any order, e.g: newest first as returned by the indexer, and
+        either `IndexerEvent` models or raw events as decoded from JSON, which is several
+        times faster. Events already folded by a previous batch, i.e: with a
+        `submission_idx` lower than or equal to `last_submission_idx`, are skipped, so all
+        the events of a submission must be part of the same batch.
+
+        Args:
+            events (Iterable[IndexerEvent | RawIndexerEvent]): Events to fold.
+
+            txs (Iterable[IndexerTx | RawIndexerTx], optional): Txs returned along with the events.
+            Events are timed by the tx sharing their `submission_idx`.
+
+        Returns:
+            int: Number of events folded.
+
+        Raises:
+            ValueError: If an event has neither a `timestamp` of its own nor a tx.
+        """
+        tx_timestamps = _tx_timestamps(txs or [])
+        rows = []
+        for event in events:
+            row = (
+                _model_row(event, tx_timestamps)
+                if isinstance(event, IndexerEvent)
+                else _raw_row(event, tx_timestamps)
+            )
+            if row[3] != self.isolated:
+                continue
+            if self._last_idx is not None and row[0] <= self._last_idx:
+                continue
+            rows.append(row)
+        rows.sort(key=lambda row: row[0])
+        for row in rows:
+            self._fold(*row)
+        if rows:
+            self._last_idx = rows[-1][0]
+        return len(rows)
+
+    def _fold(
+        self,
+        submission_idx: int,
+        timestamp: int,
+        product_id: int,
+        isolated: bool,
+        amount: int,
+        v_quote_balance: int,
+        oracle_price_x18: int,
+        net_entry_unrealized: int,
+        net_entry_cumulative: int,
+        net_funding_unrealized: int,
+        net_funding_cumulative: int,
+        net_interest_unrealized: int,
+        net_interest_cumulative: int,
+    ):
+        series = self._series.get(product_id)
+        if series is None:
+            series = self._series[product_id] = ProductBalanceSeries(product_id)
+        series.submission_idx.append(submission_idx)
+        series.timestamp.append(timestamp)
+        series.amount.append(amount / X18)
+        series.v_quote_balance.append(v_quote_balance / X18)
+        series.oracle_price.append(oracle_price_x18 / X18)
+        series.net_entry_unrealized.append(net_entry_unrealized / X18)
+        series.net_entry_cumulative.append(net_entry_cumulative / X18)
+        series.net_funding_unrealized.append(net_funding_unrealized / X18)
+        series.net_funding_cumulative.append(net_funding_cumulative / X18)
+        series.net_interest_unrealized.append(net_interest_unrealized / X18)
+        series.net_interest_cumulative.append(net_interest_cumulative / X18)
+        # computed on exact values before converting
+        series.realized_pnl.append((net_entry_unrealized - net_entry_cumulative) / X18)
+        series.unrealized_pnl.append(
+            (amount * oracle_price_x18 // X18 - net_entry_unrealized) / X18
+        )
+
+
+def _tx_timestamps(txs: Iterable[Union[IndexerTx, RawIndexerTx]]) -> dict[int, int]:
+    tx_timestamps = {}
+    for tx in txs:
+        if isinstance(tx, IndexerTx):
+            submission_idx, timestamp = tx.submission_idx, tx.timestamp
+        else:
+            submission_idx, timestamp = tx["submission_idx"], tx.get("timestamp")
+        if timestamp is not None:
+            tx_timestamps[int(submission_idx)] = int(timestamp)
+    return tx_timestamps
+
+
+def _event_timestamp(
+    submission_idx: int, timestamp: Optional[str], tx_timestamps: dict[int, int]
+) -> int:
+    if timestamp is not None:
+        return int(timestamp)
+    try:
+        return tx_timestamps[submission_idx]
+    except KeyError:
+        raise ValueError(
+            f"Invalid events provided: event {submission_idx} has no timestamp nor tx"
+        )
+
+
+def _model_row(event: IndexerEvent, tx_timestamps: dict[int, int]) -> tuple:
+    post_balance = event.post_balance
+    if isinstance(post_balance, IndexerPerpProductBalanceData):
+        amount = post_balance.perp.balance.amount
+        v_quote_balance = post_balance.perp.balance.v_quote_balance
+    else:
+        amount = post_balance.spot.balance.amount
+        v_quote_balance = "0"
+    product = (
+        event.product.perp
+        if isinstance(event.product, IndexerPerpProductData)
+        else event.product.spot
+    )
+    submission_idx = int(event.submission_idx)
+    return (
+        submission_idx,
+        _event_timestamp(submission_idx, event.timestamp, tx_timestamps),
+        event.product_id,
+        event.isolated,
+        int(amount),
+        int(v_quote_balance),
+        int(product.oracle_price_x18),
+        int(event.net_entry_unrealized),
+        int(event.net_entry_cumulative),
+        int(event.net_funding_unrealized),
+        int(event.net_funding_cumulative),
+        int(event.net_interest_unrealized),
+        int(event.net_interest_cumulative),
+    )
+
+
+def _raw_row(event: RawIndexerEvent, tx_timestamps: dict[int, int]) -> tuple:
+    post_balance = event["post_balance"]
+    balance = (post_balance.get("perp") or post_balance["spot"])["balance"]
+    product = event["product"]
+    submission_idx = int(event["submission_idx"])
+    return (
+        submission_idx,
+        _event_timestamp(submission_idx, event.get("timestamp"), tx_timestamps),
+        int(event["product_id"]),
+        bool(event.get("isolated")),
+        int(balance["amount"]),
+        int(balance.get("v_quote_balance", 0)),
+        int((product.get("perp") or product["spot"])["oracle_price_x18"]),
+        int(event["net_entry_unrealized"]),
+        int(event["net_entry_cumulative"]),
+        int(event["net_funding_unrealized"]),
+        int(event["net_funding_cumulative"]),
+        int(event["net_interest_unrealized"]),
+        int(event["net_interest_cumulative"]),
+    )
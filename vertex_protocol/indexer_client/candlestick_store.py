@@ -0,0 +1,296 @@
+import sqlite3
+from array import array
+from typing import Optional
+from vertex_protocol.indexer_client.columnar import CandlestickColumns
+from vertex_protocol.indexer_client.query import IndexerQueryClient
+from vertex_protocol.indexer_client.types.models import (
+    IndexerCandlestick,
+    IndexerCandlesticksGranularity,
+)
+from vertex_protocol.indexer_client.types.query import IndexerCandlesticksParams
+from vertex_protocol.utils.columns import x18_to_float_array
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candlesticks (
+    product_id INTEGER NOT NULL,
+    granularity INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    submission_idx TEXT NOT NULL,
+    open_x18 TEXT NOT NULL,
+    high_x18 TEXT NOT NULL,
+    low_x18 TEXT NOT NULL,
+    close_x18 TEXT NOT NULL,
+    volume TEXT NOT NULL,
+    PRIMARY KEY (product_id, granularity, timestamp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS candlestick_syncs (
+    product_id INTEGER NOT NULL,
+    granularity INTEGER NOT NULL,
+    start_time INTEGER,
+    PRIMARY KEY (product_id, granularity)
+);
+"""
+
+_COLUMNS = "submission_idx, timestamp, open_x18, high_x18, low_x18, close_x18, volume"
+
+
+class CandlestickStore:
+    """
+    Local SQLite store of candlesticks, keyed by product and granularity.
+
+    Reads are served from disk only. `sync` fetches the bars newer than the last stored
+    one, which is re-fetched as it may still have been open, and backfills older bars when
+    an earlier start time is requested, so repeated studies over the same range never hit
+    the indexer.
+    """
+
+    def __init__(self, client: IndexerQueryClient, path: str = ":memory:"):
+        """
+        Opens the store, creating it if needed.
+
+        Args:
+            client (IndexerQueryClient): The indexer client used to fetch candlesticks.
+
+            path (str): Path of the SQLite database. Defaults to an in-memory database.
+        """
+        self.client = client
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Closes the underlying database.
+        """
+        self._conn.close()
+
+    def __enter__(self) -> "CandlestickStore":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def sync(
+        self,
+        product_id: int,
+        granularity: IndexerCandlesticksGranularity,
+        start_time: Optional[int] = None,
+        page_size: int = 500,
+    ) -> int:
+        """
+        Fetches the candlesticks missing from the store.
+
+        Args:
+            product_id (int): ID of the product.
+
+            granularity (IndexerCandlesticksGranularity): Granularity of the candlesticks.
+
+            start_time (int, optional): Timestamp of the oldest candlestick to store, in seconds.
+            Defaults to the whole history on the first sync, and to the stored range afterwards.
+
+            page_size (int): Number of candlesticks to fetch per query. Defaults to 500.
+
+        Returns:
+            int: Number of candlesticks written.
+        """
+        granularity = IndexerCandlesticksGranularity(granularity)
+        row = self._conn.execute(
+            "SELECT start_time FROM candlestick_syncs WHERE product_id = ? AND granularity = ?",
+            (product_id, granularity),
+        ).fetchone()
+        last_timestamp = self.last_timestamp(product_id, granularity)
+        written = 0
+        if row is None or last_timestamp is None:
+            written += self._fetch(product_id, granularity, None, start_time, page_size)
+            synced_start_time = start_time
+        else:
+            synced_start_time = row[0]
+            if (
+                start_time is not None
+                and synced_start_time is not None
+                and start_time < synced_start_time
+            ):
+                # backfills bars older than the stored range
+                written += self._fetch(
+                    product_id,
+                    granularity,
+                    synced_start_time - 1,
+                    start_time,
+                    page_size,
+                )
+                synced_start_time = start_time
+            written += self._fetch(
+                product_id, granularity, None, last_timestamp, page_size
+            )
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO candlestick_syncs VALUES (?, ?, ?)",
+                (product_id, granularity, synced_start_time),
+            )
+        return written
+
+    def last_timestamp(
+        self, product_id: int, granularity: IndexerCandlesticksGranularity
+    ) -> Optional[int]:
+        """
+        Retrieves the timestamp of the newest stored candlestick.
+
+        Args:
+            product_id (int): ID of the product.
+
+            granularity (IndexerCandlesticksGranularity): Granularity of the candlesticks.
+
+        Returns:
+            Optional[int]: The timestamp in seconds, None if no candlestick is stored.
+        """
+        return self._conn.execute(
+            "SELECT MAX(timestamp) FROM candlesticks WHERE product_id = ? AND granularity = ?",
+            (product_id, int(granularity)),
+        ).fetchone()[0]
+
+    def get_candlesticks(
+        self,
+        product_id: int,
+        granularity: IndexerCandlesticksGranularity,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> list[IndexerCandlestick]:
+        """
+        Reads stored candlesticks within a time range, oldest first.
+
+        Args:
+            product_id (int): ID of the product.
+
+            granularity (IndexerCandlesticksGranularity): Granularity of the candlesticks.
+
+            start_time (int, optional): Start of the range, in seconds, inclusive.
+
+            end_time (int, optional): End of the range, in seconds, inclusive.
+
+        Returns:
+            list[IndexerCandlestick]: The stored candlesticks.
+        """
+        return [
+            IndexerCandlestick(
+                submission_idx=submission_idx,
+                timestamp=str(timestamp),
+                product_id=product_id,
+                granularity=int(granularity),
+                open_x18=open_x18,
+                high_x18=high_x18,
+                low_x18=low_x18,
+                close_x18=close_x18,
+                volume=volume,
+            )
+            for (
+                submission_idx,
+                timestamp,
+                open_x18,
+                high_x18,
+                low_x18,
+                close_x18,
+                volume,
+            ) in self._select(product_id, granularity, start_time, end_time)
+        ]
+
+    def get_columns(
+        self,
+        product_id: int,
+        granularity: IndexerCandlesticksGranularity,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> CandlestickColumns:
+        """
+        Reads stored candlesticks within a time range as columns, oldest first.
+
+        Args:
+            product_id (int): ID of the product.
+
+            granularity (IndexerCandlesticksGranularity): Granularity of the candlesticks.
+
+            start_time (int, optional): Start of the range, in seconds, inclusive.
+
+            end_time (int, optional): End of the range, in seconds, inclusive.
+
+        Returns:
+            CandlestickColumns: The stored candlesticks.
+        """
+        rows = self._select(product_id, granularity, start_time, end_time)
+        if not rows:
+            return CandlestickColumns(
+                array("q"), array("d"), array("d"), array("d"), array("d"), array("d")
+            )
+        _, timestamps, opens, highs, lows, closes, volumes = zip(*rows)
+        return CandlestickColumns(
+            timestamps=array("q", timestamps),
+            open=x18_to_float_array(opens),
+            high=x18_to_float_array(highs),
+            low=x18_to_float_array(lows),
+            close=x18_to_float_array(closes),
+            volume=x18_to_float_array(volumes),
+        )
+
+    def _select(
+        self,
+        product_id: int,
+        granularity: IndexerCandlesticksGranularity,
+        start_time: Optional[int],
+        end_time: Optional[int],
+    ) -> list[tuple]:
+        return self._conn.execute(
+            f"SELECT {_COLUMNS} FROM candlesticks WHERE product_id = ? AND granularity = ? "
+            "AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp",
+            (
+                product_id,
+                int(granularity),
+                start_time if start_time is not None else -(2**63),
+                end_time if end_time is not None else 2**63 - 1,
+            ),
+        ).fetchall()
+
+    def _fetch(
+        self,
+        product_id: int,
+        granularity: IndexerCandlesticksGranularity,
+        max_time: Optional[int],
+        min_time: Optional[int],
+        page_size: int,
+    ) -> int:
+        candlesticks = self.client.iter_candlesticks(
+            IndexerCandlesticksParams.parse_obj(
+                {
+                    "product_id": product_id,
+                    "granularity": granularity,
+                    "max_time": max_time,
+                }
+            ),
+            page_size=page_size,
+            min_time=min_time,
+        )
+        written = 0
+        batch: list[tuple] = []
+        for candlestick in candlesticks:
+            batch.append(
+                (
+                    product_id,
+                    int(granularity),
+                    int(candlestick.timestamp or 0),
+                    candlestick.submission_idx,
+                    candlestick.open_x18,
+                    candlestick.high_x18,
+                    candlestick.low_x18,
+                    candlestick.close_x18,
+                    candlestick.volume,
+                )
+            )
+            if len(batch) == page_size:
+                written += self._upsert(batch)
+                batch = []
+        return written + self._upsert(batch)
+
+    def _upsert(self, rows: list[tuple]) -> int:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candlesticks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
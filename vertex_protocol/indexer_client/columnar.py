@@ -0,0 +1,281 @@
+from array import array
+from dataclasses import dataclass
+from typing import Any, Optional
+from vertex_protocol.utils.columns import x18_to_float_array
+from vertex_protocol.utils.fixed import X18
+
+# Raw rows of an indexer response, as decoded from JSON.
+RawRows = list[dict[str, Any]]
+
+_NAN = float("nan")
+
+
+@dataclass
+class CandlestickColumns:
+    """
+    Columnar candlesticks, oldest first.
+
+    Prices and volumes are float64 arrays converted from x18, see `x18_to_float_array`.
+    """
+
+    timestamps: array
+    open: array
+    high: array
+    low: array
+    close: array
+    volume: array
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def matches_to_columns(
+    matches: RawRows, txs: Optional[RawRows] = None
+) -> dict[str, Any]:
+    """
+    Decodes the raw `matches` of an indexer matches response into columns, without
+    building per-row models.
+
+    Integer columns are `array('q')`, x18 columns are float64 `array('d')` and flags are
+    `array('b')`, all of which support the buffer protocol and can be wrapped without
+    copying by e.g: `numpy.frombuffer`. Digests and senders are lists of strings.
+
+    Args:
+        matches (RawRows): Raw matches, as returned by the indexer.
+
+        txs (RawRows, optional): Raw `txs` of the same response. Matches are timed by their tx,
+        and when provided, the `product_id` and `is_taker` columns are decoded from the matches'
+        `match_orders` txs.
+
+    Returns:
+        dict[str, Any]: Columns `submission_idx`, `timestamp`, `digest`, `sender`, `price`, `amount`,
+        `base_filled`, `quote_filled`, `fee`, `cumulative_base_filled`, `cumulative_quote_filled`,
+        `cumulative_fee` and `isolated`, in the response's order. `timestamp` is -1 when the
+        match's tx is missing. Plus `product_id`, -1 when the match's tx is missing, and `is_taker`
+        when `txs` are provided.
+    """
+    orders = [match["order"] for match in matches]
+    columns = {
+        "submission_idx": _int_column(matches, "submission_idx"),
+        "timestamp": _timestamp_column(matches, txs or []),
+        "digest": [match["digest"] for match in matches],
+        "sender": [order["sender"] for order in orders],
+        "price": _x18_column(orders, "priceX18"),
+        "amount": _x18_column(orders, "amount"),
+        "base_filled": _x18_column(matches, "base_filled"),
+        "quote_filled": _x18_column(matches, "quote_filled"),
+        "fee": _x18_column(matches, "fee"),
+        "cumulative_base_filled": _x18_column(matches, "cumulative_base_filled"),
+        "cumulative_quote_filled": _x18_column(matches, "cumulative_quote_filled"),
+        "cumulative_fee": _x18_column(matches, "cumulative_fee"),
+        "isolated": array("b", [bool(match.get("isolated")) for match in matches]),
+    }
+    if txs is not None:
+        match_orders_by_idx = {
+            int(tx["submission_idx"]): tx["tx"]["match_orders"]
+            for tx in txs
+            if isinstance(tx.get("tx"), dict) and "match_orders" in tx["tx"]
+        }
+        product_ids = array("q")
+        is_taker = array("b")
+        for match in matches:
+            match_orders = match_orders_by_idx.get(int(match["submission_idx"]))
+            if match_orders is None:
+                product_ids.append(-1)
+                is_taker.append(False)
+                continue
+            taker = match_orders["taker"]["order"]
+            product_ids.append(int(match_orders["product_id"]))
+            # a taker order is matched against one or more makers in a single tx
+            is_taker.append(
+                taker["sender"] == match["order"]["sender"]
+                and str(taker["nonce"]) == str(match["order"]["nonce"])
+            )
+        columns["product_id"] = product_ids
+        columns["is_taker"] = is_taker
+    return columns
+
+
+def candlesticks_to_columns(candlesticks: RawRows) -> CandlestickColumns:
+    """
+    Decodes the raw `candlesticks` of an indexer response into columns, without building
+    per-row models.
+
+    Args:
+        candlesticks (RawRows): Raw candlesticks, newest first, as returned by the indexer.
+
+    Returns:
+        CandlestickColumns: The candlesticks, oldest first.
+    """
+    candlesticks = candlesticks[::-1]
+    return CandlestickColumns(
+        timestamps=_int_column(candlesticks, "timestamp"),
+        open=_x18_column(candlesticks, "open_x18"),
+        high=_x18_column(candlesticks, "high_x18"),
+        low=_x18_column(candlesticks, "low_x18"),
+        close=_x18_column(candlesticks, "close_x18"),
+        volume=_x18_column(candlesticks, "volume"),
+    )
+
+
+def trades_to_columns(trades: RawRows) -> dict[str, array]:
+    """
+    Decodes raw v2 historical trades into columns, without building per-row models.
+
+    Args:
+        trades (RawRows): Raw trades, as returned by `get_historical_trades`.
+
+    Returns:
+        dict[str, array]: Columns `trade_id`, `timestamp`, `price`, `base_filled`, `quote_filled`
+        and `is_buy`, in the input's order.
+    """
+    return {
+        "trade_id": _int_column(trades, "trade_id"),
+        "timestamp": _int_column(trades, "timestamp"),
+        "price": array("d", [float(trade["price"]) for trade in trades]),
+        "base_filled": array("d", [float(trade["base_filled"]) for trade in trades]),
+        "quote_filled": array("d", [float(trade["quote_filled"]) for trade in trades]),
+        "is_buy": array("b", [trade["trade_type"] == "buy" for trade in trades]),
+    }
+
+
+_SPOT_STATE_FIELDS = [
+    "cumulative_deposits_multiplier_x18",
+    "cumulative_borrows_multiplier_x18",
+    "total_deposits_normalized",
+    "total_borrows_normalized",
+]
+
+_PERP_STATE_FIELDS = [
+    "cumulative_funding_long_x18",
+    "cumulative_funding_short_x18",
+    "available_settle",
+    "open_interest",
+]
+
+
+def product_snapshots_to_columns(
+    products: RawRows, txs: Optional[RawRows] = None
+) -> dict[str, array]:
+    """
+    Decodes the raw `products` of an indexer product snapshots response into columns,
+    without building per-row models.
+
+    Spot state columns are NaN for perp snapshots, and perp state columns for spot snapshots.
+
+    Args:
+        products (RawRows): Raw product snapshots, as returned by the indexer.
+
+        txs (RawRows, optional): Raw `txs` of the same response, snapshots are timed by their tx.
+
+    Returns:
+        dict[str, array]: Columns `submission_idx`, `timestamp`, `product_id`, `is_perp`,
+        `oracle_price_x18` and the x18 state fields of spot and perp products, in the response's order.
+        `timestamp` is -1 when the snapshot's tx is missing.
+    """
+    states = [
+        snapshot["product"].get("spot") or snapshot["product"]["perp"]
+        for snapshot in products
+    ]
+    columns = {
+        "submission_idx": _int_column(products, "submission_idx"),
+        "timestamp": _timestamp_column(products, txs or []),
+        "product_id": _int_column(products, "product_id"),
+        "is_perp": array("b", ["perp" in snapshot["product"] for snapshot in products]),
+        "oracle_price_x18": _x18_column(states, "oracle_price_x18"),
+    }
+    product_states = [state["state"] for state in states]
+    for field in _SPOT_STATE_FIELDS + _PERP_STATE_FIELDS:
+        columns[field] = _optional_x18_column(product_states, field)
+    return columns
+
+
+_MARKET_SNAPSHOT_METRICS = [
+    "cumulative_trades",
+    "cumulative_volumes",
+    "cumulative_trade_sizes",
+    "cumulative_sequencer_fees",
+    "cumulative_maker_fees",
+    "cumulative_liquidation_amounts",
+    "open_interests",
+    "total_deposits",
+    "total_borrows",
+    "funding_rates",
+    "deposit_rates",
+    "borrow_rates",
+    "cumulative_inflows",
+    "cumulative_outflows",
+]
+
+
+def market_snapshots_to_columns(snapshots: RawRows) -> dict[str, array]:
+    """
+    Decodes the raw `snapshots` of an indexer market snapshots response into columns,
+    without building per-row models.
+
+    Per product metrics are flattened to one column per metric and product, named
+    `<metric>.<product_id>`, e.g: `open_interests.2`. Missing values are NaN. Metrics are
+    x18, except `cumulative_trades` which is a count.
+
+    Args:
+        snapshots (RawRows): Raw market snapshots, as returned by the indexer.
+
+    Returns:
+        dict[str, array]: Columns `timestamp`, `cumulative_users`, `daily_active_users`, `tvl`
+        and per product metrics, in the response's order.
+    """
+    columns = {
+        "timestamp": _int_column(snapshots, "timestamp"),
+        "cumulative_users": _int_column(snapshots, "cumulative_users"),
+        "daily_active_users": _int_column(snapshots, "daily_active_users"),
+        "tvl": _x18_column(snapshots, "tvl"),
+    }
+    for metric in _MARKET_SNAPSHOT_METRICS:
+        values_by_product = [snapshot.get(metric) or {} for snapshot in snapshots]
+        product_ids = sorted(
+            {int(product_id) for values in values_by_product for product_id in values}
+        )
+        scale = 1 if metric == "cumulative_trades" else X18
+        for product_id in product_ids:
+            columns[f"{metric}.{product_id}"] = _optional_x18_column(
+                values_by_product, str(product_id), scale
+            )
+    return columns
+
+
+def _int_column(rows: RawRows, field: str) -> array:
+    return array("q", [int(row[field]) for row in rows])
+
+
+def _timestamp_column(rows: RawRows, txs: RawRows) -> array:
+    # rows of responses with txs are timed by the tx sharing their submission_idx
+    tx_timestamps = {
+        int(tx["submission_idx"]): int(tx["timestamp"])
+        for tx in txs
+        if tx.get("timestamp") is not None
+    }
+    return array(
+        "q",
+        [
+            (
+                int(row["timestamp"])
+                if row.get("timestamp") is not None
+                else tx_timestamps.get(int(row["submission_idx"]), -1)
+            )
+            for row in rows
+        ],
+    )
+
+
+def _x18_column(rows: RawRows, field: str) -> array:
+    return x18_to_float_array([row[field] for row in rows])
+
+
+def _optional_x18_column(rows: list[dict], field: str, scale: int = X18) -> array:
+    return array(
+        "d",
+        [
+            int(row[field]) / scale if row.get(field) is not None else _NAN
+            for row in rows
+        ],
+    )
@@ -0,0 +1,610 @@
+import sqlite3
+from typing import Any, Callable, Iterable, Optional
+from vertex_protocol.indexer_client.pagination import (
+    RowsPage,
+    iter_submission_idx_rows,
+)
+from vertex_protocol.indexer_client.query import (
+    IndexerQueryClient,
+    is_terminal_order,
+)
+from vertex_protocol.indexer_client.types.models import (
+    IndexerBaseModel,
+    IndexerEvent,
+    IndexerHistoricalOrder,
+    IndexerMatch,
+    IndexerMatchOrdersTx,
+    IndexerPayment,
+    IndexerTx,
+)
+from vertex_protocol.indexer_client.types.query import (
+    IndexerEventsData,
+    IndexerEventsParams,
+    IndexerEventsRawLimit,
+    IndexerEventsTxsLimit,
+    IndexerHistoricalOrdersData,
+    IndexerInterestAndFundingData,
+    IndexerInterestAndFundingParams,
+    IndexerMatchesData,
+    IndexerMatchesParams,
+    IndexerSubaccountHistoricalOrdersParams,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    subaccount TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    submission_idx INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    timestamp INTEGER,
+    isolated INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (subaccount, digest)
+);
+CREATE INDEX IF NOT EXISTS orders_by_idx ON orders (subaccount, submission_idx);
+CREATE INDEX IF NOT EXISTS orders_by_product ON orders (subaccount, product_id, submission_idx);
+CREATE INDEX IF NOT EXISTS orders_by_time ON orders (subaccount, timestamp);
+
+CREATE TABLE IF NOT EXISTS matches (
+    subaccount TEXT NOT NULL,
+    submission_idx INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    product_id INTEGER,
+    timestamp INTEGER,
+    isolated INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (subaccount, submission_idx, digest)
+);
+CREATE INDEX IF NOT EXISTS matches_by_product ON matches (subaccount, product_id, submission_idx);
+CREATE INDEX IF NOT EXISTS matches_by_time ON matches (subaccount, timestamp);
+CREATE INDEX IF NOT EXISTS matches_by_digest ON matches (digest);
+
+CREATE TABLE IF NOT EXISTS open_orders (
+    subaccount TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (subaccount, digest)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    subaccount TEXT NOT NULL,
+    submission_idx INTEGER NOT NULL,
+    event_index INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    timestamp INTEGER,
+    isolated INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (subaccount, submission_idx, event_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_idx ON events (subaccount, submission_idx);
+CREATE INDEX IF NOT EXISTS events_by_product ON events (subaccount, product_id, submission_idx);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (subaccount, timestamp);
+
+CREATE TABLE IF NOT EXISTS txs (
+    submission_idx INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+    subaccount TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (subaccount, kind, product_id, idx)
+);
+CREATE INDEX IF NOT EXISTS payments_by_idx ON payments (subaccount, kind, idx);
+
+CREATE TABLE IF NOT EXISTS syncs (
+    subaccount TEXT NOT NULL,
+    name TEXT NOT NULL,
+    last_idx INTEGER NOT NULL,
+    PRIMARY KEY (subaccount, name)
+);
+"""
+
+_INTEREST = "interest"
+_FUNDING = "funding"
+
+
+class SubaccountHistoryStore:
+    """
+    Local SQLite mirror of a subaccount's history: historical orders, matches, events,
+    and interest and funding payments.
+
+    `sync` only fetches rows newer than the last synced ones. Local queries mirror the
+    filters of the indexer's `get_subaccount_historical_orders`, `get_matches`, `get_events`
+    and `get_interest_and_funding_payments`, and are served from indexed tables without
+    hitting the indexer.
+    """
+
+    def __init__(
+        self,
+        client: IndexerQueryClient,
+        subaccount: str,
+        path: str = ":memory:",
+        payment_product_ids: Optional[list[int]] = None,
+    ):
+        """
+        Opens the store, creating it if needed.
+
+        Args:
+            client (IndexerQueryClient): The indexer client used to fetch history.
+
+            subaccount (str): Hex encoded bytes32 of the subaccount to mirror.
+
+            path (str): Path of the SQLite database. Defaults to an in-memory database. A database can be
+            shared by the stores of several subaccounts.
+
+            payment_product_ids (list[int], optional): Products to mirror interest and funding payments of.
+            Payments aren't mirrored by default.
+        """
+        self.client = client
+        self.subaccount = subaccount
+        self.payment_product_ids = payment_product_ids or []
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Closes the underlying database.
+        """
+        self._conn.close()
+
+    def __enter__(self) -> "SubaccountHistoryStore":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def sync(self, page_size: int = 500) -> dict[str, int]:
+        """
+        Fetches the history rows newer than the last synced ones.
+
+        Each kind of row is synced in a single transaction, so an interrupted sync never
+        leaves gaps behind. Rows are timed by their transaction, so orders are synced after
+        the matches and events carrying it. Stored orders that may still change, see
+        `is_terminal_order`, are fetched again on every sync.
+
+        Args:
+            page_size (int): Number of rows to fetch per query. Defaults to 500.
+
+        Returns:
+            dict[str, int]: Number of new rows per kind: `orders`, `matches`, `events` and `payments`.
+        """
+        matches = self._sync_matches(page_size)
+        events = self._sync_events(page_size)
+        return {
+            "orders": self._sync_orders(page_size),
+            "matches": matches,
+            "events": events,
+            "payments": self._sync_payments(page_size),
+        }
+
+    def get_subaccount_historical_orders(
+        self, params: IndexerSubaccountHistoricalOrdersParams
+    ) -> IndexerHistoricalOrdersData:
+        """
+        Retrieves mirrored historical orders, newest first.
+
+        Args:
+            params (IndexerSubaccountHistoricalOrdersParams): Same filters as the indexer query. The subaccount is
+            the store's.
+
+        Returns:
+            IndexerHistoricalOrdersData: The historical orders.
+        """
+        params = IndexerSubaccountHistoricalOrdersParams.parse_obj(params)
+        rows = self._select(
+            "orders", params.idx, params.max_time, params.product_ids, params.isolated
+        )
+        return IndexerHistoricalOrdersData(
+            orders=[
+                IndexerHistoricalOrder.parse_raw(data)
+                for _, data in _limit(rows, params.limit)
+            ]
+        )
+
+    def get_matches(self, params: IndexerMatchesParams) -> IndexerMatchesData:
+        """
+        Retrieves mirrored matches, newest first, along with their transactions.
+
+        Args:
+            params (IndexerMatchesParams): Same filters as the indexer query. The subaccount is the store's.
+
+        Returns:
+            IndexerMatchesData: The matches and their transactions.
+        """
+        params = IndexerMatchesParams.parse_obj(params)
+        rows = _limit(
+            self._select(
+                "matches",
+                params.idx,
+                params.max_time,
+                params.product_ids,
+                params.isolated,
+            ),
+            params.limit,
+        )
+        return IndexerMatchesData(
+            matches=[IndexerMatch.parse_raw(data) for _, data in rows],
+            txs=self._get_txs(idx for idx, _ in rows),
+        )
+
+    def get_events(self, params: IndexerEventsParams) -> IndexerEventsData:
+        """
+        Retrieves mirrored events, newest first, along with their transactions.
+
+        Args:
+            params (IndexerEventsParams): Same filters as the indexer query, including raw and txs limits.
+            The subaccount is the store's.
+
+        Returns:
+            IndexerEventsData: The events and their transactions.
+        """
+        params = IndexerEventsParams.parse_obj(params)
+        rows = self._select(
+            "events",
+            params.idx,
+            params.max_time,
+            params.product_ids,
+            params.isolated,
+            [str(event_type) for event_type in params.event_types or []],
+        )
+        if isinstance(params.limit, IndexerEventsRawLimit):
+            rows = rows[: params.limit.raw]
+        elif isinstance(params.limit, IndexerEventsTxsLimit):
+            idxs = sorted({idx for idx, _ in rows}, reverse=True)[: params.limit.txs]
+            rows = [row for row in rows if idxs and row[0] >= idxs[-1]]
+        return IndexerEventsData(
+            events=[IndexerEvent.parse_raw(data) for _, data in rows],
+            txs=self._get_txs(idx for idx, _ in rows),
+        )
+
+    def get_interest_and_funding_payments(
+        self,
+        product_ids: list[int],
+        max_idx: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> IndexerInterestAndFundingData:
+        """
+        Retrieves mirrored interest and funding payments, newest first.
+
+        Args:
+            product_ids (list[int]): Products to retrieve payments of.
+
+            max_idx (int, optional): Only retrieves payments with a lower or equal idx.
+
+            limit (int, optional): Maximum number of payments of each kind.
+
+        Returns:
+            IndexerInterestAndFundingData: The payments, with `next_idx` set to continue from.
+        """
+        payments = {
+            kind: [
+                IndexerPayment.parse_raw(data)
+                for (data,) in self._conn.execute(
+                    "SELECT data FROM payments WHERE subaccount = ? AND kind = ? "
+                    f"AND product_id IN ({_placeholders(product_ids)}) AND idx <= ? "
+                    "ORDER BY idx DESC, product_id LIMIT ?",
+                    (
+                        self.subaccount,
+                        kind,
+                        *product_ids,
+                        max_idx if max_idx is not None else 2**63 - 1,
+                        limit if limit is not None else -1,
+                    ),
+                )
+            ]
+            for kind in [_INTEREST, _FUNDING]
+        }
+        oldest_idx = min(
+            (
+                int(payment.idx)
+                for kind_payments in payments.values()
+                for payment in kind_payments
+            ),
+            default=0,
+        )
+        return IndexerInterestAndFundingData(
+            interest_payments=payments[_INTEREST],
+            funding_payments=payments[_FUNDING],
+            next_idx=str(max(oldest_idx - 1, 0)),
+        )
+
+    def _select(
+        self,
+        table: str,
+        max_idx: Optional[int],
+        max_time: Optional[int],
+        product_ids: Optional[list[int]],
+        isolated: Optional[bool],
+        event_types: Optional[list[str]] = None,
+    ) -> list[tuple[int, str]]:
+        query = f"SELECT submission_idx, data FROM {table} WHERE subaccount = ?"
+        args: list[Any] = [self.subaccount]
+        if max_idx is not None:
+            query += " AND submission_idx <= ?"
+            args.append(max_idx)
+        if max_time is not None:
+            query += " AND timestamp <= ?"
+            args.append(max_time)
+        if product_ids:
+            query += f" AND product_id IN ({_placeholders(product_ids)})"
+            args.extend(product_ids)
+        if isolated is not None:
+            query += " AND isolated = ?"
+            args.append(int(isolated))
+        if event_types:
+            query += f" AND event_type IN ({_placeholders(event_types)})"
+            args.extend(event_types)
+        return self._conn.execute(
+            query + " ORDER BY submission_idx DESC, rowid", args
+        ).fetchall()
+
+    def _get_txs(self, idxs: Iterable[int]) -> list[IndexerTx]:
+        unique_idxs = sorted(set(idxs), reverse=True)
+        txs: list[IndexerTx] = []
+        # stays below SQLite's default limit of bound parameters
+        for i in range(0, len(unique_idxs), 500):
+            batch = unique_idxs[i : i + 500]
+            txs.extend(
+                IndexerTx.parse_raw(data)
+                for (data,) in self._conn.execute(
+                    f"SELECT data FROM txs WHERE submission_idx IN ({_placeholders(batch)}) "
+                    "ORDER BY submission_idx DESC",
+                    batch,
+                )
+            )
+        return txs
+
+    def _last_idx(self, name: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT last_idx FROM syncs WHERE subaccount = ? AND name = ?",
+            (self.subaccount, name),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _set_last_idx(self, name: str, last_idx: Optional[int]):
+        if last_idx is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+                (self.subaccount, name, last_idx),
+            )
+
+    def _sync_rows(
+        self,
+        name: str,
+        params: Any,
+        get_rows: Callable[[Any], RowsPage],
+        insert: Callable[[Any], None],
+        page_size: int,
+        to_limit: Callable[[int], Any] = lambda limit: limit,
+    ) -> int:
+        last_idx = self._last_idx(name)
+        rows = iter_submission_idx_rows(
+            params,
+            get_rows,
+            page_size,
+            min_idx=last_idx + 1 if last_idx is not None else None,
+            to_limit=to_limit,
+        )
+        count = 0
+        new_last_idx = last_idx
+        with self._conn:
+            for row in rows:
+                if count == 0:
+                    new_last_idx = int(row.submission_idx)
+                insert(row)
+                count += 1
+            self._set_last_idx(name, new_last_idx)
+        return count
+
+    def _insert_tx(self, txs_by_idx: dict[int, IndexerTx], idx: int) -> Optional[int]:
+        # txs are fetched along with their rows, possibly on a prefetch thread
+        tx = txs_by_idx.pop(idx, None)
+        if tx is None:
+            # already inserted along with a row sharing its submission_idx
+            return self._tx_timestamp(idx)
+        self._conn.execute("INSERT OR REPLACE INTO txs VALUES (?, ?)", (idx, tx.json()))
+        return _to_int(tx.timestamp)
+
+    def _tx_timestamp(self, idx: int) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT data FROM txs WHERE submission_idx = ?", (idx,)
+        ).fetchone()
+        return _to_int(IndexerTx.parse_raw(row[0]).timestamp) if row else None
+
+    def _insert_order(self, order: IndexerHistoricalOrder):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.subaccount,
+                order.digest,
+                int(order.submission_idx),
+                order.product_id,
+                _row_timestamp(
+                    order, lambda: self._tx_timestamp(int(order.submission_idx))
+                ),
+                int(order.isolated),
+                order.json(),
+            ),
+        )
+        if is_terminal_order(order):
+            self._conn.execute(
+                "DELETE FROM open_orders WHERE subaccount = ? AND digest = ?",
+                (self.subaccount, order.digest),
+            )
+        else:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO open_orders VALUES (?, ?)",
+                (self.subaccount, order.digest),
+            )
+
+    def _refresh_open_orders(self):
+        digests = [
+            digest
+            for (digest,) in self._conn.execute(
+                "SELECT digest FROM open_orders WHERE subaccount = ?",
+                (self.subaccount,),
+            )
+        ]
+        if not digests:
+            return
+        orders = self.client.resolve_historical_orders_by_digest(digests)
+        with self._conn:
+            for order in orders.values():
+                self._insert_order(order)
+
+    def _sync_orders(self, page_size: int) -> int:
+        self._refresh_open_orders()
+        return self._sync_rows(
+            "orders",
+            IndexerSubaccountHistoricalOrdersParams.parse_obj(
+                {"subaccount": self.subaccount}
+            ),
+            lambda params: (
+                self.client.get_subaccount_historical_orders(params).orders,
+                [],
+            ),
+            self._insert_order,
+            page_size,
+        )
+
+    def _sync_matches(self, page_size: int) -> int:
+        txs_by_idx: dict[int, IndexerTx] = {}
+        product_ids: dict[int, int] = {}
+
+        def get_matches(params: IndexerMatchesParams) -> RowsPage[IndexerMatch]:
+            data = self.client.get_matches(params)
+            for tx in data.txs:
+                txs_by_idx[int(tx.submission_idx)] = tx
+                if isinstance(tx.tx, IndexerMatchOrdersTx):
+                    product_ids[int(tx.submission_idx)] = tx.tx.match_orders.product_id
+            return data.matches, data.txs
+
+        def insert(match: IndexerMatch):
+            idx = int(match.submission_idx)
+            tx_timestamp = self._insert_tx(txs_by_idx, idx)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.subaccount,
+                    idx,
+                    match.digest,
+                    product_ids.get(idx),
+                    _row_timestamp(match, lambda: tx_timestamp),
+                    int(match.isolated),
+                    match.json(),
+                ),
+            )
+
+        return self._sync_rows(
+            "matches",
+            IndexerMatchesParams.parse_obj({"subaccount": self.subaccount}),
+            get_matches,
+            insert,
+            page_size,
+        )
+
+    def _sync_events(self, page_size: int) -> int:
+        txs_by_idx: dict[int, IndexerTx] = {}
+
+        def get_events(params: IndexerEventsParams) -> RowsPage[IndexerEvent]:
+            data = self.client.get_events(params)
+            txs_by_idx.update((int(tx.submission_idx), tx) for tx in data.txs)
+            return data.events, data.txs
+
+        # position of the event within its submission, in the indexer's order
+        last_idx, event_index = -1, 0
+
+        def insert(event: IndexerEvent):
+            nonlocal last_idx, event_index
+            idx = int(event.submission_idx)
+            event_index = event_index + 1 if idx == last_idx else 0
+            last_idx = idx
+            tx_timestamp = self._insert_tx(txs_by_idx, idx)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.subaccount,
+                    idx,
+                    event_index,
+                    event.product_id,
+                    str(event.event_type),
+                    _row_timestamp(event, lambda: tx_timestamp),
+                    int(event.isolated),
+                    event.json(),
+                ),
+            )
+
+        return self._sync_rows(
+            "events",
+            IndexerEventsParams.parse_obj({"subaccount": self.subaccount}),
+            get_events,
+            insert,
+            page_size,
+            lambda limit: IndexerEventsRawLimit(raw=limit),
+        )
+
+    def _sync_payments(self, page_size: int) -> int:
+        if not self.payment_product_ids:
+            return 0
+        last_idx = self._last_idx("payments")
+        pages = self.client.iter_interest_and_funding_pages(
+            IndexerInterestAndFundingParams(
+                subaccount=self.subaccount,
+                product_ids=self.payment_product_ids,
+                max_idx=None,
+                limit=page_size,
+            ),
+            min_idx=None if last_idx is None else last_idx + 1,
+            # new payments usually fit in a single page
+            prefetch=False,
+        )
+        count = 0
+        new_last_idx = last_idx
+        with self._conn:
+            for page in pages:
+                for kind, payments in [
+                    (_INTEREST, page.interest_payments),
+                    (_FUNDING, page.funding_payments),
+                ]:
+                    for payment in payments:
+                        cursor = self._conn.execute(
+                            "INSERT OR IGNORE INTO payments VALUES (?, ?, ?, ?, ?, ?)",
+                            (
+                                self.subaccount,
+                                kind,
+                                payment.product_id,
+                                int(payment.idx),
+                                int(payment.timestamp),
+                                payment.json(),
+                            ),
+                        )
+                        count += cursor.rowcount
+                        new_last_idx = max(new_last_idx or 0, int(payment.idx))
+            self._set_last_idx("payments", new_last_idx)
+        return count
+
+
+def _limit(rows: list, limit: Optional[int]) -> list:
+    return rows[:limit] if limit is not None else rows
+
+
+def _placeholders(values: list) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _row_timestamp(
+    row: IndexerBaseModel, tx_timestamp: Callable[[], Optional[int]]
+) -> Optional[int]:
+    # indexer rows usually leave their time to the tx sharing their submission_idx
+    if row.timestamp is not None:
+        return int(row.timestamp)
+    return tx_timestamp()
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None else None
@@ -0,0 +1,200 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Union
+from vertex_protocol.indexer_client.columnar import matches_to_columns
+from vertex_protocol.indexer_client.types.query import IndexerMatchesData
+
+_NAN = float("nan")
+
+# fill residues below this are float rounding, not open quantity
+_EPSILON = 1e-12
+
+
+@dataclass
+class ProductMatchAnalytics:
+    """
+    Trade analytics of a product's matches.
+
+    Values are floats converted from x18. Realized PnL is before fees, which are reported
+    separately, and VWAPs are NaN when there's no volume on that side.
+    """
+
+    product_id: int
+    fills: int
+    orders: int
+    base_volume: float
+    quote_volume: float
+    vwap: float
+    buy_vwap: float
+    sell_vwap: float
+    position: float
+    realized_pnl_fifo: float
+    realized_pnl_average_cost: float
+    maker_fees: float
+    taker_fees: float
+    fill_ratio: float
+
+    @property
+    def fees(self) -> float:
+        return self.maker_fees + self.taker_fees
+
+
+def analyze_matches(
+    matches: Union[IndexerMatchesData, dict[str, Any]],
+    skip_unattributed: bool = False,
+) -> dict[int, ProductMatchAnalytics]:
+    """
+    Computes per product trade analytics of a subaccount's matches.
+
+    Fills are replayed oldest first, by `submission_idx`, in a single pass per product:
+
+    - VWAPs are the quote volume over the base volume, overall and per side.
+    - Realized PnL is computed both by closing lots first in first out and against the
+      position's average entry price.
+    - Fees are split between maker and taker fills.
+    - The fill ratio is the filled base amount over the amount of the matched orders, at
+      their latest fill.
+
+    Products and taker sides are only known from the matches' `match_orders` txs, so matches
+    must come with their txs, e.g: as returned by `get_matches` or a `SubaccountHistoryStore`,
+    which `iter_matches` doesn't provide. The replay starts from a flat position, so matches
+    should cover the subaccount's full history of the products.
+
+    Args:
+        matches (IndexerMatchesData | dict[str, Any]): Matches and their txs, either as returned
+        by `get_matches` or as columns from `get_matches_columns`.
+
+        skip_unattributed (bool): Whether to skip matches without a `match_orders` tx, e.g: AMM
+        fills, instead of raising. Analytics of their products are then incomplete. Defaults to False.
+
+    Returns:
+        dict[int, ProductMatchAnalytics]: Analytics by product ID.
+
+    Raises:
+        ValueError: If columns are missing the `product_id` and `is_taker` columns, or if matches
+        have no `match_orders` tx and `skip_unattributed` is False.
+    """
+    if isinstance(matches, IndexerMatchesData):
+        columns = matches_to_columns(
+            [match.dict() for match in matches.matches],
+            [tx.dict() for tx in matches.txs],
+        )
+    else:
+        columns = matches
+    if "product_id" not in columns or "is_taker" not in columns:
+        raise ValueError(
+            "Invalid matches provided: columns must include `product_id` and `is_taker`, decode them with their txs"
+        )
+    submission_idx = columns["submission_idx"]
+    product_ids = columns["product_id"]
+    unattributed = sum(1 for product_id in product_ids if product_id < 0)
+    if unattributed and not skip_unattributed:
+        raise ValueError(
+            f"Invalid matches provided: {unattributed} matches have no `match_orders` tx"
+        )
+    rows_by_product: dict[int, list[int]] = {}
+    for row in sorted(range(len(submission_idx)), key=submission_idx.__getitem__):
+        product_id = product_ids[row]
+        if product_id < 0:
+            continue
+        rows = rows_by_product.get(product_id)
+        if rows is None:
+            rows = rows_by_product[product_id] = []
+        rows.append(row)
+    return {
+        product_id: _analyze_product(product_id, rows, columns)
+        for product_id, rows in sorted(rows_by_product.items())
+    }
+
+
+def _analyze_product(
+    product_id: int, rows: list[int], columns: dict[str, Any]
+) -> ProductMatchAnalytics:
+    # gathers the product's columns, then aggregates them with builtins where possible
+    base_filled = columns["base_filled"]
+    quote_filled = columns["quote_filled"]
+    fee = columns["fee"]
+    is_taker = columns["is_taker"]
+    bases = [base_filled[row] for row in rows]
+    quotes = [quote_filled[row] for row in rows]
+    fees = [fee[row] for row in rows]
+    taker_fees = sum([f for f, row in zip(fees, rows) if is_taker[row]])
+    maker_fees = sum(fees) - taker_fees
+
+    buy_base = sum([base for base in bases if base > 0])
+    sell_base = -sum([base for base in bases if base < 0])
+    buy_quote = -sum([quote for base, quote in zip(bases, quotes) if base > 0])
+    sell_quote = sum([quote for base, quote in zip(bases, quotes) if base < 0])
+
+    # latest (filled, amount) of each order, fills being oldest first
+    digest = columns["digest"]
+    cumulative_base_filled = columns["cumulative_base_filled"]
+    amount = columns["amount"]
+    orders = {digest[row]: (cumulative_base_filled[row], amount[row]) for row in rows}
+    ordered = sum([abs(order_amount) for _, order_amount in orders.values()])
+    filled = sum([abs(order_filled) for order_filled, _ in orders.values()])
+
+    fifo_pnl = average_cost_pnl = 0.0
+    # open lots as [signed base, price], oldest first
+    lots: deque[list[float]] = deque()
+    position = cost = 0.0
+    for base, quote in zip(bases, quotes):
+        if base == 0:
+            continue
+        price = -quote / base
+
+        remaining = base
+        while lots and (lots[0][0] > 0) != (remaining > 0):
+            lot = lots[0]
+            closed = min(abs(remaining), abs(lot[0]))
+            if lot[0] > 0:
+                fifo_pnl += closed * (price - lot[1])
+                lot[0] -= closed
+                remaining += closed
+            else:
+                fifo_pnl += closed * (lot[1] - price)
+                lot[0] += closed
+                remaining -= closed
+            if abs(lot[0]) <= _EPSILON:
+                lots.popleft()
+            if abs(remaining) <= _EPSILON:
+                remaining = 0.0
+                break
+        if remaining:
+            lots.append([remaining, price])
+
+        if position == 0 or (position > 0) == (base > 0):
+            position += base
+            cost += base * price
+        else:
+            average_price = cost / position
+            closed = min(abs(base), abs(position))
+            side = 1 if position > 0 else -1
+            average_cost_pnl += closed * (price - average_price) * side
+            position -= closed * side
+            cost -= closed * side * average_price
+            flipped = base + closed * side
+            if abs(position) <= _EPSILON:
+                position = cost = 0.0
+            if abs(flipped) > _EPSILON:
+                position = flipped
+                cost = flipped * price
+
+    base_volume = buy_base + sell_base
+    quote_volume = buy_quote + sell_quote
+    return ProductMatchAnalytics(
+        product_id=product_id,
+        fills=len(rows),
+        orders=len(orders),
+        base_volume=base_volume,
+        quote_volume=quote_volume,
+        vwap=quote_volume / base_volume if base_volume else _NAN,
+        buy_vwap=buy_quote / buy_base if buy_base else _NAN,
+        sell_vwap=sell_quote / sell_base if sell_base else _NAN,
+        position=sum(lot[0] for lot in lots),
+        realized_pnl_fifo=fifo_pnl,
+        realized_pnl_average_cost=average_cost_pnl,
+        maker_fees=maker_fees,
+        taker_fees=taker_fees,
+        fill_ratio=filled / ordered if ordered else _NAN,
+    )
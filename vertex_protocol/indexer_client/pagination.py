@@ -0,0 +1,241 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, TypeVar
+from vertex_protocol.indexer_client.types.models import IndexerBaseModel, IndexerTx
+from vertex_protocol.indexer_client.types.query import IndexerBaseParams
+
+T = TypeVar("T")
+IndexedRow = TypeVar("IndexedRow", bound=IndexerBaseModel)
+
+# Rows of an indexer page, along with the txs of the same response (empty for queries
+# that don't return txs, e.g: historical orders).
+RowsPage = tuple[list[IndexedRow], list[IndexerTx]]
+
+# Fetches the page at a cursor and returns its rows along with the cursor of the next page,
+# or None when it is the last page.
+PageFetcher = Callable[[Any], tuple[list[T], Optional[Any]]]
+
+
+def iter_pages(
+    fetch_page: PageFetcher[T], cursor: Any, prefetch: bool = True
+) -> Generator[list[T], None, None]:
+    """
+    Lazily walks a paginated indexer endpoint, one page at a time.
+
+    When `prefetch` is set, the next page is requested in a background thread while the
+    current one is being consumed. At most two pages are held in memory at any time.
+
+    Args:
+        fetch_page (PageFetcher): Fetches a page and returns its rows and the next page's cursor.
+
+        cursor (Any): Cursor of the first page.
+
+        prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+    Returns:
+        Generator[list[T], None, None]: The rows of each page.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        rows, next_cursor = fetch_page(cursor)
+        while True:
+            next_page: Optional[Future] = None
+            if executor is not None and next_cursor is not None:
+                next_page = executor.submit(fetch_page, next_cursor)
+            yield rows
+            if next_cursor is None:
+                return
+            rows, next_cursor = (
+                next_page.result() if next_page is not None else fetch_page(next_cursor)
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def split_submission_idx_page(
+    rows: list[IndexedRow], limit: int
+) -> tuple[list[IndexedRow], Optional[int]]:
+    """
+    Splits rows fetched with `limit + 1` into the rows of the current page and the
+    `submission_idx` cursor of the next one.
+
+    Indexer queries return rows with a `submission_idx` lower than or equal to the requested
+    one, newest first, and a single submission can produce several rows (e.g: events). The
+    extra row's `submission_idx` becomes the next cursor, and trailing rows sharing it are
+    deferred to the next page so that no row is returned twice.
+
+    As cursors can't point within a submission, an empty page is returned when a single
+    submission spans all rows, in which case the page has to be fetched again with a
+    larger limit.
+
+    Args:
+        rows (list[IndexedRow]): Rows of the page, newest first.
+
+        limit (int): Number of rows requested, not counting the extra row.
+
+    Returns:
+        tuple[list[IndexedRow], Optional[int]]: Rows of the page and the next cursor, None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    cursor = int(rows[limit].submission_idx)
+    end = limit
+    while end > 0 and int(rows[end - 1].submission_idx) == cursor:
+        end -= 1
+    return rows[:end], cursor
+
+
+def tx_timestamps(txs: Iterable[IndexerTx]) -> dict[int, int]:
+    """
+    Maps the `submission_idx` of txs to their timestamp.
+
+    Matches, events and product snapshots don't carry their own timestamp, the indexer
+    returns it on the txs of the same response instead.
+
+    Args:
+        txs (Iterable[IndexerTx]): Txs of an indexer response.
+
+    Returns:
+        dict[int, int]: Timestamp of each submission, in seconds.
+    """
+    return {
+        int(tx.submission_idx): int(tx.timestamp)
+        for tx in txs
+        if tx.timestamp is not None
+    }
+
+
+def iter_submission_idx_rows(
+    params: IndexerBaseParams,
+    get_rows: Callable[[Any], RowsPage[IndexedRow]],
+    page_size: int = 100,
+    min_time: Optional[int] = None,
+    min_idx: Optional[int] = None,
+    prefetch: bool = True,
+    to_limit: Callable[[int], Any] = lambda limit: limit,
+) -> Iterator[IndexedRow]:
+    """
+    Lazily iterates over the rows of an indexer query paginated by `submission_idx`, newest first.
+
+    Rows are timed by their own `timestamp` when set, otherwise by the tx of the same
+    response with the same `submission_idx`. Pages past the bounds are never fetched.
+
+    Args:
+        params (IndexerBaseParams): Query parameters. `submission_idx` and `max_time` set where
+        to start from, `limit` is overridden.
+
+        get_rows (Callable[[Any], RowsPage]): Queries the rows of a page and the txs of the same response,
+        given its parameters.
+
+        page_size (int): Number of rows to fetch per query. Defaults to 100.
+
+        min_time (int, optional): Stop at rows older than this timestamp, in seconds.
+
+        min_idx (int, optional): Stop at rows with a lower `submission_idx`.
+
+        prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        to_limit (Callable[[int], Any]): Converts a row count to the query's `limit`.
+
+    Returns:
+        Iterator[IndexedRow]: The rows within the bounds.
+
+    Raises:
+        ValueError: While iterating, if `min_time` is set and a row has neither a timestamp nor a tx.
+    """
+
+    def fetch_page(
+        idx: Optional[int],
+    ) -> tuple[list[tuple[IndexedRow, Optional[int]]], Optional[int]]:
+        limit = page_size
+        while True:
+            # one extra row is requested to find the next page's cursor
+            rows, txs = get_rows(
+                params.copy(update={"idx": idx, "limit": to_limit(limit + 1)})
+            )
+            page, cursor = split_submission_idx_page(rows, limit)
+            timestamps = tx_timestamps(txs)
+            timed_page = [(row, _row_timestamp(row, timestamps)) for row in page]
+            if cursor is not None:
+                next_row = rows[len(page)]
+                if _reached_bounds(
+                    next_row, _row_timestamp(next_row, timestamps), min_time, min_idx
+                ):
+                    # no need to fetch, let alone prefetch, pages past the bounds
+                    cursor = None
+            if page or cursor is None:
+                return timed_page, cursor
+            # a single submission spans the whole page
+            limit *= 2
+
+    pages = iter_pages(fetch_page, params.idx, prefetch)
+    try:
+        for timed_page in pages:
+            for row, timestamp in timed_page:
+                if _reached_bounds(row, timestamp, min_time, min_idx):
+                    return
+                yield row
+    finally:
+        # stops any pending prefetch as soon as the bounds are reached
+        pages.close()
+
+
+def _row_timestamp(
+    row: IndexerBaseModel, tx_timestamps: Optional[dict[int, int]] = None
+) -> Optional[int]:
+    if row.timestamp is not None:
+        return int(row.timestamp)
+    if tx_timestamps is None:
+        return None
+    return tx_timestamps.get(int(row.submission_idx))
+
+
+def _reached_bounds(
+    row: IndexerBaseModel,
+    timestamp: Optional[int],
+    min_time: Optional[int],
+    min_idx: Optional[int],
+) -> bool:
+    if min_idx is not None and int(row.submission_idx) < min_idx:
+        return True
+    if min_time is None:
+        return False
+    if timestamp is None:
+        raise ValueError(
+            f"Invalid min time provided: row {row.submission_idx} has no timestamp to compare it to"
+        )
+    return timestamp < min_time
+
+
+def iter_rows_until(
+    pages: Iterable[list[IndexedRow]],
+    min_time: Optional[int] = None,
+    min_idx: Optional[int] = None,
+) -> Iterator[IndexedRow]:
+    """
+    Flattens pages of rows, newest first, stopping at the first row older than the bounds.
+
+    Args:
+        pages (Iterable[list[IndexedRow]]): Pages of rows, newest first.
+
+        min_time (int, optional): Stop at rows with a timestamp lower than this, in seconds.
+
+        min_idx (int, optional): Stop at rows with a `submission_idx` lower than this.
+
+    Returns:
+        Iterator[IndexedRow]: The rows within the bounds.
+
+    Raises:
+        ValueError: While iterating, if `min_time` is set and a row has no timestamp.
+    """
+    try:
+        for rows in pages:
+            for row in rows:
+                if _reached_bounds(row, _row_timestamp(row), min_time, min_idx):
+                    return
+                yield row
+    finally:
+        # stops any pending prefetch as soon as the bounds are reached
+        close = getattr(pages, "close", None)
+        if close is not None:
+            close()
@@ -1,13 +1,43 @@
-from typing import Optional, Union
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional, Union
 import requests
 from functools import singledispatchmethod
+from operator import attrgetter
+from vertex_protocol.indexer_client.columnar import (
+    CandlestickColumns,
+    candlesticks_to_columns,
+    market_snapshots_to_columns,
+    matches_to_columns,
+    product_snapshots_to_columns,
+    trades_to_columns,
+)
+from vertex_protocol.indexer_client.pagination import (
+    iter_pages,
+    iter_rows_until,
+    iter_submission_idx_rows,
+)
+from vertex_protocol.indexer_client.streaming import iter_json_array
 from vertex_protocol.indexer_client.types import IndexerClientOpts
-from vertex_protocol.indexer_client.types.models import MarketType, VrtxTokenQueryType
+from vertex_protocol.indexer_client.types.models import (
+    IndexerCandlestick,
+    IndexerEvent,
+    IndexerHistoricalOrder,
+    IndexerMatch,
+    IndexerPayment,
+    IndexerProduct,
+    IndexerTradeInfo,
+    MarketType,
+    VrtxTokenQueryType,
+)
 from vertex_protocol.indexer_client.types.query import (
     IndexerCandlesticksParams,
     IndexerCandlesticksData,
     IndexerEventsParams,
     IndexerEventsData,
+    IndexerEventsRawLimit,
     IndexerFundingRateParams,
     IndexerFundingRateData,
     IndexerFundingRatesParams,
@@ -54,11 +84,16 @@ from vertex_protocol.indexer_client.types.query import (
     IndexerHistoricalTradesData,
     to_indexer_request,
 )
+from vertex_protocol.utils.expiration import OrderType, decode_expiration
 from vertex_protocol.utils.model import (
     VertexBaseModel,
     ensure_data_type,
     is_instance_of_union,
 )
+from vertex_protocol.utils.time import now_in_seconds
+
+# maximum number of historical orders cached by `resolve_historical_orders_by_digest`
+_HISTORICAL_ORDERS_CACHE_SIZE = 10_000
 
 
 class IndexerQueryClient:
@@ -81,6 +116,11 @@ class IndexerQueryClient:
         self.url = self._opts.url
         self.url_v2: str = self.url.replace("/v1", "") + "/v2"
         self.session = requests.Session()
+        # least recently resolved first
+        self._historical_orders_cache: OrderedDict[str, IndexerHistoricalOrder] = (
+            OrderedDict()
+        )
+        self._historical_orders_lock = threading.Lock()
 
     @singledispatchmethod
     def query(self, params: Union[IndexerParams, IndexerRequest]) -> IndexerResponse:
@@ -116,6 +156,29 @@ class IndexerQueryClient:
             raise Exception(res.text)
         return indexer_res
 
+    def _query_raw(self, params: IndexerParams) -> dict:
+        # skips response models, for the columnar queries
+        res = self.session.post(self.url, json=to_indexer_request(params).dict())
+        if res.status_code != 200:
+            raise Exception(res.text)
+        try:
+            return res.json()
+        except Exception:
+            raise Exception(res.text)
+
+    def _stream_query(
+        self, params: IndexerParams, key: str, chunk_size: int
+    ) -> Iterator[Any]:
+        res = self.session.post(
+            self.url, json=to_indexer_request(params).dict(), stream=True
+        )
+        try:
+            if res.status_code != 200:
+                raise Exception(res.text)
+            yield from iter_json_array(res.iter_content(chunk_size), key)
+        finally:
+            res.close()
+
     def _query_v2(self, url):
         res = self.session.get(url)
         if res.status_code != 200:
@@ -156,6 +219,80 @@ class IndexerQueryClient:
             IndexerHistoricalOrdersData,
         )
 
+    def resolve_historical_orders_by_digest(
+        self,
+        digests: list[str],
+        chunk_size: int = 100,
+        max_workers: int = 4,
+    ) -> dict[str, IndexerHistoricalOrder]:
+        """
+        Resolves a large number of digests to their historical orders.
+
+        Digests are deduplicated and split into chunks of `chunk_size`, fetched concurrently
+        with at most `max_workers` requests in flight. Orders that can't change anymore, i.e:
+        fully filled, immediate-or-cancel / fill-or-kill or expired, are cached by the client
+        and never fetched again. The cache keeps the most recently resolved orders, up to
+        `_HISTORICAL_ORDERS_CACHE_SIZE`. Open orders, and cancelled orders not expired yet,
+        are fetched on every call.
+
+        Args:
+            digests (list[str]): Order digests to resolve.
+
+            chunk_size (int): Number of digests per request. Defaults to 100.
+
+            max_workers (int): Maximum number of concurrent requests. Defaults to 4.
+
+        Returns:
+            dict[str, IndexerHistoricalOrder]: Historical orders by digest, as provided. Digests
+            unknown to the indexer are omitted.
+
+        Raises:
+            ValueError: If the chunk size or the number of workers isn't positive.
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"Invalid chunk size provided: {chunk_size}")
+        if max_workers <= 0:
+            raise ValueError(f"Invalid max workers provided: {max_workers}")
+        resolved: dict[str, IndexerHistoricalOrder] = {}
+        with self._historical_orders_lock:
+            for digest in map(str.lower, digests):
+                order = self._historical_orders_cache.get(digest)
+                if order is not None:
+                    self._historical_orders_cache.move_to_end(digest)
+                    resolved[digest] = order
+        missing = list(
+            dict.fromkeys(
+                digest for digest in map(str.lower, digests) if digest not in resolved
+            )
+        )
+        chunks = [
+            missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)
+        ]
+        if chunks:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(chunks))
+            ) as executor:
+                for data in executor.map(self.get_historical_orders_by_digest, chunks):
+                    resolved.update(
+                        (order.digest.lower(), order) for order in data.orders
+                    )
+                    with self._historical_orders_lock:
+                        for order in filter(is_terminal_order, data.orders):
+                            self._historical_orders_cache[order.digest.lower()] = order
+                            self._historical_orders_cache.move_to_end(
+                                order.digest.lower()
+                            )
+                        while (
+                            len(self._historical_orders_cache)
+                            > _HISTORICAL_ORDERS_CACHE_SIZE
+                        ):
+                            self._historical_orders_cache.popitem(last=False)
+        return {
+            digest: resolved[digest.lower()]
+            for digest in digests
+            if digest.lower() in resolved
+        }
+
     def get_matches(self, params: IndexerMatchesParams) -> IndexerMatchesData:
         """
         Retrieves match data based on provided parameters.
@@ -464,3 +601,569 @@ class IndexerQueryClient:
         return ensure_data_type(
             self._query_v2(f"{self.url_v2}/vrtx?q={str(query_type)}"), float
         )
+
+    def get_matches_columns(self, params: IndexerMatchesParams) -> dict[str, Any]:
+        """
+        Retrieves matches as columns, decoded straight from the response without building
+        per-row models. Better suited than `get_matches` to large pages.
+
+        Args:
+            params (IndexerMatchesParams): The parameters for the matches to be retrieved.
+
+        Returns:
+            dict[str, Any]: The matches' columns, including `product_id` and `is_taker`, see `matches_to_columns`.
+        """
+        data = self._query_raw(IndexerMatchesParams.parse_obj(params))
+        return matches_to_columns(data["matches"], data.get("txs") or [])
+
+    def get_candlesticks_columns(
+        self, params: IndexerCandlesticksParams
+    ) -> CandlestickColumns:
+        """
+        Retrieves candlesticks as columns, decoded straight from the response without
+        building per-row models. Better suited than `get_candlesticks` to large pages.
+
+        Args:
+            params (IndexerCandlesticksParams): The parameters for retrieving candlestick data.
+
+        Returns:
+            CandlestickColumns: The candlesticks, oldest first.
+        """
+        return candlesticks_to_columns(
+            self._query_raw(IndexerCandlesticksParams.parse_obj(params))["candlesticks"]
+        )
+
+    def get_product_snapshots_columns(
+        self, params: IndexerProductSnapshotsParams
+    ) -> dict[str, array]:
+        """
+        Retrieves product snapshots as columns, decoded straight from the response without
+        building per-row models. Better suited than `get_product_snapshots` to large pages.
+
+        Args:
+            params (IndexerProductSnapshotsParams): The parameters specifying the product snapshots.
+
+        Returns:
+            dict[str, array]: The snapshots' columns, see `product_snapshots_to_columns`.
+        """
+        data = self._query_raw(IndexerProductSnapshotsParams.parse_obj(params))
+        return product_snapshots_to_columns(data["products"], data.get("txs") or [])
+
+    def get_market_snapshots_columns(
+        self, params: IndexerMarketSnapshotsParams
+    ) -> dict[str, array]:
+        """
+        Retrieves market snapshots as columns, decoded straight from the response without
+        building per-row models. Better suited than `get_market_snapshots` to large pages.
+
+        Args:
+            params (IndexerMarketSnapshotsParams): Parameters specifying the historical market snapshot request.
+
+        Returns:
+            dict[str, array]: The snapshots' columns, see `market_snapshots_to_columns`.
+        """
+        return market_snapshots_to_columns(
+            self._query_raw(IndexerMarketSnapshotsParams.parse_obj(params))["snapshots"]
+        )
+
+    def stream_matches(
+        self, params: IndexerMatchesParams, chunk_size: int = 64 * 1024
+    ) -> Iterator[IndexerMatch]:
+        """
+        Streams matches, decoding them one at a time as the response body is read.
+
+        Unlike `get_matches`, the response is never fully buffered, so memory doesn't grow
+        with the page size. The page's `txs` are skipped.
+
+        Args:
+            params (IndexerMatchesParams): The parameters for the matches to be retrieved.
+
+            chunk_size (int): Number of bytes read from the response at a time. Defaults to 64KiB.
+
+        Returns:
+            Iterator[IndexerMatch]: The matches, in the response's order.
+        """
+        for match in self._stream_query(
+            IndexerMatchesParams.parse_obj(params), "matches", chunk_size
+        ):
+            yield IndexerMatch.parse_obj(match)
+
+    def stream_events(
+        self, params: IndexerEventsParams, chunk_size: int = 64 * 1024
+    ) -> Iterator[IndexerEvent]:
+        """
+        Streams events, decoding them one at a time as the response body is read.
+
+        Unlike `get_events`, the response is never fully buffered, so memory doesn't grow
+        with the page size. The page's `txs` are skipped.
+
+        Args:
+            params (IndexerEventsParams): The parameters for the events to be retrieved.
+
+            chunk_size (int): Number of bytes read from the response at a time. Defaults to 64KiB.
+
+        Returns:
+            Iterator[IndexerEvent]: The events, in the response's order.
+        """
+        for event in self._stream_query(
+            IndexerEventsParams.parse_obj(params), "events", chunk_size
+        ):
+            yield IndexerEvent.parse_obj(event)
+
+    def iter_subaccount_historical_orders(
+        self,
+        params: IndexerSubaccountHistoricalOrdersParams,
+        page_size: int = 100,
+        min_time: Optional[int] = None,
+        min_idx: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerHistoricalOrder]:
+        """
+        Lazily iterates over the historical orders of a subaccount, newest first.
+
+        See `iter_matches` for pagination details.
+
+        Args:
+            params (IndexerSubaccountHistoricalOrdersParams): Query parameters. `submission_idx` and `max_time` set where
+            to start from, `limit` is ignored.
+
+            page_size (int): Number of orders to fetch per query. Defaults to 100.
+
+            min_time (int, optional): Stop at orders older than this timestamp, in seconds. Orders come
+            without txs, so iterating raises a ValueError if an order has no `timestamp` of its own.
+
+            min_idx (int, optional): Stop at orders with a lower `submission_idx`.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerHistoricalOrder]: The historical orders.
+        """
+        return iter_submission_idx_rows(
+            IndexerSubaccountHistoricalOrdersParams.parse_obj(params),
+            lambda page_params: (
+                self.get_subaccount_historical_orders(page_params).orders,
+                [],
+            ),
+            page_size,
+            min_time,
+            min_idx,
+            prefetch,
+        )
+
+    def iter_matches(
+        self,
+        params: IndexerMatchesParams,
+        page_size: int = 100,
+        min_time: Optional[int] = None,
+        min_idx: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerMatch]:
+        """
+        Lazily iterates over matches, newest first.
+
+        Pages are fetched on demand by `submission_idx`, and the next page is fetched in the
+        background while the current one is consumed, so memory stays bounded to two pages
+        regardless of how many matches are walked.
+
+        Args:
+            params (IndexerMatchesParams): Query parameters. `submission_idx` and `max_time` set where
+            to start from, `limit` is ignored.
+
+            page_size (int): Number of matches to fetch per query. Defaults to 100.
+
+            min_time (int, optional): Stop at matches older than this timestamp, in seconds. Matches are
+            timed by their tx.
+
+            min_idx (int, optional): Stop at matches with a lower `submission_idx`.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerMatch]: The matches.
+        """
+        return iter_submission_idx_rows(
+            IndexerMatchesParams.parse_obj(params),
+            lambda page_params: attrgetter("matches", "txs")(
+                self.get_matches(page_params)
+            ),
+            page_size,
+            min_time,
+            min_idx,
+            prefetch,
+        )
+
+    def iter_events(
+        self,
+        params: IndexerEventsParams,
+        page_size: int = 100,
+        min_time: Optional[int] = None,
+        min_idx: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerEvent]:
+        """
+        Lazily iterates over events, newest first.
+
+        Pages are limited by raw event count. See `iter_matches` for pagination details.
+
+        Args:
+            params (IndexerEventsParams): Query parameters. `submission_idx` and `max_time` set where
+            to start from, `limit` is ignored.
+
+            page_size (int): Number of events to fetch per query. Defaults to 100.
+
+            min_time (int, optional): Stop at events older than this timestamp, in seconds. Events are
+            timed by their tx.
+
+            min_idx (int, optional): Stop at events with a lower `submission_idx`.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerEvent]: The events.
+        """
+        return iter_submission_idx_rows(
+            IndexerEventsParams.parse_obj(params),
+            lambda page_params: attrgetter("events", "txs")(
+                self.get_events(page_params)
+            ),
+            page_size,
+            min_time,
+            min_idx,
+            prefetch,
+            lambda limit: IndexerEventsRawLimit(raw=limit),
+        )
+
+    def iter_product_snapshots(
+        self,
+        params: IndexerProductSnapshotsParams,
+        page_size: int = 100,
+        min_time: Optional[int] = None,
+        min_idx: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerProduct]:
+        """
+        Lazily iterates over snapshots of a product, newest first.
+
+        See `iter_matches` for pagination details.
+
+        Args:
+            params (IndexerProductSnapshotsParams): Query parameters. `submission_idx` and `max_time` set where
+            to start from, `limit` is ignored.
+
+            page_size (int): Number of snapshots to fetch per query. Defaults to 100.
+
+            min_time (int, optional): Stop at snapshots older than this timestamp, in seconds. Snapshots are
+            timed by their tx.
+
+            min_idx (int, optional): Stop at snapshots with a lower `submission_idx`.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerProduct]: The product snapshots.
+        """
+        return iter_submission_idx_rows(
+            IndexerProductSnapshotsParams.parse_obj(params),
+            lambda page_params: attrgetter("products", "txs")(
+                self.get_product_snapshots(page_params)
+            ),
+            page_size,
+            min_time,
+            min_idx,
+            prefetch,
+        )
+
+    def iter_candlesticks(
+        self,
+        params: IndexerCandlesticksParams,
+        page_size: int = 500,
+        min_time: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerCandlestick]:
+        """
+        Lazily iterates over candlesticks, newest first.
+
+        Candlesticks are paged by `max_time`, as there is a single candlestick per timestamp.
+
+        Args:
+            params (IndexerCandlesticksParams): Query parameters. `max_time` sets where to start from,
+            `limit` is ignored.
+
+            page_size (int): Number of candlesticks to fetch per query. Defaults to 500.
+
+            min_time (int, optional): Stop at candlesticks older than this timestamp, in seconds.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerCandlestick]: The candlesticks.
+        """
+        params = IndexerCandlesticksParams.parse_obj(params)
+
+        def fetch_page(
+            max_time: Optional[int],
+        ) -> tuple[list[IndexerCandlestick], Optional[int]]:
+            candlesticks = self.get_candlesticks(
+                params.copy(update={"max_time": max_time, "limit": page_size})
+            ).candlesticks
+            if len(candlesticks) < page_size:
+                return candlesticks, None
+            return candlesticks, int(candlesticks[-1].timestamp or 0) - 1
+
+        return iter_rows_until(
+            iter_pages(fetch_page, params.max_time, prefetch), min_time=min_time
+        )
+
+    def iter_interest_and_funding_pages(
+        self,
+        params: IndexerInterestAndFundingParams,
+        min_time: Optional[int] = None,
+        min_idx: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerInterestAndFundingData]:
+        """
+        Lazily iterates over pages of interest and funding payments, newest first.
+
+        Pages are walked with `next_idx`, `params.limit` payments of each kind at a time. Interest
+        and funding payments are paged together, so pages are yielded rather than payments.
+
+        Args:
+            params (IndexerInterestAndFundingParams): Query parameters. `max_idx` sets where to start from.
+
+            min_time (int, optional): Stop at payments older than this timestamp, in seconds.
+
+            min_idx (int, optional): Stop at payments with a lower `idx`.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerInterestAndFundingData]: Pages of interest and funding payments, without
+            the payments past the bounds.
+        """
+        params = IndexerInterestAndFundingParams.parse_obj(params)
+
+        def fetch_page(
+            max_idx: Optional[Union[str, int]],
+        ) -> tuple[list[IndexerInterestAndFundingData], Optional[str]]:
+            page = self.get_interest_and_funding_payments(
+                params.copy(update={"max_idx": max_idx})
+            )
+            is_last_page = (
+                len(page.interest_payments) < params.limit
+                and len(page.funding_payments) < params.limit
+            ) or str(page.next_idx) == str(max_idx)
+            if min_time is not None or min_idx is not None:
+                interest_payments = _payments_within(
+                    page.interest_payments, min_time, min_idx
+                )
+                funding_payments = _payments_within(
+                    page.funding_payments, min_time, min_idx
+                )
+                is_last_page = is_last_page or len(interest_payments) + len(
+                    funding_payments
+                ) < len(page.interest_payments) + len(page.funding_payments)
+                page = page.copy(
+                    update={
+                        "interest_payments": interest_payments,
+                        "funding_payments": funding_payments,
+                    }
+                )
+            return [page], None if is_last_page else page.next_idx
+
+        for pages in iter_pages(fetch_page, params.max_idx, prefetch):
+            yield from pages
+
+    def iter_historical_trades(
+        self,
+        ticker_id: str,
+        page_size: int = 500,
+        max_trade_id: Optional[int] = None,
+        min_time: Optional[int] = None,
+        max_time: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[IndexerTradeInfo]:
+        """
+        Lazily iterates over a market's historical trades, newest first.
+
+        Trades are paged backwards by `max_trade_id`, and the next page is fetched in the
+        background while the current one is consumed.
+
+        Args:
+            ticker_id (str): Ticker of the market, e.g: `BTC-PERP_USDC`.
+
+            page_size (int): Number of trades to fetch per query. Defaults to 500.
+
+            max_trade_id (int, optional): ID of the newest trade to start from.
+
+            min_time (int, optional): Stop at trades older than this timestamp, in seconds.
+
+            max_time (int, optional): Skip trades newer than this timestamp, in seconds. Trades
+            can't be queried by time, so newer trades are still fetched.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            Iterator[IndexerTradeInfo]: The trades.
+        """
+        for trades in self._iter_historical_trade_pages(
+            ticker_id, page_size, max_trade_id, min_time, max_time, prefetch
+        ):
+            for trade in trades:
+                yield IndexerTradeInfo.parse_obj(trade)
+
+    def get_historical_trades_columns(
+        self,
+        ticker_id: str,
+        page_size: int = 500,
+        max_trade_id: Optional[int] = None,
+        min_time: Optional[int] = None,
+        max_time: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> dict[str, array]:
+        """
+        Downloads a market's trade tape as columns, decoded straight from the responses
+        without building per-row models.
+
+        Args:
+            ticker_id (str): Ticker of the market, e.g: `BTC-PERP_USDC`.
+
+            page_size (int): Number of trades to fetch per query. Defaults to 500.
+
+            max_trade_id (int, optional): ID of the newest trade to start from.
+
+            min_time (int, optional): Stop at trades older than this timestamp, in seconds.
+
+            max_time (int, optional): Skip trades newer than this timestamp, in seconds.
+
+            prefetch (bool): Whether to fetch the next page in the background. Defaults to True.
+
+        Returns:
+            dict[str, array]: The trades' columns, newest first, see `trades_to_columns`.
+        """
+        columns = trades_to_columns([])
+        for trades in self._iter_historical_trade_pages(
+            ticker_id, page_size, max_trade_id, min_time, max_time, prefetch
+        ):
+            for name, values in trades_to_columns(trades).items():
+                columns[name].extend(values)
+        return columns
+
+    def get_trade_tapes(
+        self,
+        ticker_ids: list[str],
+        page_size: int = 500,
+        min_time: Optional[int] = None,
+        max_time: Optional[int] = None,
+        max_workers: int = 4,
+    ) -> dict[str, dict[str, array]]:
+        """
+        Downloads the trade tapes of several markets concurrently, see `get_historical_trades_columns`.
+
+        Args:
+            ticker_ids (list[str]): Tickers of the markets.
+
+            page_size (int): Number of trades to fetch per query. Defaults to 500.
+
+            min_time (int, optional): Stop at trades older than this timestamp, in seconds.
+
+            max_time (int, optional): Skip trades newer than this timestamp, in seconds.
+
+            max_workers (int): Maximum number of markets downloaded concurrently. Defaults to 4.
+
+        Returns:
+            dict[str, dict[str, array]]: The trades' columns by ticker, newest first.
+
+        Raises:
+            ValueError: If the number of workers isn't positive.
+        """
+        if max_workers <= 0:
+            raise ValueError(f"Invalid max workers provided: {max_workers}")
+        if not ticker_ids:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(ticker_ids))
+        ) as executor:
+            futures = {
+                ticker_id: executor.submit(
+                    # markets are downloaded concurrently, so pages aren't prefetched
+                    self.get_historical_trades_columns,
+                    ticker_id,
+                    page_size,
+                    None,
+                    min_time,
+                    max_time,
+                    False,
+                )
+                for ticker_id in ticker_ids
+            }
+            return {ticker_id: future.result() for ticker_id, future in futures.items()}
+
+    def _iter_historical_trade_pages(
+        self,
+        ticker_id: str,
+        page_size: int,
+        max_trade_id: Optional[int],
+        min_time: Optional[int],
+        max_time: Optional[int],
+        prefetch: bool,
+    ) -> Iterator[list[dict]]:
+        def fetch_page(
+            max_trade_id: Optional[int],
+        ) -> tuple[list[dict], Optional[int]]:
+            # the v2 endpoint returns raw trades
+            trades: list[dict] = self.get_historical_trades(  # type: ignore
+                ticker_id, page_size, max_trade_id
+            )
+            if len(trades) < page_size or (
+                min_time is not None and int(trades[-1]["timestamp"]) < min_time
+            ):
+                return trades, None
+            # `max_trade_id` is inclusive
+            return trades, int(trades[-1]["trade_id"]) - 1
+
+        pages = iter_pages(fetch_page, max_trade_id, prefetch)
+        try:
+            for trades in pages:
+                if min_time is not None:
+                    trades = [
+                        trade for trade in trades if int(trade["timestamp"]) >= min_time
+                    ]
+                if max_time is not None:
+                    trades = [
+                        trade for trade in trades if int(trade["timestamp"]) <= max_time
+                    ]
+                yield trades
+        finally:
+            pages.close()
+
+
+def is_terminal_order(order: IndexerHistoricalOrder) -> bool:
+    """
+    Whether a historical order can't change anymore: fully filled, immediate-or-cancel /
+    fill-or-kill, or expired. Cancellations aren't reported, so cancelled orders are only
+    terminal once expired.
+
+    Args:
+        order (IndexerHistoricalOrder): The historical order.
+
+    Returns:
+        bool: Whether the order is terminal.
+    """
+    order_type, expiration = decode_expiration(int(order.expiration))
+    return (
+        order_type in (OrderType.IOC, OrderType.FOK)
+        or abs(int(order.base_filled)) >= abs(int(order.amount))
+        or expiration <= now_in_seconds()
+    )
+
+
+def _payments_within(
+    payments: list[IndexerPayment], min_time: Optional[int], min_idx: Optional[int]
+) -> list[IndexerPayment]:
+    return [
+        payment
+        for payment in payments
+        if (min_time is None or int(payment.timestamp) >= min_time)
+        and (min_idx is None or int(payment.idx) >= min_idx)
+    ]
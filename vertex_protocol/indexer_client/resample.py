@@ -0,0 +1,116 @@
+from array import array
+from itertools import groupby
+from typing import Optional, Sequence
+from vertex_protocol.indexer_client.columnar import CandlestickColumns
+from vertex_protocol.indexer_client.types.models import IndexerCandlestick
+
+
+def resample_candlesticks(
+    candlesticks: Sequence[IndexerCandlestick],
+    granularity: int,
+    offset: int = 0,
+) -> list[IndexerCandlestick]:
+    """
+    Aggregates candlesticks into a coarser granularity, e.g: 1m bars into 10m or 3h bars.
+
+    Bars are grouped by `(timestamp - offset) // granularity` and aggregated exactly on x18
+    values: first open, highest high, lowest low, last close and summed volume. Partial
+    buckets at the edges of the input are kept, like the indexer's current bar.
+
+    Args:
+        candlesticks (Sequence[IndexerCandlestick]): Fine-grained candlesticks, either oldest or newest first.
+
+        granularity (int): Target granularity, in seconds. Must be a multiple of the candlesticks' granularity.
+
+        offset (int): Alignment of the buckets, in seconds. Defaults to 0, aligning buckets on UTC epoch multiples.
+
+    Returns:
+        list[IndexerCandlestick]: The resampled candlesticks, in the same order as the input.
+
+    Raises:
+        ValueError: If the granularity isn't a multiple of the candlesticks' granularity.
+    """
+    if not candlesticks:
+        return []
+    _validate_granularity(candlesticks[0].granularity, granularity)
+    newest_first = len(candlesticks) > 1 and int(candlesticks[0].timestamp or 0) > int(
+        candlesticks[-1].timestamp or 0
+    )
+    bars = reversed(candlesticks) if newest_first else candlesticks
+    resampled = []
+    for bucket, group in groupby(
+        bars, key=lambda bar: (int(bar.timestamp or 0) - offset) // granularity
+    ):
+        group_bars = list(group)
+        first, last = group_bars[0], group_bars[-1]
+        resampled.append(
+            IndexerCandlestick(
+                submission_idx=last.submission_idx,
+                timestamp=str(bucket * granularity + offset),
+                product_id=first.product_id,
+                granularity=granularity,
+                open_x18=first.open_x18,
+                high_x18=str(max(int(bar.high_x18) for bar in group_bars)),
+                low_x18=str(min(int(bar.low_x18) for bar in group_bars)),
+                close_x18=last.close_x18,
+                volume=str(sum(int(bar.volume) for bar in group_bars)),
+            )
+        )
+    return resampled[::-1] if newest_first else resampled
+
+
+def resample_columns(
+    columns: CandlestickColumns,
+    granularity: int,
+    offset: int = 0,
+    source_granularity: Optional[int] = None,
+) -> CandlestickColumns:
+    """
+    Aggregates columnar candlesticks, oldest first, into a coarser granularity.
+
+    Same as `resample_candlesticks`, on the float columns returned by
+    `CandlestickStore.get_columns`.
+
+    Args:
+        columns (CandlestickColumns): Fine-grained candlesticks, oldest first.
+
+        granularity (int): Target granularity, in seconds.
+
+        offset (int): Alignment of the buckets, in seconds. Defaults to 0.
+
+        source_granularity (int, optional): Granularity of the columns, validated against `granularity` when provided.
+
+    Returns:
+        CandlestickColumns: The resampled candlesticks, oldest first.
+
+    Raises:
+        ValueError: If the granularity isn't a multiple of `source_granularity`.
+    """
+    if source_granularity is not None:
+        _validate_granularity(source_granularity, granularity)
+    resampled = CandlestickColumns(
+        array("q"), array("d"), array("d"), array("d"), array("d"), array("d")
+    )
+    timestamps = columns.timestamps
+    n = len(timestamps)
+    start = 0
+    while start < n:
+        bucket = (timestamps[start] - offset) // granularity
+        end = start + 1
+        while end < n and (timestamps[end] - offset) // granularity == bucket:
+            end += 1
+        resampled.timestamps.append(bucket * granularity + offset)
+        resampled.open.append(columns.open[start])
+        resampled.high.append(max(columns.high[start:end]))
+        resampled.low.append(min(columns.low[start:end]))
+        resampled.close.append(columns.close[end - 1])
+        resampled.volume.append(sum(columns.volume[start:end]))
+        start = end
+    return resampled
+
+
+def _validate_granularity(source_granularity: int, granularity: int):
+    if granularity <= 0 or granularity % source_granularity != 0:
+        raise ValueError(
+            f"Invalid granularity provided: {granularity} is not a multiple of {source_granularity}"
+        )
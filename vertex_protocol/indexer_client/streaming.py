@@ -0,0 +1,130 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _JSONStream:
+    """
+    Incrementally decodes JSON text from chunks of UTF-8 bytes, keeping only the
+    undecoded remainder in memory.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # drops the consumed prefix so the buffer doesn't grow with the payload
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer):
+                char = self._buffer[self._pos]
+                if char not in _WHITESPACE:
+                    return char
+                self._pos += 1
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(
+                f"Invalid JSON stream: expected {char!r}, got {self.peek()!r}"
+            )
+        self._pos += 1
+
+    def decode_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number is only complete once followed by a delimiter, e.g: `1.` then `5`
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and not self._eof
+                and self._buffer[end:].strip(_NUMBER_CHARS) == ""
+            ):
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            self.expect(",")
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Incrementally decodes the elements of an array in a JSON object, e.g: the `matches` of
+    a matches response, from the chunks of its UTF-8 body.
+
+    Elements are decoded one at a time as the chunks are read, so memory is bound by the
+    size of an element and a chunk rather than by the size of the payload. Other arrays
+    of the object are skipped element by element.
+
+    Args:
+        chunks (Iterable[bytes]): Chunks of the body, e.g: `response.iter_content(chunk_size)`.
+
+        key (str): Key of the array in the top-level object.
+
+    Returns:
+        Iterator[Any]: The decoded elements of the array. Empty if the key is missing or null.
+
+    Raises:
+        ValueError: If the body isn't a valid JSON object.
+    """
+    stream = _JSONStream(chunks)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        field = stream.decode_value()
+        stream.expect(":")
+        is_array = stream.peek() == "["
+        if field == key:
+            if is_array:
+                yield from stream.iter_array()
+            else:
+                stream.decode_value()
+            return
+        if is_array:
+            for _ in stream.iter_array():
+                pass
+        else:
+            stream.decode_value()
+        if stream.peek() == "}":
+            return
+        stream.expect(",")
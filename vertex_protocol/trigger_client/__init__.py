@@ -1,6 +1,7 @@
 from vertex_protocol.trigger_client.types import TriggerClientOpts
 from vertex_protocol.trigger_client.execute import TriggerExecuteClient
 from vertex_protocol.trigger_client.query import TriggerQueryClient
+from vertex_protocol.trigger_client.index import TriggerOrderIndex
 
 
 class TriggerClient(TriggerQueryClient, TriggerExecuteClient):  # type: ignore
@@ -14,4 +15,5 @@ __all__ = [
     "TriggerClientOpts",
     "TriggerExecuteClient",
     "TriggerQueryClient",
+    "TriggerOrderIndex",
 ]
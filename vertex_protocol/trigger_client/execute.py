@@ -1,6 +1,6 @@
 import requests
 from functools import singledispatchmethod
-from typing import Union
+from typing import Optional, Union
 from vertex_protocol.contracts.types import VertexExecuteType
 from vertex_protocol.trigger_client.types.execute import (
     TriggerExecuteParams,
@@ -18,6 +18,7 @@ from vertex_protocol.utils.exceptions import (
 )
 from vertex_protocol.utils.execute import VertexBaseExecute
 from vertex_protocol.utils.model import VertexBaseModel, is_instance_of_union
+from vertex_protocol.utils.order_validation import OrderValidator
 
 
 class TriggerExecuteClient(VertexBaseExecute):
@@ -26,6 +27,8 @@ class TriggerExecuteClient(VertexBaseExecute):
         self._opts: TriggerClientOpts = TriggerClientOpts.parse_obj(opts)
         self.url: str = self._opts.url
         self.session = requests.Session()
+        # validates orders locally before signing them, e.g: the engine client's validator
+        self.order_validator: Optional[OrderValidator] = None
 
     def tx_nonce(self, _: str) -> int:
         raise NotImplementedError
@@ -90,6 +93,12 @@ class TriggerExecuteClient(VertexBaseExecute):
     def place_trigger_order(self, params: PlaceTriggerOrderParams) -> ExecuteResponse:
         params = PlaceTriggerOrderParams.parse_obj(params)
         params.order = self.prepare_execute_params(params.order, True, True)
+        if self.order_validator is not None:
+            params.order = self.order_validator.validate(
+                params.product_id,
+                params.order,
+                auto_round=None if params.signature is None else False,
+            )
         params.signature = params.signature or self._sign(
             VertexExecuteType.PLACE_ORDER, params.order.dict(), params.product_id
         )
@@ -0,0 +1,113 @@
+from typing import Iterable, Optional
+from vertex_protocol.trigger_client.types.query import TriggerOrder
+
+
+class TriggerOrderIndex:
+    """
+    Local index of trigger orders by digest, product and status.
+
+    Built from `TriggerQueryClient.iter_trigger_orders`, it answers reconciliation lookups
+    without querying the trigger service again.
+    """
+
+    def __init__(self, orders: Iterable[TriggerOrder] = ()):
+        """
+        Initializes the index.
+
+        Args:
+            orders (Iterable[TriggerOrder]): Orders to index. Defaults to none.
+        """
+        self._by_digest: dict[str, TriggerOrder] = {}
+        self._by_product: dict[int, dict[str, TriggerOrder]] = {}
+        self._by_status: dict[str, dict[str, TriggerOrder]] = {}
+        self.update(orders)
+
+    def __len__(self) -> int:
+        return len(self._by_digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest.lower() in self._by_digest
+
+    @property
+    def product_ids(self) -> list[int]:
+        """
+        IDs of the products with indexed orders, in ascending order.
+        """
+        return sorted(self._by_product.keys())
+
+    @property
+    def statuses(self) -> list[str]:
+        """
+        Statuses of the indexed orders, in ascending order.
+        """
+        return sorted(self._by_status.keys())
+
+    def update(self, orders: Iterable[TriggerOrder]):
+        """
+        Adds orders to the index, replacing older versions of the same orders.
+
+        Args:
+            orders (Iterable[TriggerOrder]): Orders to index. Orders without a digest are skipped.
+        """
+        for order in orders:
+            if order.order.digest is None:
+                continue
+            digest = order.order.digest.lower()
+            previous = self._by_digest.get(digest)
+            if previous is not None:
+                if previous.updated_at > order.updated_at:
+                    continue
+                self._remove(digest, previous)
+            self._by_digest[digest] = order
+            self._by_product.setdefault(order.order.product_id, {})[digest] = order
+            self._by_status.setdefault(order.status, {})[digest] = order
+
+    def get(self, digest: str) -> Optional[TriggerOrder]:
+        """
+        Retrieves an order by digest.
+
+        Args:
+            digest (str): Digest of the order.
+
+        Returns:
+            Optional[TriggerOrder]: The order, None if it isn't indexed.
+        """
+        return self._by_digest.get(digest.lower())
+
+    def find(
+        self, product_id: Optional[int] = None, status: Optional[str] = None
+    ) -> list[TriggerOrder]:
+        """
+        Retrieves the orders of a product and/or with a status.
+
+        Args:
+            product_id (int, optional): ID of the product. Defaults to all products.
+
+            status (str, optional): Status of the orders, e.g: `pending`. Defaults to all statuses.
+
+        Returns:
+            list[TriggerOrder]: The matching orders, most recently updated first.
+        """
+        if product_id is not None:
+            orders = self._by_product.get(product_id, {})
+            if status is not None:
+                orders = {
+                    digest: order
+                    for digest, order in orders.items()
+                    if order.status == status
+                }
+        elif status is not None:
+            orders = self._by_status.get(status, {})
+        else:
+            orders = self._by_digest
+        return sorted(orders.values(), key=lambda order: -order.updated_at)
+
+    def _remove(self, digest: str, order: TriggerOrder):
+        product_orders = self._by_product[order.order.product_id]
+        del product_orders[digest]
+        if not product_orders:
+            del self._by_product[order.order.product_id]
+        status_orders = self._by_status[order.status]
+        del status_orders[digest]
+        if not status_orders:
+            del self._by_status[order.status]
@@ -1,9 +1,12 @@
+from typing import Iterator
 import requests
 from vertex_protocol.contracts.types import VertexTxType
+from vertex_protocol.trigger_client.index import TriggerOrderIndex
 from vertex_protocol.trigger_client.types import TriggerClientOpts
 from vertex_protocol.trigger_client.types.query import (
     ListTriggerOrdersParams,
     ListTriggerOrdersRequest,
+    TriggerOrder,
     TriggerQueryResponse,
 )
 from vertex_protocol.utils.exceptions import (
@@ -11,6 +14,8 @@ from vertex_protocol.utils.exceptions import (
     QueryFailedException,
 )
 from vertex_protocol.utils.execute import VertexBaseExecute
+from vertex_protocol.utils.nonce import RECV_TIME_MARGIN_MS
+from vertex_protocol.utils.time import now_in_millis
 
 
 class TriggerQueryClient(VertexBaseExecute):
@@ -59,3 +64,77 @@ class TriggerQueryClient(VertexBaseExecute):
             VertexTxType.LIST_TRIGGER_ORDERS, params.tx.dict()
         )
         return self.query(ListTriggerOrdersRequest.parse_obj(params).dict())
+
+    def iter_trigger_orders(
+        self,
+        params: ListTriggerOrdersParams,
+        page_size: int = 100,
+        recv_time_padding: int = 90,
+    ) -> Iterator[TriggerOrder]:
+        """
+        Lazily iterates over all pending or historical trigger orders, most recently updated first.
+
+        Pages are walked with `max_update_time` and `max_digest`. The signature of the
+        `ListTriggerOrdersTx` doesn't cover paging, so it is signed once and reused across
+        pages, and only signed again with a later `recvTime` when it is about to expire.
+
+        Args:
+            params (ListTriggerOrdersParams): Query parameters. `max_update_time` and `max_digest`
+            set where to start from, `limit` is ignored.
+
+            page_size (int): Number of orders to fetch per query. Defaults to 100.
+
+            recv_time_padding (int): Validity of re-signed txs, in seconds. Defaults to 90.
+
+        Returns:
+            Iterator[TriggerOrder]: The trigger orders.
+        """
+        params = ListTriggerOrdersParams.parse_obj(params)
+        params.limit = page_size
+        params.signature = params.signature or self._sign(
+            VertexTxType.LIST_TRIGGER_ORDERS, params.tx.dict()
+        )
+        # orders at the page boundary may be returned again by the next page
+        seen: set[str] = set()
+        while True:
+            if params.tx.recvTime - now_in_millis() < RECV_TIME_MARGIN_MS:
+                params.tx.recvTime = now_in_millis(recv_time_padding)
+                params.signature = self._sign(
+                    VertexTxType.LIST_TRIGGER_ORDERS, params.tx.dict()
+                )
+            # requests are serialized in place, so each page gets its own copy
+            data = self.list_trigger_orders(params.copy(deep=True)).data
+            orders = data.orders if data is not None else []
+            new_orders = [
+                order
+                for order in orders
+                if order.order.digest is None or order.order.digest not in seen
+            ]
+            yield from new_orders
+            if len(orders) < page_size or not new_orders:
+                return
+            last = orders[-1]
+            params.max_update_time = str(last.updated_at)
+            params.max_digest = last.order.digest
+            seen = {
+                order.order.digest
+                for order in orders
+                if order.order.digest is not None
+                and order.updated_at == last.updated_at
+            }
+
+    def index_trigger_orders(
+        self, params: ListTriggerOrdersParams, page_size: int = 100
+    ) -> TriggerOrderIndex:
+        """
+        Pages through trigger orders and indexes them by digest, product and status.
+
+        Args:
+            params (ListTriggerOrdersParams): Query parameters, see `iter_trigger_orders`.
+
+            page_size (int): Number of orders to fetch per query. Defaults to 100.
+
+        Returns:
+            TriggerOrderIndex: The indexed orders.
+        """
+        return TriggerOrderIndex(self.iter_trigger_orders(params, page_size))
@@ -0,0 +1,141 @@
+from array import array
+from itertools import repeat
+from operator import attrgetter, truediv
+from typing import Any, Iterable, Sequence, Union
+from vertex_protocol.utils.fixed import X18
+
+X18Value = Union[str, int]
+
+
+def x18_to_float_array(values: Iterable[X18Value]) -> array:
+    """
+    Converts a column of x18 fixed point values to a float64 array in a single pass.
+
+    Each value is parsed to an exact integer and divided by 1e18 with correctly rounded
+    true division, so every element is the float closest to the exact value. Float64 only
+    carries ~15-16 significant digits though (e.g: `1234567.123456789123456789` becomes
+    `1234567.1234567892`), so the result should not be converted back to x18 when exact
+    values matter, see `x18_to_split_arrays` instead.
+
+    The returned `array('d')` supports the buffer protocol, so it can be wrapped without
+    copying by e.g: `numpy.frombuffer(column)` or `memoryview(column)`.
+
+    Args:
+        values (Iterable[str | int]): x18 values, e.g: `oracle_price_x18` or `amount` strings.
+
+    Returns:
+        array: An `array('d')` of the converted values.
+    """
+    return array("d", map(truediv, map(int, values), repeat(X18)))
+
+
+def x18_to_split_arrays(values: Iterable[X18Value]) -> tuple[array, array]:
+    """
+    Converts a column of x18 fixed point values to exact int64 `(hi, lo)` arrays.
+
+    Each value `x` is split into `hi = x // 1e18` (whole units, floored) and `lo = x % 1e18`
+    (fractional part, always in `[0, 1e18)`), so that `x == hi * 1e18 + lo` exactly.
+    Use `split_arrays_to_x18` to rebuild the original values.
+
+    Args:
+        values (Iterable[str | int]): x18 values, e.g: `amount` or `v_quote_balance` strings.
+
+    Returns:
+        tuple[array, array]: `array('q')` columns of whole units and fractional parts.
+
+    Raises:
+        OverflowError: If a value's whole part does not fit in an int64 (|x| >= ~9.2e36).
+    """
+    hi, lo = array("q"), array("q")
+    for x in map(int, values):
+        whole, frac = divmod(x, X18)
+        hi.append(whole)
+        lo.append(frac)
+    return hi, lo
+
+
+def split_arrays_to_x18(hi: Sequence[int], lo: Sequence[int]) -> list[int]:
+    """
+    Rebuilds exact x18 integers from the `(hi, lo)` columns of `x18_to_split_arrays`.
+
+    Args:
+        hi (Sequence[int]): Whole units of each value.
+
+        lo (Sequence[int]): Fractional part of each value, in x18.
+
+    Returns:
+        list[int]: The x18 values.
+
+    Raises:
+        ValueError: If `hi` and `lo` have different lengths.
+    """
+    if len(hi) != len(lo):
+        raise ValueError(f"Mismatched columns: {len(hi)} hi and {len(lo)} lo values.")
+    return [whole * X18 + frac for whole, frac in zip(hi, lo)]
+
+
+def x18_column(rows: Iterable[Any], field: str) -> array:
+    """
+    Extracts an x18 field from a list of models as a float64 array.
+
+    Works directly on query results, e.g: `x18_column(matches, "base_filled")`,
+    `x18_column(candlesticks, "close_x18")` or `x18_column(perp_balances, "balance.amount")`.
+    See `x18_to_float_array` for precision details.
+
+    Args:
+        rows (Iterable[Any]): Models to extract the field from.
+
+        field (str): Name of the field. Nested fields can be accessed with dots.
+
+    Returns:
+        array: An `array('d')` of the converted values.
+    """
+    return x18_to_float_array(map(attrgetter(field), rows))
+
+
+def x18_split_column(rows: Iterable[Any], field: str) -> tuple[array, array]:
+    """
+    Extracts an x18 field from a list of models as exact int64 `(hi, lo)` arrays.
+
+    See `x18_to_split_arrays` for details on the split.
+
+    Args:
+        rows (Iterable[Any]): Models to extract the field from.
+
+        field (str): Name of the field. Nested fields can be accessed with dots.
+
+    Returns:
+        tuple[array, array]: `array('q')` columns of whole units and fractional parts.
+    """
+    return x18_to_split_arrays(map(attrgetter(field), rows))
+
+
+def int_column(rows: Iterable[Any], field: str) -> array:
+    """
+    Extracts an integer field from a list of models as an int64 array,
+    e.g: `product_id`, `timestamp` or `submission_idx`.
+
+    Args:
+        rows (Iterable[Any]): Models to extract the field from.
+
+        field (str): Name of the field. Nested fields can be accessed with dots.
+
+    Returns:
+        array: An `array('q')` of the values.
+    """
+    return array("q", map(int, map(attrgetter(field), rows)))
+
+
+def x18_columns(rows: Sequence[Any], *fields: str) -> dict[str, array]:
+    """
+    Extracts several x18 fields from a list of models as float64 arrays.
+
+    Args:
+        rows (Sequence[Any]): Models to extract the fields from, e.g: `IndexerCandlestick` rows.
+
+        *fields (str): Names of the fields. Nested fields can be accessed with dots.
+
+    Returns:
+        dict[str, array]: An `array('d')` per field.
+    """
+    return {field: x18_column(rows, field) for field in fields}
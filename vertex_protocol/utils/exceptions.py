@@ -56,3 +56,19 @@ class MissingTriggerClient(Exception):
     ):
         self.message = message
         super().__init__(self.message)
+
+
+class InvalidOrderException(Exception):
+    """Raised when an order fails local validation before being signed."""
+
+    def __init__(self, message="Invalid order provided"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InsufficientLiquidityException(Exception):
+    """Raised when the book can't fill a market order within its slippage bound."""
+
+    def __init__(self, message="Insufficient liquidity to fill order"):
+        self.message = message
+        super().__init__(self.message)
@@ -38,8 +38,8 @@ def decode_expiration(expiration: int) -> tuple[OrderType, int]:
         expiration (int): The encoded expiration timestamp.
 
     Returns:
-        Tuple[OrderType, int]: The decoded order type and the original expiration timestamp.
+        Tuple[OrderType, int]: The decoded order type and the original expiration timestamp, without the reduce-only flag.
     """
     order_type: OrderType = OrderType(expiration >> 62)
-    exp_timestamp = expiration & ((1 << 62) - 1)
+    exp_timestamp = expiration & ((1 << 61) - 1)
     return order_type, exp_timestamp
@@ -0,0 +1,115 @@
+from typing import Union
+
+X18 = 10**18
+
+
+def mul(x: int, y: int) -> int:
+    """
+    Multiplies two x18 fixed point integers, truncating toward zero like the engine.
+
+    Equivalent to `mul_x18` for integer inputs, without allocating `Decimal` objects.
+
+    Args:
+        x (int): x18 fixed point value.
+
+        y (int): x18 fixed point value.
+
+    Returns:
+        int: The x18 fixed point product.
+    """
+    product = x * y
+    if product >= 0:
+        return product // X18
+    return -(-product // X18)
+
+
+def div(x: int, y: int) -> int:
+    """
+    Divides two x18 fixed point integers, truncating toward zero like the engine.
+
+    Args:
+        x (int): x18 fixed point dividend.
+
+        y (int): x18 fixed point divisor.
+
+    Returns:
+        int: The x18 fixed point quotient.
+
+    Raises:
+        ZeroDivisionError: If `y` is zero.
+    """
+    numerator = x * X18
+    if (numerator >= 0) == (y > 0):
+        return numerator // y
+    return -(-numerator // y)
+
+
+def floor_to_increment(x: int, increment: int) -> int:
+    """
+    Rounds an x18 value down to a multiple of `increment`.
+
+    Equivalent to `round_x18` for integer inputs.
+
+    Args:
+        x (int): x18 fixed point value.
+
+        increment (int): The increment to round to, e.g: `price_increment_x18` or `size_increment`.
+
+    Returns:
+        int: The rounded value.
+    """
+    return x - x % increment
+
+
+def round_to_increment(x: int, increment: int) -> int:
+    """
+    Rounds an x18 value to the nearest multiple of `increment`, with ties rounding away from zero.
+
+    Args:
+        x (int): x18 fixed point value.
+
+        increment (int): The increment to round to, e.g: `price_increment_x18` or `size_increment`.
+
+    Returns:
+        int: The rounded value.
+    """
+    rounded = (2 * abs(x) + increment) // (2 * increment) * increment
+    return rounded if x >= 0 else -rounded
+
+
+def from_float(x: Union[float, int]) -> int:
+    """
+    Converts a float to x18 fixed point from its exact binary value, truncating toward zero.
+
+    Unlike `to_x18`, this does not go through `str()` and `Decimal`. `to_x18` converts the
+    shortest decimal representation of `x` instead, so results can differ in the last
+    digits when `x` is not exactly representable in binary (e.g: `0.3`), by less than
+    `math.ulp(x) * 1e18`.
+
+    Args:
+        x (float | int): Value to convert.
+
+    Returns:
+        int: Fixed point value represented as an integer.
+    """
+    if type(x) is int:
+        return x * X18
+    n, d = x.as_integer_ratio()
+    if n >= 0:
+        return n * X18 // d
+    return -(-n * X18 // d)
+
+
+def to_float(x: int) -> float:
+    """
+    Converts an x18 fixed point integer to a float.
+
+    Uses correctly rounded integer true division, so results are at least as precise as `from_x18`.
+
+    Args:
+        x (int): x18 fixed point value.
+
+    Returns:
+        float: The converted value.
+    """
+    return x / X18
@@ -0,0 +1,605 @@
+from enum import IntEnum
+from math import isqrt
+from typing import Callable, Iterable, Optional, Sequence, Union
+from vertex_protocol.engine_client.types.models import (
+    MaxOrderSizeDirection,
+    PerpProduct,
+    PerpProductBalance,
+    ProductRisk,
+    SpotProduct,
+    SpotProductBalance,
+)
+from vertex_protocol.engine_client.types.query import (
+    AllProductsData,
+    SubaccountInfoData,
+)
+from vertex_protocol.utils import fixed
+
+QUOTE_PRODUCT_ID = 0
+
+# (product_id, amount_delta, v_quote_delta), with the same semantics as `ApplyDelta`:
+# for spot products `v_quote_delta` is applied to the quote product.
+HealthDelta = tuple[int, int, int]
+
+# bounds of the large position penalty: 1.1 / (1 + p * sqrt(x)) and 0.9 * (1 + p * sqrt(x))
+_LONG_WEIGHT_CAP_X18 = 11 * 10**17
+_SHORT_WEIGHT_FLOOR_X18 = 9 * 10**17
+
+# engine balances are int128
+_MAX_AMOUNT_X18 = 2**127 - 1
+
+
+class HealthType(IntEnum):
+    """
+    Health types, in the same order as `SubaccountInfoData.healths`.
+    """
+
+    INITIAL = 0
+    MAINTENANCE = 1
+    UNWEIGHTED = 2
+
+
+def calc_risk_weight_x18(
+    risk: ProductRisk, amount: int, health_type: HealthType
+) -> int:
+    """
+    Computes the risk weight the engine applies to a position of a given size.
+
+    Positions above the product's large position threshold get a penalized weight of
+    `1.1 / (1 + penalty * sqrt(amount))` for longs and `0.9 * (1 + penalty * sqrt(amount))` for shorts.
+
+    Args:
+        risk (ProductRisk): Risk parameters of the product.
+
+        amount (int): Size of the position, in x18.
+
+        health_type (HealthType): The health type to compute the weight for.
+
+    Returns:
+        int: The x18 weight. Always 1e18 for `HealthType.UNWEIGHTED`.
+    """
+    return _RiskWeights(risk).weight(amount, health_type)
+
+
+class _RiskWeights:
+    __slots__ = ("weights", "penalty")
+
+    def __init__(self, risk: ProductRisk):
+        # indexed by (health_type, is_short)
+        self.weights = (
+            (int(risk.long_weight_initial_x18), int(risk.short_weight_initial_x18)),
+            (
+                int(risk.long_weight_maintenance_x18),
+                int(risk.short_weight_maintenance_x18),
+            ),
+        )
+        self.penalty = int(risk.large_position_penalty_x18)
+
+    def weight(self, amount: int, health_type: int) -> int:
+        if health_type == HealthType.UNWEIGHTED:
+            return fixed.X18
+        weight = self.weights[health_type][amount < 0]
+        if self.penalty <= 0 or amount == 0:
+            return weight
+        if amount > 0:
+            threshold_sqrt = fixed.div(
+                fixed.div(_LONG_WEIGHT_CAP_X18, weight) - fixed.X18, self.penalty
+            )
+            if amount > fixed.mul(threshold_sqrt, threshold_sqrt):
+                return fixed.div(
+                    _LONG_WEIGHT_CAP_X18,
+                    fixed.X18 + fixed.mul(self.penalty, isqrt(amount * fixed.X18)),
+                )
+        else:
+            threshold_sqrt = fixed.div(
+                fixed.div(weight, _SHORT_WEIGHT_FLOOR_X18) - fixed.X18, self.penalty
+            )
+            if -amount > fixed.mul(threshold_sqrt, threshold_sqrt):
+                return fixed.mul(
+                    _SHORT_WEIGHT_FLOOR_X18,
+                    fixed.X18 + fixed.mul(self.penalty, isqrt(-amount * fixed.X18)),
+                )
+        return weight
+
+
+class _Position:
+    __slots__ = ("is_spot", "amount", "v_quote", "price", "risk", "contributions")
+
+    def __init__(
+        self, is_spot: bool, amount: int, v_quote: int, price: int, risk: _RiskWeights
+    ):
+        self.is_spot = is_spot
+        self.amount = amount
+        self.v_quote = v_quote
+        self.price = price
+        self.risk = risk
+        self.contributions = tuple(
+            self.contribution(amount, v_quote, health_type)
+            for health_type in HealthType
+        )
+
+    def contribution(self, amount: int, v_quote: int, health_type: int) -> int:
+        weight = self.risk.weight(amount, health_type)
+        return fixed.mul(fixed.mul(amount, self.price), weight) + v_quote
+
+
+class SubaccountHealthCalculator:
+    """
+    Computes subaccount healths locally from balances, risk weights and oracle prices,
+    so what-if scenarios can be evaluated without querying the engine.
+
+    Spot balances accrue interest up to the products' cumulative multipliers and perp balances
+    are settled against the products' cumulative funding, as the engine does. LP balances and
+    the health benefit of spot / perp spreads are not taken into account, so health is
+    conservative for subaccounts holding LP positions or hedged spreads.
+    """
+
+    def __init__(
+        self,
+        spot_balances: Iterable[SpotProductBalance],
+        perp_balances: Iterable[PerpProductBalance],
+        spot_products: Iterable[SpotProduct],
+        perp_products: Iterable[PerpProduct],
+    ):
+        spot_amounts = {
+            balance.product_id: balance.balance for balance in spot_balances
+        }
+        perp_amounts = {
+            balance.product_id: balance.balance for balance in perp_balances
+        }
+        self._positions: dict[int, _Position] = {}
+        for spot_product in spot_products:
+            amount = 0
+            spot_balance = spot_amounts.get(spot_product.product_id)
+            if spot_balance is not None:
+                amount = int(spot_balance.amount)
+                last_multiplier = int(spot_balance.last_cumulative_multiplier_x18)
+                multiplier = int(
+                    spot_product.state.cumulative_deposits_multiplier_x18
+                    if amount > 0
+                    else spot_product.state.cumulative_borrows_multiplier_x18
+                )
+                if last_multiplier != 0 and last_multiplier != multiplier:
+                    amount = fixed.div(fixed.mul(amount, multiplier), last_multiplier)
+            self._positions[spot_product.product_id] = _Position(
+                True,
+                amount,
+                0,
+                int(spot_product.oracle_price_x18),
+                _RiskWeights(spot_product.risk),
+            )
+        for perp_product in perp_products:
+            amount, v_quote = 0, 0
+            perp_balance = perp_amounts.get(perp_product.product_id)
+            if perp_balance is not None:
+                amount = int(perp_balance.amount)
+                v_quote = int(perp_balance.v_quote_balance)
+                cumulative_funding = int(
+                    perp_product.state.cumulative_funding_long_x18
+                    if amount > 0
+                    else perp_product.state.cumulative_funding_short_x18
+                )
+                v_quote -= fixed.mul(
+                    amount,
+                    cumulative_funding - int(perp_balance.last_cumulative_funding_x18),
+                )
+            self._positions[perp_product.product_id] = _Position(
+                False,
+                amount,
+                v_quote,
+                int(perp_product.oracle_price_x18),
+                _RiskWeights(perp_product.risk),
+            )
+        self._healths = [
+            sum(
+                position.contributions[health_type]
+                for position in self._positions.values()
+            )
+            for health_type in HealthType
+        ]
+
+    @classmethod
+    def from_subaccount_info(
+        cls, info: SubaccountInfoData
+    ) -> "SubaccountHealthCalculator":
+        """
+        Creates a calculator from the result of `get_subaccount_info`.
+
+        Args:
+            info (SubaccountInfoData): The subaccount's balances and products.
+
+        Returns:
+            SubaccountHealthCalculator: The health calculator of the subaccount.
+        """
+        return cls(
+            info.spot_balances,
+            info.perp_balances,
+            info.spot_products,
+            info.perp_products,
+        )
+
+    @property
+    def product_ids(self) -> list[int]:
+        """
+        IDs of the products the calculator knows about.
+        """
+        return list(self._positions.keys())
+
+    def position(self, product_id: int) -> tuple[int, int]:
+        """
+        Returns the current `(amount, v_quote_balance)` of a product, after interest and funding.
+
+        Args:
+            product_id (int): ID of the product.
+
+        Returns:
+            tuple[int, int]: The x18 amount and v_quote balance. v_quote is always 0 for spot products.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        position = self._get_position(product_id)
+        return position.amount, position.v_quote
+
+    def contribution(
+        self, product_id: int, health_type: HealthType = HealthType.INITIAL
+    ) -> int:
+        """
+        Returns the health contribution of a product, see `SubaccountInfoData.health_contributions`.
+
+        Args:
+            product_id (int): ID of the product.
+
+            health_type (HealthType): The health type. Defaults to initial health.
+
+        Returns:
+            int: The x18 health contribution.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        return self._get_position(product_id).contributions[health_type]
+
+    def health(
+        self,
+        health_type: HealthType = HealthType.INITIAL,
+        deltas: Optional[Sequence[HealthDelta]] = None,
+    ) -> int:
+        """
+        Computes the subaccount's health, optionally after applying hypothetical deltas.
+
+        Only the products touched by `deltas` are re-evaluated, so what-if scenarios cost a
+        few integer operations per delta.
+
+        Args:
+            health_type (HealthType): The health type to compute. Defaults to initial health.
+
+            deltas (Sequence[HealthDelta], optional): `(product_id, amount_delta, v_quote_delta)` changes
+            to apply before computing health, e.g: from `order_deltas`.
+
+        Returns:
+            int: The x18 health.
+
+        Raises:
+            ValueError: If a delta references an unknown product.
+        """
+        health = self._healths[health_type]
+        if not deltas:
+            return health
+        for product_id, (amount, v_quote) in self._apply_deltas(deltas).items():
+            position = self._positions[product_id]
+            health += (
+                position.contribution(amount, v_quote, health_type)
+                - position.contributions[health_type]
+            )
+        return health
+
+    def healths(self, deltas: Optional[Sequence[HealthDelta]] = None) -> list[int]:
+        """
+        Computes initial, maintenance and unweighted health, optionally after applying deltas.
+
+        Args:
+            deltas (Sequence[HealthDelta], optional): Changes to apply before computing health.
+
+        Returns:
+            list[int]: The x18 healths, in the same order as `SubaccountInfoData.healths`.
+
+        Raises:
+            ValueError: If a delta references an unknown product.
+        """
+        if not deltas:
+            return list(self._healths)
+        healths = list(self._healths)
+        for product_id, (amount, v_quote) in self._apply_deltas(deltas).items():
+            position = self._positions[product_id]
+            for health_type in HealthType:
+                healths[health_type] += (
+                    position.contribution(amount, v_quote, health_type)
+                    - position.contributions[health_type]
+                )
+        return healths
+
+    def order_deltas(
+        self, product_id: int, amount: int, price_x18: Union[int, str], fee: int = 0
+    ) -> list[HealthDelta]:
+        """
+        Returns the deltas of an order being filled, to be used with `health` and `healths`.
+
+        Args:
+            product_id (int): ID of the product being traded.
+
+            amount (int): x18 amount filled. Positive for a buy and negative for a sell.
+
+            price_x18 (int | str): Fill price, in x18.
+
+            fee (int): x18 quote fee paid for the fill. Defaults to 0.
+
+        Returns:
+            list[HealthDelta]: The deltas of the fill.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        self._get_position(product_id)
+        return [(product_id, amount, -fixed.mul(amount, int(price_x18)) - fee)]
+
+    def apply(self, deltas: Sequence[HealthDelta]):
+        """
+        Applies deltas in place, e.g: after an order is filled.
+
+        Args:
+            deltas (Sequence[HealthDelta]): Changes to apply.
+
+        Raises:
+            ValueError: If a delta references an unknown product.
+        """
+        for product_id, (amount, v_quote) in self._apply_deltas(deltas).items():
+            previous = self._positions[product_id]
+            position = _Position(
+                previous.is_spot, amount, v_quote, previous.price, previous.risk
+            )
+            for health_type in HealthType:
+                self._healths[health_type] += (
+                    position.contributions[health_type]
+                    - previous.contributions[health_type]
+                )
+            self._positions[product_id] = position
+
+    def _get_position(self, product_id: int) -> _Position:
+        try:
+            return self._positions[product_id]
+        except KeyError:
+            raise ValueError(f"Invalid product id provided: {product_id}")
+
+    def _apply_deltas(
+        self, deltas: Sequence[HealthDelta]
+    ) -> dict[int, tuple[int, int]]:
+        updated: dict[int, tuple[int, int]] = {}
+        for product_id, amount_delta, v_quote_delta in deltas:
+            position = self._get_position(product_id)
+            amount, v_quote = updated.get(
+                product_id, (position.amount, position.v_quote)
+            )
+            if position.is_spot:
+                updated[product_id] = (amount + amount_delta, v_quote)
+                if v_quote_delta:
+                    quote = self._get_position(QUOTE_PRODUCT_ID)
+                    quote_amount, _ = updated.get(
+                        QUOTE_PRODUCT_ID, (quote.amount, quote.v_quote)
+                    )
+                    updated[QUOTE_PRODUCT_ID] = (quote_amount + v_quote_delta, 0)
+            else:
+                updated[product_id] = (amount + amount_delta, v_quote + v_quote_delta)
+        return updated
+
+
+class SubaccountLimitsEstimator:
+    """
+    Estimates `get_max_order_size`, `get_max_withdrawable` and `get_max_lp_mintable` locally
+    from a snapshot of the subaccount and products, see `SubaccountHealthCalculator`.
+
+    Sizes are the largest multiple of the product's size increment that keeps initial health
+    non-negative (or doesn't lower it, when it already is negative). With `spot_leverage=False`,
+    sizes are further limited so that no spot balance is borrowed. LP positions are given no
+    health, so `max_lp_mintable` is conservative with `spot_leverage` enabled.
+    """
+
+    def __init__(
+        self,
+        info: SubaccountInfoData,
+        all_products: Optional[AllProductsData] = None,
+    ):
+        """
+        Args:
+            info (SubaccountInfoData): The subaccount's balances, see `get_subaccount_info`.
+
+            all_products (AllProductsData, optional): Products to use for prices, risk and LP pools.
+            Defaults to the products of `info`.
+        """
+        self._all_products = all_products
+        self.update_subaccount(info)
+
+    def update_subaccount(self, info: SubaccountInfoData):
+        """
+        Refreshes the subaccount snapshot, e.g: after a fill.
+
+        Args:
+            info (SubaccountInfoData): The subaccount's balances.
+        """
+        products = self._all_products or info
+        self.calculator = SubaccountHealthCalculator(
+            info.spot_balances,
+            info.perp_balances,
+            products.spot_products,
+            products.perp_products,
+        )
+        self._size_increments = {
+            product.product_id: int(product.book_info.size_increment)
+            for product in products.spot_products + products.perp_products
+        }
+        self._lp_pools = {
+            product.product_id: (
+                int(product.lp_state.base.amount),
+                int(product.lp_state.quote.amount),
+            )
+            for product in products.spot_products
+        }
+        self._lp_pools.update(
+            {
+                product.product_id: (
+                    int(product.lp_state.base),
+                    int(product.lp_state.quote),
+                )
+                for product in products.perp_products
+            }
+        )
+
+    def max_order_size(
+        self,
+        product_id: int,
+        price_x18: Union[int, str],
+        direction: MaxOrderSizeDirection,
+        spot_leverage: Optional[bool] = None,
+        fee_rate_x18: int = 0,
+    ) -> int:
+        """
+        Estimates the maximum order size, see `EngineQueryClient.get_max_order_size`.
+
+        Args:
+            product_id (int): ID of the product.
+
+            price_x18 (int | str): Order price, in x18.
+
+            direction (MaxOrderSizeDirection): Whether the order is a long or a short.
+
+            spot_leverage (bool, optional): If False, spot orders can't borrow. Defaults to True.
+
+            fee_rate_x18 (int): x18 fee rate paid on the order's quote amount. Defaults to 0.
+
+        Returns:
+            int: The maximum order size, as a positive x18 amount.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        price_x18 = int(price_x18)
+        sign = 1 if direction == MaxOrderSizeDirection.LONG else -1
+        position = self.calculator._get_position(product_id)
+        calculator = self.calculator
+
+        def deltas(size: int) -> list[HealthDelta]:
+            quote = fixed.mul(size, price_x18)
+            return calculator.order_deltas(
+                product_id, sign * size, price_x18, fixed.mul(quote, fee_rate_x18)
+            )
+
+        max_size = self._max_health_preserving(product_id, deltas)
+        if spot_leverage is False and position.is_spot:
+            if sign < 0:
+                max_size = min(max_size, max(position.amount, 0))
+            elif price_x18 > 0:
+                quote_balance = max(calculator.position(QUOTE_PRODUCT_ID)[0], 0)
+                cost_x18 = fixed.mul(price_x18, fixed.X18 + fee_rate_x18)
+                max_size = min(max_size, fixed.div(quote_balance, cost_x18))
+        return self._floor_to_size_increment(product_id, max_size)
+
+    def max_withdrawable(
+        self, product_id: int, spot_leverage: Optional[bool] = None
+    ) -> int:
+        """
+        Estimates the maximum withdrawable amount, see `EngineQueryClient.get_max_withdrawable`.
+
+        Args:
+            product_id (int): ID of the spot product.
+
+            spot_leverage (bool, optional): If False, withdrawals can't borrow. Defaults to True.
+
+        Returns:
+            int: The maximum withdrawable x18 amount.
+
+        Raises:
+            ValueError: If the product is unknown or is not a spot product.
+        """
+        position = self.calculator._get_position(product_id)
+        if not position.is_spot:
+            raise ValueError(f"Invalid product id provided: {product_id}")
+        if spot_leverage is False:
+            limit = max(position.amount, 0)
+            if self._is_health_preserving([(product_id, -limit, 0)]):
+                return limit
+        return self._max_health_preserving(
+            product_id, lambda amount: [(product_id, -amount, 0)], increment=1
+        )
+
+    def max_lp_mintable(
+        self, product_id: int, spot_leverage: Optional[bool] = None
+    ) -> tuple[int, int]:
+        """
+        Estimates the maximum LP mintable, see `EngineQueryClient.get_max_lp_mintable`.
+
+        Base and quote are provided in the ratio of the product's LP pool, or at the oracle price
+        when the pool is empty. LP tokens are given no health, so this is conservative.
+
+        Args:
+            product_id (int): ID of the product.
+
+            spot_leverage (bool, optional): If False, minting can't borrow. Defaults to True.
+
+        Returns:
+            tuple[int, int]: The maximum x18 base and quote amounts.
+
+        Raises:
+            ValueError: If the product is unknown.
+        """
+        position = self.calculator._get_position(product_id)
+        pool_base, pool_quote = self._lp_pools[product_id]
+        if pool_base <= 0 or pool_quote <= 0:
+            pool_base, pool_quote = fixed.X18, position.price
+
+        def quote_amount(base: int) -> int:
+            return base * pool_quote // pool_base
+
+        def deltas(base: int) -> list[HealthDelta]:
+            if position.is_spot:
+                return [(product_id, -base, -quote_amount(base))]
+            return [(QUOTE_PRODUCT_ID, -quote_amount(base), 0)]
+
+        max_base = self._max_health_preserving(product_id, deltas)
+        if spot_leverage is False:
+            quote_balance = max(self.calculator.position(QUOTE_PRODUCT_ID)[0], 0)
+            max_base = min(max_base, quote_balance * pool_base // pool_quote)
+            if position.is_spot:
+                max_base = min(max_base, max(position.amount, 0))
+        max_base = self._floor_to_size_increment(product_id, max_base)
+        return max_base, quote_amount(max_base)
+
+    def _floor_to_size_increment(self, product_id: int, size: int) -> int:
+        # the quote product has no size increment
+        increment = self._size_increments[product_id]
+        return fixed.floor_to_increment(size, increment) if increment else size
+
+    def _is_health_preserving(self, deltas: Sequence[HealthDelta]) -> bool:
+        health = self.calculator.health(HealthType.INITIAL)
+        return self.calculator.health(HealthType.INITIAL, deltas) >= min(health, 0)
+
+    def _max_health_preserving(
+        self,
+        product_id: int,
+        deltas: Callable[[int], list[HealthDelta]],
+        increment: Optional[int] = None,
+    ) -> int:
+        # health is concave in the size of a trade, so sizes keeping it above the
+        # threshold form an interval starting at 0 that can be binary searched
+        increment = increment or self._size_increments[product_id] or 1
+        low, high = 0, 1
+        while self._is_health_preserving(deltas(high * increment)):
+            low, high = high, high * 2
+            if high * increment > _MAX_AMOUNT_X18:
+                return low * increment
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self._is_health_preserving(deltas(mid * increment)):
+                low = mid
+            else:
+                high = mid
+        return low * increment
@@ -1,4 +1,11 @@
+from array import array
+from dataclasses import dataclass, field
+from itertools import repeat
+from operator import truediv
+from typing import Sequence
 from vertex_protocol.engine_client.types.models import SpotProduct
+from vertex_protocol.utils import fixed
+from vertex_protocol.utils.columns import int_column, x18_column
 from vertex_protocol.utils.time import TimeInSeconds
 from vertex_protocol.utils.math import from_x18, mul_x18
 
@@ -64,3 +71,113 @@ def calc_deposit_rate_in_period(
         return 0
     borrow_rate_in_period = calc_borrow_rate_in_period(product, period_in_seconds)
     return utilization * borrow_rate_in_period * (1 - interest_fee_fraction)
+
+
+@dataclass
+class SpotInterestRates:
+    """
+    Interest rates of several spot products, as columns aligned with `product_ids`.
+    """
+
+    product_ids: array = field(default_factory=lambda: array("q"))
+    utilization: array = field(default_factory=lambda: array("d"))
+    borrow_rates_per_second: array = field(default_factory=lambda: array("d"))
+    # period in seconds -> rate of every product over that period
+    borrow_rates: dict[int, array] = field(default_factory=dict)
+    deposit_rates: dict[int, array] = field(default_factory=dict)
+
+
+def _total_amounts(
+    normalized: Sequence[str], multipliers_x18: Sequence[str]
+) -> list[int]:
+    return list(map(fixed.mul, map(int, normalized), map(int, multipliers_x18)))
+
+
+def _utilization(total_deposited: int, total_borrowed: int) -> float:
+    if total_deposited == 0 or total_borrowed == 0:
+        return 0.0
+    return abs(total_borrowed) / total_deposited
+
+
+def _annual_borrow_rate(
+    utilization: float,
+    interest_floor: float,
+    inflection_util: float,
+    small_cap: float,
+    large_cap: float,
+) -> float:
+    if utilization == 0:
+        return 0.0
+    if utilization > inflection_util:
+        return (
+            interest_floor
+            + small_cap
+            + large_cap * ((utilization - inflection_util) / (1 - inflection_util))
+        )
+    return interest_floor + (utilization / inflection_util) * small_cap
+
+
+def calc_interest_rates(
+    products: Sequence[SpotProduct],
+    periods_in_seconds: Sequence[int] = (TimeInSeconds.YEAR,),
+    interest_fee_fraction: float = 0,
+) -> SpotInterestRates:
+    """
+    Computes utilization, borrow and deposit rates of every spot product, column by column.
+
+    Results match `calc_utilization_ratio`, `calc_borrow_rate_in_period` and `calc_deposit_rate_in_period`,
+    but totals are computed with integer x18 math and each step runs over whole columns of the
+    products' config and state, which are only parsed once for all the requested periods.
+
+    Args:
+        products (Sequence[SpotProduct]): Spot products, e.g: `AllProductsData.spot_products`.
+
+        periods_in_seconds (Sequence[int]): Periods to compute borrow and deposit rates over. Defaults to a year (APR).
+        Duplicated periods are only computed once.
+
+        interest_fee_fraction (float): Fraction of borrow interest kept as fees. Defaults to 0.
+
+    Returns:
+        SpotInterestRates: Rates of every product, in the same order as `products`.
+    """
+    states = [product.state for product in products]
+    configs = [product.config for product in products]
+    total_deposited = _total_amounts(
+        [state.total_deposits_normalized for state in states],
+        [state.cumulative_deposits_multiplier_x18 for state in states],
+    )
+    total_borrowed = _total_amounts(
+        [state.total_borrows_normalized for state in states],
+        [state.cumulative_borrows_multiplier_x18 for state in states],
+    )
+    utilization = array("d", map(_utilization, total_deposited, total_borrowed))
+    annual_rates = map(
+        _annual_borrow_rate,
+        utilization,
+        x18_column(configs, "interest_floor_x18"),
+        x18_column(configs, "interest_inflection_util_x18"),
+        x18_column(configs, "interest_small_cap_x18"),
+        x18_column(configs, "interest_large_cap_x18"),
+    )
+    rates_per_second = array(
+        "d", map(truediv, annual_rates, repeat(TimeInSeconds.YEAR))
+    )
+    rates = SpotInterestRates(
+        product_ids=int_column(products, "product_id"),
+        utilization=utilization,
+        borrow_rates_per_second=rates_per_second,
+    )
+    deposit_fraction = 1 - interest_fee_fraction
+    for period in dict.fromkeys(periods_in_seconds):
+        borrow_rates = array(
+            "d", [(rate + 1) ** period - 1 for rate in rates_per_second]
+        )
+        rates.borrow_rates[period] = borrow_rates
+        rates.deposit_rates[period] = array(
+            "d",
+            [
+                util * borrow_rate * deposit_fraction
+                for util, borrow_rate in zip(utilization, borrow_rates)
+            ],
+        )
+    return rates
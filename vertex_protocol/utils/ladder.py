@@ -0,0 +1,188 @@
+from itertools import repeat
+from operator import mul
+from typing import Optional, Sequence, Union
+from vertex_protocol.utils.execute import OrderParams
+from vertex_protocol.utils.fixed import X18
+from vertex_protocol.utils.subaccount import Subaccount
+
+# (priceX18, amount)
+LadderLevel = tuple[int, int]
+
+# Beyond this many increments, float scaling can be off by more than half an
+# increment, so rounding falls back to exact rational arithmetic.
+_MAX_FLOAT_INCREMENTS = 2**50
+
+
+def _to_increments(values: Sequence[float], increment: int) -> list[int]:
+    """
+    Rounds floats to the nearest whole number of x18 increments.
+
+    Args:
+        values (Sequence[float]): Values to round, e.g: prices or order sizes.
+
+        increment (int): The x18 increment to round to.
+
+    Returns:
+        list[int]: The number of increments closest to each value.
+    """
+    scale = X18 / increment
+    if max(max(values) * scale, -min(values) * scale) < _MAX_FLOAT_INCREMENTS:
+        return list(map(round, map(mul, values, repeat(scale))))
+    return [_to_increments_exact(value, increment) for value in values]
+
+
+def _to_increments_exact(x: float, increment: int) -> int:
+    n, d = float(x).as_integer_ratio()
+    num, den = abs(n) * X18, d * increment
+    increments = (2 * num + den) // (2 * den)
+    return increments if n >= 0 else -increments
+
+
+def build_ladder_levels(
+    prices: Sequence[float],
+    amounts: Sequence[float],
+    price_increment_x18: Union[int, str],
+    size_increment: Union[int, str],
+    min_size: Union[int, str],
+    skip_invalid: bool = False,
+) -> list[LadderLevel]:
+    """
+    Builds order ladder levels in bulk, rounding each price and amount to the product's increments.
+
+    Prices and amounts are rounded to the nearest `price_increment_x18` and `size_increment` in
+    whole-ladder passes of float scaling and integer math, which is considerably faster than going
+    through `to_x18` and `round_x18` per value.
+
+    Unlike `round_x18`, which rounds down, values are rounded to the nearest increment with ties
+    away from zero, as `fixed.round_to_increment` does. A level can therefore round up, e.g: an
+    amount of 2.0006 with a 0.001 size increment becomes 2.001.
+
+    Args:
+        prices (Sequence[float]): Price of each level.
+
+        amounts (Sequence[float]): Amount of each level. Positive for a `long` order and negative for a `short`.
+
+        price_increment_x18 (int | str): The product's price increment, see `ProductBookInfo.price_increment_x18`.
+
+        size_increment (int | str): The product's size increment, see `ProductBookInfo.size_increment`.
+
+        min_size (int | str): The product's minimum order notional, see `ProductBookInfo.min_size`.
+
+        skip_invalid (bool): When True, invalid levels are dropped instead of raising. Defaults to False.
+
+    Returns:
+        list[LadderLevel]: `(priceX18, amount)` tuples ready to be used in `OrderParams`.
+
+    Raises:
+        ValueError: If `prices` and `amounts` have different lengths, or a level is invalid
+        (non-positive price, zero amount or notional below `min_size`) and `skip_invalid` is False.
+    """
+    if len(prices) != len(amounts):
+        raise ValueError(
+            f"Mismatched ladder: {len(prices)} prices and {len(amounts)} amounts."
+        )
+    price_increment_x18, size_increment, min_size = (
+        int(price_increment_x18),
+        int(size_increment),
+        int(min_size),
+    )
+    if price_increment_x18 <= 0 or size_increment <= 0:
+        raise ValueError("Price and size increments must be positive.")
+    if len(prices) == 0:
+        return []
+
+    price_increments = _to_increments(prices, price_increment_x18)
+    size_increments = _to_increments(amounts, size_increment)
+    # |amount| * priceX18 >= min_size * 1e18, expressed in whole increments
+    min_increments = -(-min_size * X18 // (price_increment_x18 * size_increment))
+    if (
+        min(price_increments) > 0
+        and 0 not in size_increments
+        and min(map(mul, map(abs, size_increments), price_increments)) >= min_increments
+    ):
+        return list(
+            zip(
+                map(mul, price_increments, repeat(price_increment_x18)),
+                map(mul, size_increments, repeat(size_increment)),
+            )
+        )
+
+    levels: list[LadderLevel] = []
+    for i, (price_incs, size_incs) in enumerate(zip(price_increments, size_increments)):
+        if (
+            price_incs > 0
+            and size_incs != 0
+            and abs(size_incs) * price_incs >= (min_increments)
+        ):
+            levels.append(
+                (price_incs * price_increment_x18, size_incs * size_increment)
+            )
+        elif not skip_invalid:
+            raise ValueError(
+                f"Invalid ladder level {i}: price={prices[i]}, amount={amounts[i]} "
+                f"rounds to priceX18={price_incs * price_increment_x18}, "
+                f"amount={size_incs * size_increment} (min_size={min_size})."
+            )
+    return levels
+
+
+def build_order_ladder(
+    sender: Subaccount,
+    prices: Sequence[float],
+    amounts: Sequence[float],
+    price_increment_x18: Union[int, str],
+    size_increment: Union[int, str],
+    min_size: Union[int, str],
+    expiration: int,
+    nonces: Optional[Sequence[int]] = None,
+    skip_invalid: bool = False,
+) -> list[OrderParams]:
+    """
+    Builds validated `OrderParams` for every level of an order ladder.
+
+    See `build_ladder_levels` for how levels are rounded to the nearest increments and validated.
+
+    Args:
+        sender (Subaccount): The sender of every order in the ladder.
+
+        prices (Sequence[float]): Price of each level.
+
+        amounts (Sequence[float]): Amount of each level. Positive for a `long` order and negative for a `short`.
+
+        price_increment_x18 (int | str): The product's price increment.
+
+        size_increment (int | str): The product's size increment.
+
+        min_size (int | str): The product's minimum order notional.
+
+        expiration (int): Expiration shared by every order, see `get_expiration_timestamp`.
+
+        nonces (Sequence[int], optional): A nonce per level. When not provided, nonces are generated when placing the orders.
+
+        skip_invalid (bool): When True, invalid levels are dropped instead of raising. Defaults to False.
+
+    Returns:
+        list[OrderParams]: The orders of the ladder, in the same order as the provided levels.
+
+    Raises:
+        ValueError: If the ladder or any of its levels is invalid.
+    """
+    if nonces is not None and len(nonces) != len(prices):
+        raise ValueError(
+            f"Mismatched ladder: {len(prices)} prices and {len(nonces)} nonces."
+        )
+    if nonces is not None and skip_invalid:
+        raise ValueError("`nonces` cannot be provided when `skip_invalid` is set.")
+    levels = build_ladder_levels(
+        prices, amounts, price_increment_x18, size_increment, min_size, skip_invalid
+    )
+    return [
+        OrderParams(
+            sender=sender,
+            priceX18=price_x18,
+            amount=amount,
+            expiration=expiration,
+            nonce=nonces[i] if nonces is not None else None,
+        )
+        for i, (price_x18, amount) in enumerate(levels)
+    ]
@@ -0,0 +1,168 @@
+from vertex_protocol.engine_client.types.models import MarketLiquidity
+from vertex_protocol.utils import fixed
+from vertex_protocol.utils.ladder import LadderLevel
+from vertex_protocol.utils.math import to_x18
+from vertex_protocol.utils.model import VertexBaseModel
+
+
+class MarketImpact(VertexBaseModel):
+    """
+    Expected execution of a market order against a snapshot of the book.
+
+    Attributes:
+        amount (int): Requested amount, x18. Positive for a buy and negative for a sell.
+
+        fillable_amount (int): Amount the visible book fills within `limit_price_x18`, signed like `amount`.
+
+        top_price_x18 (int): Best price on the side the order takes from.
+
+        limit_price_x18 (int): Worst price allowed by the slippage bound.
+
+        avg_price_x18 (int): Expected average fill price, 0 if nothing is fillable.
+
+        worst_price_x18 (int): Price of the last level the order takes from, 0 if nothing is fillable.
+
+        levels (int): Number of levels the order takes from.
+    """
+
+    amount: int
+    fillable_amount: int
+    top_price_x18: int
+    limit_price_x18: int
+    avg_price_x18: int
+    worst_price_x18: int
+    levels: int
+
+    @property
+    def is_fully_fillable(self) -> bool:
+        """
+        Whether the visible book fills the whole order within the slippage bound.
+        """
+        return self.fillable_amount == self.amount
+
+    @property
+    def impact_x18(self) -> int:
+        """
+        Relative distance between the average fill price and the top of the book, x18.
+        """
+        if self.avg_price_x18 == 0:
+            return 0
+        return fixed.div(
+            abs(self.avg_price_x18 - self.top_price_x18), self.top_price_x18
+        )
+
+
+def _walk_book(
+    bids: list[MarketLiquidity],
+    asks: list[MarketLiquidity],
+    amount: int,
+    slippage: float,
+) -> tuple[int, int, list[LadderLevel]]:
+    is_bid = amount > 0
+    book = asks if is_bid else bids
+    if len(book) == 0:
+        raise ValueError("Invalid book provided: no liquidity to take from")
+    top_price_x18 = int(book[0][0])
+    slippage_x18 = to_x18(slippage)
+    limit_price_x18 = (
+        fixed.mul(top_price_x18, fixed.X18 + slippage_x18)
+        if is_bid
+        else fixed.mul(top_price_x18, fixed.X18 - slippage_x18)
+    )
+    remaining = abs(amount)
+    fills: list[LadderLevel] = []
+    for price, size in book:
+        price_x18 = int(price)
+        if remaining == 0 or (
+            price_x18 > limit_price_x18 if is_bid else price_x18 < limit_price_x18
+        ):
+            break
+        fill = min(remaining, int(size))
+        fills.append((price_x18, fill))
+        remaining -= fill
+    return top_price_x18, limit_price_x18, fills
+
+
+def estimate_market_impact(
+    bids: list[MarketLiquidity],
+    asks: list[MarketLiquidity],
+    amount: int,
+    slippage: float = 0.005,
+) -> MarketImpact:
+    """
+    Walks the book to estimate the average price and impact of a market order.
+
+    Args:
+        bids (list[MarketLiquidity]): Bid levels, best first, see `EngineQueryClient.get_market_liquidity`.
+
+        asks (list[MarketLiquidity]): Ask levels, best first.
+
+        amount (int): Amount of the order, x18. Positive for a buy and negative for a sell.
+
+        slippage (float): Maximum distance from the top of the book a level can be taken from. Defaults to 0.005 (0.5%).
+
+    Returns:
+        MarketImpact: The expected execution of the order.
+
+    Raises:
+        ValueError: If the side the order takes from is empty.
+    """
+    top_price_x18, limit_price_x18, fills = _walk_book(bids, asks, amount, slippage)
+    fillable_amount = sum(fill for _, fill in fills)
+    notional = sum(price_x18 * fill for price_x18, fill in fills)
+    return MarketImpact(
+        amount=amount,
+        fillable_amount=fillable_amount if amount > 0 else -fillable_amount,
+        top_price_x18=top_price_x18,
+        limit_price_x18=limit_price_x18,
+        avg_price_x18=notional // fillable_amount if fillable_amount else 0,
+        worst_price_x18=fills[-1][0] if fills else 0,
+        levels=len(fills),
+    )
+
+
+def slice_market_order(
+    bids: list[MarketLiquidity],
+    asks: list[MarketLiquidity],
+    amount: int,
+    slippage: float = 0.005,
+    max_child_orders: int = 1,
+) -> list[LadderLevel]:
+    """
+    Splits a market order into child orders sized to the levels of the book.
+
+    Each child takes from consecutive levels and is priced at the last of them, so no child can
+    fill worse than the levels it was sized for. Children are cut at level boundaries, so their amounts
+    stay multiples of the product's size increment.
+
+    Args:
+        bids (list[MarketLiquidity]): Bid levels, best first, see `EngineQueryClient.get_market_liquidity`.
+
+        asks (list[MarketLiquidity]): Ask levels, best first.
+
+        amount (int): Amount of the order, x18. Positive for a buy and negative for a sell.
+
+        slippage (float): Maximum distance from the top of the book a level can be taken from. Defaults to 0.005 (0.5%).
+
+        max_child_orders (int): Maximum number of child orders. Defaults to 1.
+
+    Returns:
+        list[LadderLevel]: `(priceX18, amount)` of each child order, amounts signed like `amount`.
+        Only the fillable part of the order is sliced.
+
+    Raises:
+        ValueError: If `max_child_orders` is not positive or the side the order takes from is empty.
+    """
+    if max_child_orders < 1:
+        raise ValueError(f"Invalid max child orders provided: {max_child_orders}")
+    _, _, fills = _walk_book(bids, asks, amount, slippage)
+    sign = 1 if amount > 0 else -1
+    target = -(-sum(fill for _, fill in fills) // max_child_orders)
+    children: list[LadderLevel] = []
+    child_amount = 0
+    for i, (price_x18, fill) in enumerate(fills):
+        child_amount += fill
+        if child_amount >= target or i == len(fills) - 1:
+            children.append((price_x18, sign * child_amount))
+            child_amount = 0
+    return children
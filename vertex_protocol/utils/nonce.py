@@ -2,6 +2,9 @@ from typing import Optional
 from datetime import timezone, datetime, timedelta
 import random
 
+# signed payloads whose `recv_time` is within this margin are signed again before being sent, in milliseconds
+RECV_TIME_MARGIN_MS = 5000
+
 
 def gen_order_nonce(
     recv_time_ms: Optional[int] = None,
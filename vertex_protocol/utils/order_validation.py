@@ -0,0 +1,250 @@
+import threading
+from typing import TYPE_CHECKING, Optional, TypeVar
+from vertex_protocol.engine_client.types.query import AllProductsData, SymbolsData
+from vertex_protocol.utils.exceptions import InvalidOrderException
+from vertex_protocol.utils.execute import OrderParams
+from vertex_protocol.utils.expiration import decode_expiration
+from vertex_protocol.utils.fixed import X18, round_to_increment
+from vertex_protocol.utils.model import VertexBaseModel
+from vertex_protocol.utils.time import now_in_seconds
+
+if TYPE_CHECKING:
+    from vertex_protocol.engine_client.registry import ProductRegistry
+
+Order = TypeVar("Order", bound=OrderParams)
+
+
+class OrderRules(VertexBaseModel):
+    """
+    Book constraints an order of a product must satisfy, see `ProductBookInfo`.
+
+    Attributes:
+        price_increment_x18 (int): Prices must be multiples of this.
+
+        size_increment (int): Amounts must be multiples of this.
+
+        min_size (int): Minimum order notional, i.e: `abs(amount) * price`, x18.
+    """
+
+    price_increment_x18: int
+    size_increment: int
+    min_size: int
+
+
+class OrderValidationStats(VertexBaseModel):
+    """
+    Counters of an `OrderValidator`.
+
+    Attributes:
+        validated (int): Number of orders validated.
+
+        rounded (int): Number of orders auto-rounded to the product's increments.
+
+        rejected (int): Number of orders rejected locally.
+    """
+
+    validated: int = 0
+    rounded: int = 0
+    rejected: int = 0
+
+    @property
+    def round_trips_saved(self) -> int:
+        """
+        Executes the engine would have rejected: every rejected and rounded order.
+        """
+        return self.rejected + self.rounded
+
+
+class OrderValidator:
+    """
+    Validates orders locally against their product's book info, before they are signed.
+
+    Orders whose price or amount aren't multiples of the product's increments are either
+    rejected or rounded, prices to the nearest increment and amounts toward zero so that
+    orders never grow. Orders with a notional below `min_size` or already expired are
+    always rejected. Orders of products without rules are passed through, e.g: the quote
+    product, which has no book and zero increments.
+    """
+
+    def __init__(
+        self,
+        rules: dict[int, OrderRules],
+        auto_round: bool = False,
+        min_time_to_expiration: int = 0,
+    ):
+        """
+        Initializes the validator.
+
+        Args:
+            rules (dict[int, OrderRules]): Rules by product ID.
+
+            auto_round (bool): Whether to round prices and amounts instead of rejecting orders. Defaults to False.
+
+            min_time_to_expiration (int): Reject orders expiring within this many seconds. Defaults to 0.
+        """
+        self.rules = rules
+        self.auto_round = auto_round
+        self.min_time_to_expiration = min_time_to_expiration
+        self._stats = OrderValidationStats()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_all_products(
+        cls, all_products: AllProductsData, **kwargs
+    ) -> "OrderValidator":
+        """
+        Builds a validator from the products' `book_info`, see `EngineQueryClient.get_all_products`.
+        """
+        return cls(
+            _book_rules(
+                {
+                    product.product_id: OrderRules(
+                        price_increment_x18=int(product.book_info.price_increment_x18),
+                        size_increment=int(product.book_info.size_increment),
+                        min_size=int(product.book_info.min_size),
+                    )
+                    for product in all_products.spot_products
+                    + all_products.perp_products
+                }
+            ),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_symbols(cls, symbols: SymbolsData, **kwargs) -> "OrderValidator":
+        """
+        Builds a validator from symbols, see `EngineQueryClient.get_symbols`.
+        """
+        return cls(
+            _book_rules(
+                {
+                    int(symbol.product_id): OrderRules(
+                        price_increment_x18=int(symbol.price_increment_x18),
+                        size_increment=int(symbol.size_increment),
+                        min_size=int(symbol.min_size),
+                    )
+                    for symbol in symbols.symbols.values()
+                }
+            ),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_registry(cls, registry: "ProductRegistry", **kwargs) -> "OrderValidator":
+        """
+        Builds a validator from a `ProductRegistry`.
+        """
+        return cls(
+            _book_rules(
+                {
+                    product_id: OrderRules(
+                        price_increment_x18=registry.get(
+                            product_id
+                        ).price_increment_x18,
+                        size_increment=registry.get(product_id).size_increment,
+                        min_size=registry.get(product_id).min_size,
+                    )
+                    for product_id in registry.product_ids
+                }
+            ),
+            **kwargs,
+        )
+
+    @property
+    def stats(self) -> OrderValidationStats:
+        """
+        A snapshot of the validator's counters.
+        """
+        with self._lock:
+            return self._stats.copy()
+
+    def validate(
+        self, product_id: int, order: Order, auto_round: Optional[bool] = None
+    ) -> Order:
+        """
+        Validates an order, rounding it if allowed.
+
+        Args:
+            product_id (int): ID of the order's product.
+
+            order (OrderParams): The order, e.g: `OrderParams` or `IsolatedOrderParams`.
+
+            auto_round (bool, optional): Overrides the validator's `auto_round`, e.g: to never
+            round pre-signed orders.
+
+        Returns:
+            OrderParams: The order, or a rounded copy of it.
+
+        Raises:
+            InvalidOrderException: If the order is invalid and can't be rounded.
+        """
+        rules = self.rules.get(product_id)
+        if rules is None:
+            return order
+        auto_round = self.auto_round if auto_round is None else auto_round
+        try:
+            validated = self._validate(product_id, order, rules, auto_round)
+        except InvalidOrderException:
+            self._count(rejected=1)
+            raise
+        self._count(rounded=int(validated is not order))
+        return validated
+
+    def _validate(
+        self, product_id: int, order: Order, rules: OrderRules, auto_round: bool
+    ) -> Order:
+        price_x18, amount = int(order.priceX18), int(order.amount)
+        if price_x18 <= 0:
+            raise InvalidOrderException(
+                f"Invalid order provided: non-positive price {price_x18} for product {product_id}"
+            )
+        if amount == 0:
+            raise InvalidOrderException(
+                f"Invalid order provided: zero amount for product {product_id}"
+            )
+        _, expiration = decode_expiration(int(order.expiration))
+        if expiration <= now_in_seconds() + self.min_time_to_expiration:
+            raise InvalidOrderException(
+                f"Invalid order provided: expiration {expiration} has passed"
+            )
+
+        rounded_price_x18 = round_to_increment(price_x18, rules.price_increment_x18)
+        rounded_amount = abs(amount) // rules.size_increment * rules.size_increment
+        rounded_amount = rounded_amount if amount > 0 else -rounded_amount
+        if not auto_round:
+            if rounded_price_x18 != price_x18:
+                raise InvalidOrderException(
+                    f"Invalid order provided: price {price_x18} is not a multiple of {rules.price_increment_x18}"
+                )
+            if rounded_amount != amount:
+                raise InvalidOrderException(
+                    f"Invalid order provided: amount {amount} is not a multiple of {rules.size_increment}"
+                )
+        if rounded_price_x18 <= 0 or rounded_amount == 0:
+            raise InvalidOrderException(
+                f"Invalid order provided: price {price_x18} or amount {amount} rounds to zero"
+            )
+        if abs(rounded_amount) * rounded_price_x18 < rules.min_size * X18:
+            raise InvalidOrderException(
+                f"Invalid order provided: notional is below the minimum size {rules.min_size}"
+            )
+        if rounded_price_x18 == price_x18 and rounded_amount == amount:
+            return order
+        return order.copy(
+            update={"priceX18": rounded_price_x18, "amount": rounded_amount}
+        )
+
+    def _count(self, rounded: int = 0, rejected: int = 0):
+        with self._lock:
+            self._stats.validated += 1
+            self._stats.rounded += rounded
+            self._stats.rejected += rejected
+
+
+def _book_rules(rules: dict[int, OrderRules]) -> dict[int, OrderRules]:
+    # products without a book, i.e: the quote product, have zero increments
+    return {
+        product_id: product_rules
+        for product_id, product_rules in rules.items()
+        if product_rules.price_increment_x18 > 0 and product_rules.size_increment > 0
+    }
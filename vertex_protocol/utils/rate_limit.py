@@ -0,0 +1,52 @@
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting the rate of requests sent to a Vertex service.
+
+    Tokens are refilled continuously at `rate` per second, up to `burst`. Each request
+    consumes a token, waiting for one to be available when the bucket is empty.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initializes the rate limiter.
+
+        Args:
+            rate (float): Maximum number of requests per second.
+
+            burst (int, optional): Maximum number of requests that can be sent at once. Defaults to
+            one second worth of requests.
+
+        Raises:
+            ValueError: If the rate or burst isn't positive.
+        """
+        if rate <= 0:
+            raise ValueError(f"Invalid rate provided: {rate}")
+        burst = burst if burst is not None else max(1, int(rate))
+        if burst <= 0:
+            raise ValueError(f"Invalid burst provided: {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Consumes a token, blocking until one is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            # the token is reserved right away so that concurrent callers queue up behind it
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)